@@ -2,10 +2,13 @@
 Description: This file initializes and configures a authentication application
 with MongoDB, it sets up dependency injection using Flask-Injector and registers routes
 for authentication. It includes both HTTP and HTTPS server configurations, with
-optional SSL context.
+optional SSL context. Creating the application does not connect to MongoDB: the
+collections and indexes are created by the `flask bootstrap` command or before
+the first request.
 """
 
 
+import logging
 import os
 from flask import Flask
 from flask_pymongo import PyMongo
@@ -13,50 +16,182 @@ from flask_injector import FlaskInjector
 from injector import Binder, singleton
 from .services.authentication_service import AuthenticationService
 from .repositories.authentication_repository import AuthenticationRepository
-from .schemas import user_secrets_schema
+from .utils.email_delivery import EmailDeliveryQueue, SmtpMailer
+from .utils.attempt_limiter import MemoryAttemptLimiter, MongoAttemptLimiter
+from .utils.ttl_cache import TTLCache
+from .utils.used_codes import MongoUsedCodeStore, RingBucketUsedCodeStore
+from .utils.profiler import create_profiler
+from .utils.json_provider import FastJSONProvider
+from .utils.structured_logging import configure_logging, install_request_ids
+from .utils.tracing import TracingCommandListener, create_tracer, install_tracing
+from .utils.metrics import (
+    MetricsFileWriter,
+    instrument_app,
+    mongo_event_listeners,
+    registry as metrics_registry,
+)
+from .config import Config
+from .bootstrap import bootstrap_database, bootstrap_before_first_request
 from .controllers.authentication_controller import blueprint_authentication
+from .controllers.metrics_controller import blueprint_metrics
+from .controllers.profile_controller import blueprint_profiles
+from .commands import bootstrap_command, enroll_2fa_command
+
+logger = logging.getLogger(__name__)
 
 cert_file = "/certs/localhost+2.pem"
 key_file = "/certs/localhost+2-key.pem"
 
-# Initialize the app
-app = Flask(__name__)
-app.config["MONGO_URI"] = "mongodb://mongo:27017/votes_db"
-
-mongo = PyMongo(app)
 
-db = mongo.cx.votes_db
-if "user_secrets" not in db.list_collection_names():
-    db.create_collection("user_secrets", validator=user_secrets_schema)
+def create_email_queue(config):
+    def create_mailer():
+        return SmtpMailer(
+            config["SMTP_HOST"],
+            config["SMTP_PORT"],
+            username=config["SMTP_USERNAME"],
+            password=config["SMTP_PASSWORD"],
+            use_ssl=config["SMTP_USE_SSL"],
+            sender=config["EMAIL_SENDER"],
+        )
+
+    return EmailDeliveryQueue(
+        create_mailer,
+        workers=config["EMAIL_WORKERS"],
+        max_queue_size=config["EMAIL_QUEUE_SIZE"],
+        max_attempts=config["EMAIL_MAX_ATTEMPTS"],
+        retry_backoff=config["EMAIL_RETRY_BACKOFF"],
+    )
 
 
-def configure(binder: Binder):
-    binder.bind(
-        AuthenticationService,
-        to=AuthenticationService(AuthenticationRepository(mongo)),
-        scope=singleton,
+def create_attempt_limiter(config, db):
+    if config["ATTEMPT_LIMITER"] == "memory":
+        return MemoryAttemptLimiter(
+            config["ATTEMPT_LIMIT_INTERVAL"],
+            config["ATTEMPT_LIMIT_BURST"],
+            max_keys=config["ATTEMPT_LIMITER_MAX_KEYS"],
+        )
+    return MongoAttemptLimiter(
+        db.attempt_limits,
+        config["ATTEMPT_LIMIT_INTERVAL"],
+        config["ATTEMPT_LIMIT_BURST"],
     )
 
 
+def create_used_code_store(config, db):
+    if config["USED_CODE_STORE"] == "memory":
+        return RingBucketUsedCodeStore()
+    return MongoUsedCodeStore(db.used_codes)
+
+
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(config)
+    configure_logging(app.config, "authentication-app")
+    install_request_ids(app)
+
+    # The client connects on its first operation, so under gunicorn every
+    # worker connects after it was forked.
+    mongo = PyMongo(app, event_listeners=setup_metrics(app) + setup_tracing(app))
+    setup_profiling(app)
+    app.extensions["mongo"] = mongo
+    db = mongo.cx.votes_db
+
+    if app.config["DATABASE_BOOTSTRAP"] == "first_request":
+        bootstrap_before_first_request(app, db)
+
+    email_queue = create_email_queue(app.config)
+    if app.config["METRICS_ENABLED"]:
+        metrics_registry.register_stats(
+            "email_queue",
+            email_queue.stats,
+            ("queued", "sent", "retried", "failed", "dead_letters"),
+        )
+
+    def configure(binder: Binder):
+        binder.bind(
+            AuthenticationService,
+            to=AuthenticationService(
+                AuthenticationRepository(mongo),
+                email_queue,
+                compact_qr_codes=app.config["QR_COMPACT"],
+                qr_code_processes=app.config["QR_RENDER_PROCESSES"],
+                attempt_limiter=create_attempt_limiter(app.config, db),
+                totp_cache=TTLCache(
+                    app.config["TOTP_CACHE_SIZE"], app.config["TOTP_CACHE_TTL"]
+                ),
+                used_code_store=create_used_code_store(app.config, db),
+            ),
+            scope=singleton,
+        )
+
+    register_routes(app)
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(enroll_2fa_command)
+
+    # Set up Flask-Injector for dependency injection
+    flask_injector = FlaskInjector(app=app, modules=[configure])
+    app.extensions["injector"] = flask_injector.injector
+    return app
+
+
+def setup_metrics(app):
+    """Instrument the app, returning the listeners of its MongoDB client."""
+    if not app.config["METRICS_ENABLED"]:
+        return []
+
+    writer = None
+    if app.config["METRICS_DIR"]:
+        writer = MetricsFileWriter(metrics_registry, app.config["METRICS_DIR"])
+    app.extensions["metrics_writer"] = writer
+
+    instrument_app(app, writer)
+    app.register_blueprint(blueprint_metrics, url_prefix="")
+    return mongo_event_listeners()
+
+
+def setup_tracing(app):
+    """Trace the requests, returning the listeners of its MongoDB client."""
+    tracer = create_tracer(app.config, "authentication-app")
+    if not tracer:
+        return []
+
+    app.extensions["tracer"] = tracer
+    install_tracing(app, tracer)
+    return [TracingCommandListener()]
+
+
+def setup_profiling(app):
+    # Nothing is installed unless profiling is enabled.
+    profiler = create_profiler(app.config)
+    if not profiler:
+        return
+
+    app.extensions["profiler"] = profiler
+    profiler.install(app)
+    app.register_blueprint(blueprint_profiles, url_prefix="")
+
+
 def register_routes(app):
     app.register_blueprint(blueprint_authentication, url_prefix="")
 
 
-register_routes(app)
-
-# Set up Flask-Injector for dependency injection
-FlaskInjector(app=app, modules=[configure])
+# Initialize the app
+app = create_app()
 
 
 def run_app():
+    # Development server, run the app with gunicorn in production.
+    bootstrap_database(app.extensions["mongo"].cx.votes_db)
+
     # Check if the certificate and key files exist
     if os.path.exists(cert_file) and os.path.exists(key_file):
         # If both exist, run with SSL context (HTTPS)
-        print("Running with SSL context")
+        logger.info("Running with SSL context")
         app.run(ssl_context=(cert_file, key_file), host="0.0.0.0", port=5001)
     else:
         # If the files don't exist, run without SSL (HTTP)
-        print("Running without SSL context")
+        logger.info("Running without SSL context")
         app.run(host="0.0.0.0", port=5001)
 
 
@@ -0,0 +1,62 @@
+"""
+Description: This file creates the collections of the authentication
+application, with their schema validation, and their indexes. It does nothing
+for what already exists and is safe to run from several worker processes at
+once.
+"""
+
+
+import threading
+from pymongo.errors import CollectionInvalid, OperationFailure
+from .schemas import (
+    user_secrets_schema,
+    user_secrets_indexes,
+    users_indexes,
+    attempt_limits_indexes,
+    used_codes_indexes,
+)
+
+NAMESPACE_EXISTS_ERROR_CODE = 48
+
+
+def bootstrap_database(db):
+    collection_names = db.list_collection_names()
+    if "user_secrets" not in collection_names:
+        try:
+            db.create_collection("user_secrets", validator=user_secrets_schema)
+        except CollectionInvalid:
+            pass
+        except OperationFailure as e:
+            # Another worker created it between the check and the creation.
+            if e.code != NAMESPACE_EXISTS_ERROR_CODE:
+                raise
+
+    # Creating an index that already exists with the same options is a no-op.
+    db.user_secrets.create_indexes(user_secrets_indexes)
+    db.attempt_limits.create_indexes(attempt_limits_indexes)
+    db.used_codes.create_indexes(used_codes_indexes)
+    # The voting app owns the "users" collection and its validator, so only
+    # index it once it exists instead of implicitly creating it here.
+    if "users" in collection_names:
+        db.users.create_indexes(users_indexes)
+
+
+def bootstrap_before_first_request(app, db):
+    """Bootstrap the database once, before the first request of the process.
+
+    Until it succeeds, e.g. while MongoDB is unreachable, it is tried again on
+    the next request.
+    """
+    lock = threading.Lock()
+    done = False
+
+    def bootstrap():
+        nonlocal done
+        if done:
+            return
+        with lock:
+            if not done:
+                bootstrap_database(db)
+                done = True
+
+    app.before_request(bootstrap)
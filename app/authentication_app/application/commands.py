@@ -0,0 +1,54 @@
+"""
+Description: This file defines the command line tools of the authentication
+application, available through the Flask CLI:
+- Creating the collections and indexes of the database.
+- Enrolling users into two-factor authentication (2FA) in bulk.
+"""
+
+
+import json
+import click
+from flask import current_app
+from .bootstrap import bootstrap_database
+from .services.authentication_service import AuthenticationService, BULK_BATCH_SIZE
+from .utils.ndjson import iter_ndjson
+
+
+@click.command("bootstrap")
+def bootstrap_command():
+    """Create the collections and indexes of the application."""
+    bootstrap_database(current_app.extensions["mongo"].cx.votes_db)
+    click.echo("The database is ready.")
+
+
+@click.command("enroll-2fa")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=BULK_BATCH_SIZE, show_default=True)
+def enroll_2fa_command(path, batch_size):
+    """Set up 2FA for the users of a JSON array or NDJSON (.ndjson, .jsonl) file."""
+    authentication_service = current_app.extensions["injector"].get(
+        AuthenticationService
+    )
+
+    def progress(enrolled, errors, elapsed):
+        click.echo(
+            f"{enrolled} enrolled, {errors} errors, "
+            f"{enrolled / elapsed:.1f} users/s",
+            err=True,
+        )
+
+    with open(path, "rb") as file:
+        if path.endswith((".ndjson", ".jsonl")):
+            rows = iter_ndjson(file)
+        else:
+            rows = json.load(file)
+            if not isinstance(rows, list):
+                raise click.BadParameter(
+                    "must contain a JSON array.", param_hint="PATH"
+                )
+
+        result = authentication_service.generate_2fa_bulk(rows, batch_size, progress)
+
+    # Wait for the QR codes to be sent before the process exits.
+    authentication_service.email_queue.join()
+    click.echo(json.dumps(result))
@@ -0,0 +1,119 @@
+"""
+Description: This file contains the configuration of the authentication
+application. Every value can be overridden with an environment variable of the
+same name.
+"""
+
+
+import os
+import tempfile
+
+
+class Config:
+    MONGO_URI = os.environ.get("MONGO_URI", "mongodb://mongo:27017/votes_db")
+
+    # SMTP server used to deliver the 2FA QR codes. Point it to a local
+    # stand-in (e.g. aiosmtpd on port 8025 without SSL) for tests and benchmarks.
+    SMTP_HOST = os.environ.get("SMTP_HOST", "smtp.gmail.com")
+    SMTP_PORT = int(os.environ.get("SMTP_PORT", "465"))
+    SMTP_USE_SSL = os.environ.get("SMTP_USE_SSL", "true").lower() == "true"
+    # Leave the username empty to skip the SMTP login.
+    SMTP_USERNAME = os.environ.get("SMTP_USERNAME", "electeu@gmail.com")
+    SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "kxvz hrel fgii qhdo")
+    EMAIL_SENDER = os.environ.get("EMAIL_SENDER", "electeu@gmail.com")
+
+    # Background delivery of the emails.
+    EMAIL_WORKERS = int(os.environ.get("EMAIL_WORKERS", "2"))
+    EMAIL_QUEUE_SIZE = int(os.environ.get("EMAIL_QUEUE_SIZE", "10000"))
+    EMAIL_MAX_ATTEMPTS = int(os.environ.get("EMAIL_MAX_ATTEMPTS", "5"))
+    # Seconds before the first retry, doubled after every failed attempt.
+    EMAIL_RETRY_BACKOFF = float(os.environ.get("EMAIL_RETRY_BACKOFF", "1.0"))
+
+    # Token admin routes, e.g. POST /register/bulk, must be sent with in the
+    # X-Admin-Token header. They are refused while it is empty, bulk 2FA
+    # enrollment is then only available from the enroll-2fa command.
+    ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+    # Render smaller QR codes that are cheaper to encode and to send.
+    QR_COMPACT = os.environ.get("QR_COMPACT", "false").lower() == "true"
+
+    # Processes rendering QR codes when setting up 2FA in bulk, all cores if 0.
+    QR_RENDER_PROCESSES = int(os.environ.get("QR_RENDER_PROCESSES", "0"))
+
+    # 2FA attempts: one every ATTEMPT_LIMIT_INTERVAL seconds per user, and up to
+    # ATTEMPT_LIMIT_BURST attempts at once after a quiet period.
+    ATTEMPT_LIMIT_INTERVAL = float(os.environ.get("ATTEMPT_LIMIT_INTERVAL", "2"))
+    ATTEMPT_LIMIT_BURST = int(os.environ.get("ATTEMPT_LIMIT_BURST", "1"))
+    # "mongo" shares the limits between every worker process, "memory" keeps
+    # them in each process, holding at most ATTEMPT_LIMITER_MAX_KEYS users.
+    ATTEMPT_LIMITER = os.environ.get("ATTEMPT_LIMITER", "mongo")
+    ATTEMPT_LIMITER_MAX_KEYS = int(os.environ.get("ATTEMPT_LIMITER_MAX_KEYS", "100000"))
+
+    # Cached TOTP secrets used to verify 2FA codes, by email.
+    TOTP_CACHE_SIZE = int(os.environ.get("TOTP_CACHE_SIZE", "100000"))
+    TOTP_CACHE_TTL = float(os.environ.get("TOTP_CACHE_TTL", "60"))
+
+    # Used 2FA codes, rejected when replayed. "mongo" shares them between every
+    # worker process. "memory" keeps them in each process, so only use it with
+    # a single worker: otherwise a code used on one worker can be replayed once
+    # on every other worker within its 30 second time step.
+    USED_CODE_STORE = os.environ.get("USED_CODE_STORE", "mongo")
+
+    # "first_request" creates the collections and indexes before the first
+    # request of every process. Use "off" when `flask bootstrap` is run before
+    # the server is started.
+    DATABASE_BOOTSTRAP = os.environ.get("DATABASE_BOOTSTRAP", "first_request")
+
+    # Latency and status of the requests, and timing of the MongoDB commands,
+    # served on GET /metrics.
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    # Directory where every worker process writes its metrics, so that /metrics
+    # reports the sum of all the workers. Each process reports its own if empty.
+    METRICS_DIR = os.environ.get("METRICS_DIR", "")
+
+    # Opt-in profiling of requests, off unless one of the three is set:
+    # - PROFILE_SLOW_REQUESTS_MS: keep the stacks, sampled every
+    #   PROFILE_SAMPLE_INTERVAL_MS, of the requests slower than this.
+    # - PROFILE_EVERY_N_REQUESTS: profile 1 in N requests with cProfile.
+    # - PROFILE_TOKEN: profile the requests sent with this token in the
+    #   X-Profile-Token header, which also gives access to GET /admin/profiles.
+    PROFILE_SLOW_REQUESTS_MS = float(os.environ.get("PROFILE_SLOW_REQUESTS_MS", "0"))
+    PROFILE_SAMPLE_INTERVAL_MS = float(
+        os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", "5")
+    )
+    PROFILE_EVERY_N_REQUESTS = int(os.environ.get("PROFILE_EVERY_N_REQUESTS", "0"))
+    PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+    # Directory keeping the PROFILE_MAX_FILES most recent profiles.
+    PROFILE_DIR = os.environ.get(
+        "PROFILE_DIR",
+        os.path.join(tempfile.gettempdir(), "authentication-app-profiles"),
+    )
+    PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "100"))
+
+    # Tracing of the requests, continued across the services with the
+    # traceparent header and the trace_id claim of the JWT. Finished spans are
+    # appended to TRACE_FILE as JSON lines, or sent as OTLP/JSON to
+    # TRACE_OTLP_ENDPOINT when TRACE_EXPORTER is "otlp".
+    TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "file")
+    TRACE_FILE = os.environ.get(
+        "TRACE_FILE",
+        os.path.join(tempfile.gettempdir(), "authentication-app-traces.jsonl"),
+    )
+    TRACE_OTLP_ENDPOINT = os.environ.get(
+        "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    # Share of the requests starting a new trace that are traced.
+    TRACE_SAMPLE_RATIO = float(os.environ.get("TRACE_SAMPLE_RATIO", "1.0"))
+
+    # Records are written to stdout as JSON lines by a background thread. Set
+    # the level of single modules with LOG_LEVELS, e.g.
+    # "application.services=DEBUG,pymongo=WARNING".
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+    # Records waiting to be written, newer records are dropped when it is full.
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    # Warnings and errors with the same message are logged at most
+    # LOG_RATE_LIMIT_BURST times per LOG_RATE_LIMIT_INTERVAL seconds, 0 for all.
+    LOG_RATE_LIMIT_BURST = int(os.environ.get("LOG_RATE_LIMIT_BURST", "10"))
+    LOG_RATE_LIMIT_INTERVAL = float(os.environ.get("LOG_RATE_LIMIT_INTERVAL", "60"))
@@ -1,7 +1,8 @@
 """
 Description: This file defines the authentication routes for user registration,
 retrieving user secrets, and verifying two-factor authentication (2FA)
-in the authentification application.
+in the authentification application. It also allows setting up 2FA for many
+users at once.
 
 """
 
@@ -9,11 +10,29 @@ in the authentification application.
 from flask import Blueprint, request, jsonify
 from flask_injector import inject
 from ..services.authentication_service import AuthenticationService
+from ..exceptions.invalid_pagination_error import InvalidPaginationError
+from ..exceptions.email_queue_full_error import EmailQueueFullError
+from ..utils.decorators import admin_token_required
+from ..utils.ndjson import iter_ndjson
+from ..utils.tracing import current_trace_id
+from ..utils.pagination import (
+    NDJSON_MIMETYPE,
+    is_paginated,
+    ndjson_response,
+    page,
+    parse_after,
+    parse_limit,
+    wants_ndjson,
+)
 import jwt
 import datetime
 
 blueprint_authentication = Blueprint("authentication", __name__)
 
+# Seconds a client waits before registering again when its 2FA email could
+# not be queued.
+EMAIL_QUEUE_FULL_RETRY_AFTER = 5
+
 
 # Handles user registration and initiates 2FA setup.
 @blueprint_authentication.route("/register", methods=["POST"])
@@ -37,17 +56,55 @@ def register(authentication_service: AuthenticationService):
             "secret": secret,
         }
         return response, 201
+    except EmailQueueFullError as e:
+        return (
+            jsonify({"error": str(e)}),
+            503,
+            {"Retry-After": str(EMAIL_QUEUE_FULL_RETRY_AFTER)},
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-# Retrieves all user secrets from the database.
+# Sets up 2FA for a list of users, given as a JSON array or NDJSON body of
+# emails (or of objects with an "email" field). The QR codes are emailed.
+# Restricted to admins, as it creates the secrets of many users at once.
+@blueprint_authentication.route("/register/bulk", methods=["POST"])
+@admin_token_required
+@inject
+def register_bulk(authentication_service: AuthenticationService):
+    if request.mimetype == NDJSON_MIMETYPE:
+        rows = iter_ndjson(request.stream)
+    else:
+        rows = request.get_json()
+        if not isinstance(rows, list):
+            return jsonify({"error": "A list of emails is required"}), 400
+
+    try:
+        result = authentication_service.generate_2fa_bulk(rows)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Retrieves all user secrets from the database, either at once, page by page
+# (`after`/`limit`) or streamed as NDJSON (`format=ndjson`).
 @blueprint_authentication.route("/user_secrets", methods=["GET"])
 @inject
 def get_all_user_secrets(authentication_service: AuthenticationService):
     try:
+        after = parse_after(request.args)
+        if wants_ndjson(request):
+            return ndjson_response(authentication_service.iter_user_secrets(after))
+        if is_paginated(request):
+            limit = parse_limit(request.args)
+            user_secrets = authentication_service.get_user_secrets_page(after, limit)
+            return jsonify(page(user_secrets, limit)), 200
+
         user_secrets = authentication_service.get_all_user_secrets()
         return jsonify(user_secrets), 200
+    except InvalidPaginationError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -57,7 +114,6 @@ def get_all_user_secrets(authentication_service: AuthenticationService):
 @blueprint_authentication.route("/verify-2fa", methods=["POST"])
 @inject
 def verify(authentication_service: AuthenticationService):
-    user_id = request.json.get("user_id")
     email = request.json.get("email")
     code = request.json.get("code")
 
@@ -67,13 +123,21 @@ def verify(authentication_service: AuthenticationService):
     try:
         is_valid = authentication_service.verify_2fa(email, code)
         if is_valid:
+            # The token is issued for the user the code belongs to, the voting
+            # service trusts its user_id without looking the voter up.
+            user_id = authentication_service.get_user_id(email)
             # Generate JWT token
+            claims = {
+                "user_id": user_id,
+                "email": email,
+                "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1),
+            }
+            # The vote sent with this token joins the trace of this request.
+            trace_id = current_trace_id()
+            if trace_id:
+                claims["trace_id"] = trace_id
             token = jwt.encode(
-                {
-                    "user_id": user_id,
-                    "email": email,
-                    "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=1),
-                },
+                claims,
                 "your_secret_key",  # Replace this with your secret key
                 algorithm="HS256",
             )
@@ -0,0 +1,25 @@
+"""
+Description: This file defines the admin endpoints listing and serving the
+profiles written by the request profiler.
+"""
+
+
+from flask import Blueprint, current_app, jsonify, send_from_directory
+from ..utils.decorators import profile_token_required
+
+blueprint_profiles = Blueprint("profiles", __name__)
+
+
+@blueprint_profiles.route("/admin/profiles", methods=["GET"])
+@profile_token_required
+def get_profiles():
+    store = current_app.extensions["profiler"].store
+    return jsonify(store.list()), 200
+
+
+@blueprint_profiles.route("/admin/profiles/<name>", methods=["GET"])
+@profile_token_required
+def get_profile(name):
+    store = current_app.extensions["profiler"].store
+    # Only serves files of the profile directory, 404 for any other name.
+    return send_from_directory(store.directory, name, as_attachment=True)
@@ -0,0 +1,14 @@
+"""
+Description: Exception raised when a 2FA email can not be queued for delivery
+because the delivery queue is full.
+"""
+
+
+class EmailQueueFullError(Exception):
+    def __init__(self, email):
+        self.email = email
+        self.message = f"The 2FA email to {email} could not be sent, try again later."
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"EmailQueueFullError: {self.message}"
@@ -10,6 +10,10 @@ and handling user secrets.
 
 
 from injector import inject
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+DUPLICATE_KEY_ERROR_CODE = 11000
 
 
 class AuthenticationRepository:
@@ -66,6 +70,8 @@ class AuthenticationRepository:
             {
                 "$set": {
                     "user_id": user_id,
+                    # Stored with the secret so it can be found by email alone
+                    "email": email,
                     "authentication_token": authentication_token,
                     "bearer_token": "",  # Set bearer token to None for new users
                 }
@@ -73,15 +79,81 @@ class AuthenticationRepository:
             upsert=True,  # Insert the document if it doesn't exist
         )
 
+    def store_new_totp_secrets(self, secrets):
+        """Store the 2FA secrets of users without one, with a single bulk write.
+
+        `secrets` is a list of (user_id, email, authentication_token) tuples.
+        The secrets of users that are already enrolled are left unchanged.
+        Returns the user_ids whose secret was stored.
+        """
+        if not secrets:
+            return set()
+
+        operations = [
+            UpdateOne(
+                {"user_id": user_id},
+                {
+                    "$setOnInsert": {
+                        "user_id": user_id,
+                        "email": email,
+                        "authentication_token": authentication_token,
+                        "bearer_token": "",
+                    }
+                },
+                upsert=True,
+            )
+            for user_id, email, authentication_token in secrets
+        ]
+        try:
+            result = self.user_secrets_table.bulk_write(operations, ordered=False)
+            upserted = result.upserted_ids
+        except BulkWriteError as e:
+            # A user enrolled concurrently already has a secret, the unique
+            # index on user_id rejected the second one.
+            for error in e.details["writeErrors"]:
+                if error["code"] != DUPLICATE_KEY_ERROR_CODE:
+                    raise
+            upserted = {
+                upsert["index"]: upsert["_id"] for upsert in e.details["upserted"]
+            }
+        return {secrets[index][0] for index in upserted}
+
     def get_all_user_secrets(self):
         """Retrieve all entries from the user_secrets collection."""
         return list(self.user_secrets_table.find({}, {"_id": 0}))
 
+    def get_user_secrets_page(self, after=None, limit=100):
+        """Retrieve up to `limit` secrets with a user_id greater than `after`."""
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        user_secrets = self.user_secrets_table.find(query, {"_id": 0})
+        return list(user_secrets.sort("user_id", ASCENDING).limit(limit))
+
+    def iter_user_secrets(self, after=None, batch_size=1000):
+        """Return a cursor over the user secrets, ordered by user_id."""
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        user_secrets = self.user_secrets_table.find(
+            query, {"_id": 0}, batch_size=batch_size
+        )
+        return user_secrets.sort("user_id", ASCENDING)
+
+    def get_user_ids_by_emails(self, emails):
+        """Return the user_id of every given email that belongs to a user."""
+        users = self.users_table.find(
+            {"email": {"$in": list(emails)}}, {"_id": 0, "email": 1, "user_id": 1}
+        )
+        return {user["email"]: user["user_id"] for user in users}
+
     def get_user_by_email(self, email):
         return self.users_table.find_one({"email": email}, {"_id": 0})
 
     def get_user_secrets(self, email):
-        # Get the user_id associated with the given email
+        # Secrets stored since the email is kept with them are found with a
+        # single indexed query.
+        user_secrets = self.user_secrets_table.find_one({"email": email}, {"_id": 0})
+        if user_secrets:
+            return user_secrets
+
+        # Older secrets are found through the user_id of the user
         user = self.get_user_by_email(email)
 
         if not user:
@@ -97,4 +169,8 @@ class AuthenticationRepository:
         if not user_secrets:
             raise ValueError(f"No secrets found for user with email {email}")
 
+        # Add the email, so the next lookup takes the single query
+        self.user_secrets_table.update_one(
+            {"user_id": user_id}, {"$set": {"email": email}}
+        )
         return user_secrets
@@ -0,0 +1,120 @@
+"""
+Description: This file contains the InMemoryAuthenticationRepository class, a
+drop-in replacement of AuthenticationRepository that keeps the users and their
+secrets in dicts instead of MongoDB, so the service can be benchmarked and
+tested without a database. Documents are copied in and out, like they are
+sent to and read from MongoDB.
+"""
+
+
+import threading
+from types import SimpleNamespace
+
+
+class InMemoryAuthenticationRepository:
+    def __init__(self):
+        # user_id -> user and user_id -> user secrets, like the collections.
+        self.users = {}
+        self.user_secrets = {}
+        # email -> user_id, like the email indexes of both collections.
+        self._users_by_email = {}
+        self._user_secrets_by_email = {}
+        self._lock = threading.Lock()
+
+    def store_user(self, user_json):
+        """Store a new user based on their user_id."""
+        if not user_json.get("user_id"):
+            raise ValueError("user_id is required to store a user.")
+
+        with self._lock:
+            self.users[user_json["user_id"]] = dict(user_json)
+            self._users_by_email[user_json.get("email")] = user_json["user_id"]
+
+    def get_all_users(self):
+        with self._lock:
+            return [dict(user) for user in self.users.values()]
+
+    def get_user(self, user_id):
+        with self._lock:
+            user = self.users.get(user_id)
+        return dict(user) if user else None
+
+    def get_user_id_by_email(self, email):
+        return self.get_user_by_email(email).get("user_id")
+
+    def delete_user(self, user_id):
+        with self._lock:
+            user = self.users.pop(user_id, None)
+            if user:
+                self._users_by_email.pop(user.get("email"), None)
+        return SimpleNamespace(deleted_count=int(user is not None))
+
+    def verify(self, email, password):
+        """Verify if a user with the given email and password exists."""
+        user = self.get_user_by_email(email)
+        return bool(user and user["password"] == password)
+
+    def store_totp_secret(self, email, authentication_token):
+        user_id = self.get_user_id_by_email(email)
+        with self._lock:
+            self._set_totp_secret(user_id, email, authentication_token)
+
+    def store_new_totp_secrets(self, secrets):
+        """Store the secrets of (user_id, email, authentication_token) tuples.
+
+        Users that already have a secret keep it. Returns the user_ids whose
+        secret was stored.
+        """
+        stored = set()
+        with self._lock:
+            for user_id, email, authentication_token in secrets:
+                if user_id not in self.user_secrets:
+                    self._set_totp_secret(user_id, email, authentication_token)
+                    stored.add(user_id)
+        return stored
+
+    def _set_totp_secret(self, user_id, email, authentication_token):
+        self.user_secrets[user_id] = {
+            "user_id": user_id,
+            "email": email,
+            "authentication_token": authentication_token,
+            "bearer_token": "",
+        }
+        self._user_secrets_by_email[email] = user_id
+
+    def get_all_user_secrets(self):
+        return list(self.iter_user_secrets())
+
+    def get_user_secrets_page(self, after=None, limit=100):
+        return list(self.iter_user_secrets(after))[:limit]
+
+    def iter_user_secrets(self, after=None, batch_size=1000):
+        with self._lock:
+            user_secrets = [
+                dict(self.user_secrets[user_id])
+                for user_id in sorted(self.user_secrets)
+                if after is None or user_id > after
+            ]
+        return iter(user_secrets)
+
+    def get_user_ids_by_emails(self, emails):
+        """Return the user_id of every given email that belongs to a user."""
+        emails = set(emails)
+        with self._lock:
+            return {
+                email: self._users_by_email[email]
+                for email in emails
+                if email in self._users_by_email
+            }
+
+    def get_user_by_email(self, email):
+        with self._lock:
+            user = self.users.get(self._users_by_email.get(email))
+        return dict(user) if user else None
+
+    def get_user_secrets(self, email):
+        with self._lock:
+            user_secrets = self.user_secrets.get(self._user_secrets_by_email.get(email))
+        if user_secrets:
+            return dict(user_secrets)
+        raise ValueError(f"No secrets found for user with email {email}")
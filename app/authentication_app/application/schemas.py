@@ -1,3 +1,5 @@
+from pymongo import ASCENDING, IndexModel
+
 # Token Collection with Validation
 user_secrets_schema = {
     "$jsonSchema": {
@@ -8,6 +10,10 @@ user_secrets_schema = {
                 "bsonType": "int",
                 "description": "Email of the user associated with this token",
             },
+            "email": {
+                "bsonType": "string",
+                "description": "Email of the user, to find the secrets by email",
+            },
             "authentication_token": {
                 "bsonType": "string",
                 "description": "Authentication token for 2FA",
@@ -19,3 +25,29 @@ user_secrets_schema = {
         },
     }
 }
+
+
+# Indexes created at startup. Keep the "users" indexes identical in both
+# services, as both of them create them.
+users_indexes = [
+    IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    IndexModel([("email", ASCENDING)], name="email"),
+]
+
+user_secrets_indexes = [
+    IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    IndexModel([("email", ASCENDING)], name="email"),
+]
+
+# Documents are removed by the TTL monitor once their expires_at has passed.
+attempt_limits_indexes = [
+    IndexModel(
+        [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+    ),
+]
+
+used_codes_indexes = [
+    IndexModel(
+        [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+    ),
+]
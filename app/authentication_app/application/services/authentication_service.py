@@ -3,107 +3,239 @@ Description: This file provides the AuthenticationService class,
 and has the following functionalities:
 - User authentication.
 - Two-factor authentication (2FA) setup.
+- Two-factor authentication (2FA) setup in bulk.
 - Retrieving the complete user database.
 - Verifying usrs
 - Checking user credentials.
 """
 
-import pyotp
-import qrcode
+import datetime
+import itertools
+import multiprocessing
 import os
-import smtplib
+import pyotp
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from ..repositories.authentication_repository import AuthenticationRepository
+from ..exceptions.email_queue_full_error import EmailQueueFullError
+from ..utils.email_delivery import EmailDeliveryQueue
+from ..utils.qr_code import render_qr_code
+from ..utils.attempt_limiter import MemoryAttemptLimiter
+from ..utils.ttl_cache import TTLCache
+from ..utils.used_codes import RingBucketUsedCodeStore
+from ..utils.tracing import traced
 
+# Default minimum number of seconds between two 2FA attempts of a user.
 MINIMUM_WAIT_ATTEMPT = 2
+# Users whose secrets are stored with a single bulk write when enrolling in bulk.
+BULK_BATCH_SIZE = 1000
+# Default bound and seconds to live of the cached TOTP objects. A secret that is
+# rewritten by another worker process is picked up at the latest after the TTL.
+TOTP_CACHE_SIZE = 100000
+TOTP_CACHE_TTL = 60
 
 
 class AuthenticationService:
-    def __init__(self, authentication_repository: AuthenticationRepository):
+    def __init__(
+        self,
+        authentication_repository: AuthenticationRepository,
+        email_queue: EmailDeliveryQueue,
+        compact_qr_codes=False,
+        qr_code_processes=None,
+        attempt_limiter=None,
+        totp_cache=None,
+        used_code_store=None,
+    ):
         self.authentication_repository = authentication_repository
-        self.last_attempt_time = {}
+        self.email_queue = email_queue
+        self.compact_qr_codes = compact_qr_codes
+        self.qr_code_processes = qr_code_processes or os.cpu_count()
+        self.attempt_limiter = attempt_limiter or MemoryAttemptLimiter(
+            MINIMUM_WAIT_ATTEMPT
+        )
+        # email -> pyotp.TOTP of the user's current secret
+        # An empty cache is falsy, so it is compared with None.
+        if totp_cache is None:
+            totp_cache = TTLCache(TOTP_CACHE_SIZE, TOTP_CACHE_TTL)
+        self.totp_cache = totp_cache
+        if used_code_store is None:
+            used_code_store = RingBucketUsedCodeStore()
+        self.used_code_store = used_code_store
+        self._qr_code_executor = None
+        self._qr_code_executor_pid = None
+        self._qr_code_executor_lock = threading.Lock()
 
-    def send_email_with_qr_code(self, email, qr_code_path):
-        # Email credentials
-        sender_email = "electeu@gmail.com"
-        sender_password = "kxvz hrel fgii qhdo"  # Use App Password if 2FA is enabled
-
-        # Create a multipart email message
+    def send_email_with_qr_code(self, email, qr_code, block=False):
+        # Create a multipart email message, the sender is set by the mailer
         msg = MIMEMultipart()
         msg["Subject"] = "Your 2FA Setup QR Code"
-        msg["From"] = sender_email
         msg["To"] = email
 
         # Add text to the email
         text = f"Scan the attached QR code to set up 2FA for {email}"
         msg.attach(MIMEText(text, "plain"))
 
-        # Read the QR code image and attach it to the email
-        with open(qr_code_path, "rb") as f:
-            img_data = f.read()
-            img_mime = MIMEImage(img_data, name=os.path.basename(qr_code_path))
-            msg.attach(img_mime)
-
-        # Send email using SMTP (ensure the SMTP server is correctly configured)
-        try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                server.login(sender_email, sender_password)
-                server.sendmail(sender_email, email, msg.as_string())
-                print(f"Email sent to {email}")
-        except Exception as e:
-            print(f"Failed to send email: {e}")
+        # Attach the PNG image of the QR code
+        msg.attach(MIMEImage(qr_code, "png", name=f"{email}_qrcode.png"))
 
-    def generate_2fa(self, email):
-        # Ensure the data directory exists
-        data_dir = "data"
-        os.makedirs(data_dir, exist_ok=True)  # Create the directory if it doesn't exist
+        # The email is sent by the delivery workers, so the request does not
+        # wait for the SMTP server.
+        return self.email_queue.submit(msg, block=block)
 
+    @traced("AuthenticationService.generate_2fa")
+    def generate_2fa(self, email):
         # Generate a unique secret for the user
         secret = pyotp.random_base32()
 
         # token_service.store_token(email, secret)
         self.authentication_repository.store_totp_secret(email, secret)
+        self.totp_cache.pop(email)
 
         # Generate a QR code for Google Authenticator
-        totp = pyotp.TOTP(secret)
-        qr_code_data = totp.provisioning_uri(email, issuer_name="ElectEU")
-        img = qrcode.make(qr_code_data)
-
-        # Save the QR code as an image
-        qr_code_path = f"{data_dir}/{email}_qrcode.png"
-        img.save(qr_code_path)
-
-        # Send the QR code via email
-        self.send_email_with_qr_code(email, qr_code_path)
-
-        # Remove the QR code file after sending the email
-        remove_qr_code = False
-        if remove_qr_code:
-            try:
-                os.remove(qr_code_path)
-                print(f"Successfully deleted QR code file: {qr_code_path}")
-            except Exception as e:
-                print(f"Failed to delete QR code file: {e}")
+        qr_code_data = self.provisioning_uri(email, secret)
+        qr_code = render_qr_code(qr_code_data, compact=self.compact_qr_codes)
+
+        # Send the QR code via email, it is never written to disk. When the
+        # queue is full, registering again later replaces the stored secret.
+        if not self.send_email_with_qr_code(email, qr_code):
+            raise EmailQueueFullError(email)
 
         return secret
 
+    def generate_2fa_bulk(self, emails, batch_size=BULK_BATCH_SIZE, progress=None):
+        """Set up 2FA for many users, like generate_2fa does for one user.
+
+        `emails` can contain plain emails or user objects with an "email" field.
+        Emails are processed in batches: the users of a batch are looked up with
+        one query, their secrets are stored with one bulk write and their QR
+        codes are rendered across a process pool before being queued for
+        delivery. Users that already have a secret keep it and are reported as
+        already enrolled. `progress` is called after every batch with the number
+        of enrolled users, the number of errors and the elapsed seconds.
+        """
+        start = time.perf_counter()
+        enrolled = 0
+        errors = []
+
+        emails = (row.get("email") if isinstance(row, dict) else row for row in emails)
+        while True:
+            batch = list(itertools.islice(emails, batch_size))
+            if not batch:
+                break
+
+            enrolled += self._generate_2fa_batch(batch, errors)
+            if progress:
+                progress(enrolled, len(errors), time.perf_counter() - start)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "enrolled": enrolled,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "per_second": round(enrolled / elapsed, 1) if elapsed else 0.0,
+        }
+
+    def _generate_2fa_batch(self, emails, errors):
+        user_ids = self.authentication_repository.get_user_ids_by_emails(
+            [email for email in emails if isinstance(email, str)]
+        )
+
+        users = {}
+        for email in emails:
+            if isinstance(email, ValueError):
+                # A line of an NDJSON body that could not be parsed.
+                errors.append({"email": None, "error": f"Invalid JSON: {email}"})
+            elif not isinstance(email, str) or not email:
+                errors.append({"email": email, "error": "Email is required"})
+            elif email not in user_ids:
+                errors.append(
+                    {"email": email, "error": f"No user found with email {email}"}
+                )
+            elif email in users:
+                errors.append({"email": email, "error": "Duplicate email"})
+            else:
+                users[email] = pyotp.random_base32()
+
+        if not users:
+            return 0
+
+        # Enrolled users keep their secret, so a bulk enrollment can not lock
+        # them out of 2FA.
+        stored = self.authentication_repository.store_new_totp_secrets(
+            [(user_ids[email], email, secret) for email, secret in users.items()]
+        )
+        for email in list(users):
+            if user_ids[email] not in stored:
+                errors.append({"email": email, "error": "Already enrolled"})
+                del users[email]
+
+        if not users:
+            return 0
+
+        # QR codes are rendered in parallel and handed to the delivery queue as
+        # soon as they are ready. Waiting for room in the queue keeps a large
+        # enrollment from dead-lettering emails.
+        qr_codes = self._get_qr_code_executor().map(
+            render_qr_code,
+            [self.provisioning_uri(email, secret) for email, secret in users.items()],
+            itertools.repeat(self.compact_qr_codes),
+            chunksize=max(1, len(users) // (self.qr_code_processes * 4)),
+        )
+        for email, qr_code in zip(users, qr_codes):
+            self.send_email_with_qr_code(email, qr_code, block=True)
+
+        return len(users)
+
+    def _get_qr_code_executor(self):
+        # Created on first use in every process, and with "spawn", so that it is
+        # never inherited from a forking server nor forked from a threaded one.
+        with self._qr_code_executor_lock:
+            if self._qr_code_executor_pid != os.getpid():
+                self._qr_code_executor = ProcessPoolExecutor(
+                    self.qr_code_processes,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self._qr_code_executor_pid = os.getpid()
+            return self._qr_code_executor
+
+    @staticmethod
+    def provisioning_uri(email, secret):
+        return pyotp.TOTP(secret).provisioning_uri(email, issuer_name="ElectEU")
+
+    @traced("AuthenticationService.verify_2fa")
     def verify_2fa(self, email, code):
-        current_time = time.time()
+        # Check and record the attempt of this user
+        if not self.attempt_limiter.allow(email):
+            raise ValueError("Please wait before trying again.")
 
-        # Check the last attempt time for this user
-        if email in self.last_attempt_time:
-            time_since_last_attempt = current_time - self.last_attempt_time[email]
-            if time_since_last_attempt < MINIMUM_WAIT_ATTEMPT:
-                raise ValueError("Please wait before trying again.")
+        # Use the authentication token of the user to verify the 2FA code
+        totp = self.get_totp(email)
+        # print("Expected TOTP code:", totp.now())  # For debugging purposes
+        now = datetime.datetime.now()
+        if not totp.verify(code, for_time=now):
+            return False
+
+        # A valid code is accepted once, replaying it within its time step fails
+        return self.used_code_store.mark_used(email, totp.timecode(now))
+
+    def get_user_id(self, email):
+        """Return the user_id of the user with the given email."""
+        user = self.authentication_repository.get_user_by_email(email)
+        if not user:
+            raise ValueError(f"No user found with email {email}")
+        return user.get("user_id")
 
-        # Update the last attempt time
-        self.last_attempt_time[email] = current_time
+    def get_totp(self, email):
+        """Return the TOTP of the user's secret, from the cache if possible."""
+        totp = self.totp_cache.get(email)
+        if totp is not None:
+            return totp
 
-        # Search for the user in the 'users' collection by email
-        # user = token_service.get_token(email)
+        # Search for the secrets of the user by email
         user_secrets = self.authentication_repository.get_user_secrets(email)
 
         # Access the authentication token from the user's record
@@ -111,11 +243,11 @@ class AuthenticationService:
         if authentication_token is None:
             raise ValueError("Authentication token not found for this user.")
 
-        # Use the authentication token to verify the 2FA code
         totp = pyotp.TOTP(authentication_token)
-        # print("Expected TOTP code:", totp.now())  # For debugging purposes
-        return totp.verify(code)  # Returns True or False
+        self.totp_cache.set(email, totp)
+        return totp
 
+    @traced("AuthenticationService.check_credentials")
     def check_credentials(self, email, password):
         result = self.authentication_repository.verify(email, password)
         if result:
@@ -126,3 +258,9 @@ class AuthenticationService:
     def get_all_user_secrets(self):
         """Retrieve all user secrets."""
         return self.authentication_repository.get_all_user_secrets()
+
+    def get_user_secrets_page(self, after=None, limit=100):
+        return self.authentication_repository.get_user_secrets_page(after, limit)
+
+    def iter_user_secrets(self, after=None):
+        return self.authentication_repository.iter_user_secrets(after)
@@ -44,3 +44,17 @@ def test_verify_2fa_missing_fields(client):
 
     assert response.status_code == 400
     assert data["error"] == "Email and 2FA code are required"
+
+
+def test_register_bulk_requires_the_admin_token(client, monkeypatch):
+    monkeypatch.setitem(app.config, "ADMIN_TOKEN", "admin-token")
+
+    response = client.post("/register/bulk", json=["a@example.com"])
+    assert response.status_code == 403
+
+    response = client.post(
+        "/register/bulk",
+        json={"email": "a@example.com"},
+        headers={"X-Admin-Token": "admin-token"},
+    )
+    assert response.status_code == 400
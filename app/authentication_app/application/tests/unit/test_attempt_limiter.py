@@ -0,0 +1,88 @@
+"""
+Description: This file contains unit tests for the 2FA attempt limiters and
+the bounded TTL cache they are built on.
+"""
+
+
+import unittest
+from unittest.mock import Mock
+from pymongo.errors import DuplicateKeyError
+from application.utils.attempt_limiter import MemoryAttemptLimiter, MongoAttemptLimiter
+from application.utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(max_size=2, ttl=10, clock=self.clock)
+
+    def test_entries_expire(self):
+        self.cache.set("a", 1)
+        self.clock.now += 9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.clock.now += 1
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("a"), 1)
+
+
+class TestMemoryAttemptLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_one_attempt_per_interval(self):
+        limiter = MemoryAttemptLimiter(2, clock=self.clock)
+
+        self.assertTrue(limiter.allow("user@example.com"))
+        self.assertFalse(limiter.allow("user@example.com"))
+        self.assertTrue(limiter.allow("other@example.com"))
+        self.clock.now += 2
+        self.assertTrue(limiter.allow("user@example.com"))
+
+    def test_burst_of_attempts(self):
+        limiter = MemoryAttemptLimiter(2, burst=3, clock=self.clock)
+
+        self.assertEqual(
+            [limiter.allow("user") for _ in range(4)], [True] * 3 + [False]
+        )
+        self.clock.now += 2
+        self.assertTrue(limiter.allow("user"))
+        self.assertFalse(limiter.allow("user"))
+
+    def test_memory_is_bounded(self):
+        limiter = MemoryAttemptLimiter(2, max_keys=100, clock=self.clock)
+
+        for number in range(1000):
+            limiter.allow(f"user{number}@example.com")
+
+        self.assertEqual(len(limiter._full_at), 100)
+
+
+class TestMongoAttemptLimiter(unittest.TestCase):
+    def test_rejected_attempt_is_a_duplicate_key(self):
+        collection = Mock()
+        limiter = MongoAttemptLimiter(collection, 2)
+
+        self.assertTrue(limiter.allow("user@example.com"))
+        collection.update_one.side_effect = DuplicateKeyError("dup")
+        self.assertFalse(limiter.allow("user@example.com"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Description: This file contains unit tests for the AuthenticationService,
+covering the setup of 2FA in bulk and the cached TOTP secrets.
+"""
+
+
+import pyotp
+import unittest
+from unittest.mock import Mock
+from application.exceptions.email_queue_full_error import EmailQueueFullError
+from application.services.authentication_service import AuthenticationService
+from application.utils.ndjson import iter_ndjson
+from application.utils.ttl_cache import TTLCache
+from application.utils.used_codes import RingBucketUsedCodeStore
+
+
+class TestGenerate2faBulk(unittest.TestCase):
+    def setUp(self):
+        self.authentication_repository = Mock()
+        self.authentication_repository.get_user_ids_by_emails.return_value = {
+            "a@example.com": 1,
+            "b@example.com": 2,
+        }
+        self.authentication_repository.store_new_totp_secrets.side_effect = (
+            lambda secrets: {user_id for user_id, _, _ in secrets}
+        )
+        self.email_queue = Mock()
+        self.authentication_service = AuthenticationService(
+            self.authentication_repository, self.email_queue, qr_code_processes=2
+        )
+        self.addCleanup(self.shutdown_executor)
+
+    def shutdown_executor(self):
+        if self.authentication_service._qr_code_executor:
+            self.authentication_service._qr_code_executor.shutdown()
+
+    def test_secrets_are_stored_in_bulk_and_qr_codes_emailed(self):
+        result = self.authentication_service.generate_2fa_bulk(
+            ["a@example.com", {"email": "b@example.com"}, "unknown@example.com"]
+        )
+
+        self.assertEqual(result["enrolled"], 2)
+        self.assertEqual(
+            result["errors"],
+            [
+                {
+                    "email": "unknown@example.com",
+                    "error": "No user found with email unknown@example.com",
+                }
+            ],
+        )
+
+        (secrets,), _ = self.authentication_repository.store_new_totp_secrets.call_args
+        self.assertEqual([user_id for user_id, _, _ in secrets], [1, 2])
+
+        emailed = [
+            call.args[0]["To"] for call in self.email_queue.submit.call_args_list
+        ]
+        self.assertEqual(emailed, ["a@example.com", "b@example.com"])
+
+    def test_enrolled_users_keep_their_secret(self):
+        self.authentication_repository.store_new_totp_secrets.side_effect = None
+        self.authentication_repository.store_new_totp_secrets.return_value = {2}
+
+        result = self.authentication_service.generate_2fa_bulk(
+            ["a@example.com", "b@example.com"]
+        )
+
+        self.assertEqual(result["enrolled"], 1)
+        self.assertEqual(
+            result["errors"], [{"email": "a@example.com", "error": "Already enrolled"}]
+        )
+        emailed = [
+            call.args[0]["To"] for call in self.email_queue.submit.call_args_list
+        ]
+        self.assertEqual(emailed, ["b@example.com"])
+
+    def test_invalid_json_lines_are_reported(self):
+        result = self.authentication_service.generate_2fa_bulk(
+            iter_ndjson([b'"a@example.com"\n', b"a@example.com\n"])
+        )
+
+        self.assertEqual(result["enrolled"], 1)
+        self.assertEqual(result["errors"][0]["email"], None)
+        self.assertTrue(result["errors"][0]["error"].startswith("Invalid JSON: "))
+
+
+class TestVerify2fa(unittest.TestCase):
+    def setUp(self):
+        self.secret = pyotp.random_base32()
+        self.authentication_repository = Mock()
+        self.authentication_repository.get_user_secrets.return_value = {
+            "user_id": 1,
+            "email": "a@example.com",
+            "authentication_token": self.secret,
+        }
+        self.attempt_limiter = Mock()
+        self.attempt_limiter.allow.return_value = True
+        self.authentication_service = AuthenticationService(
+            self.authentication_repository,
+            Mock(),
+            attempt_limiter=self.attempt_limiter,
+        )
+
+    def test_secrets_are_looked_up_once(self):
+        for _ in range(2):
+            self.authentication_service.verify_2fa("a@example.com", "000000")
+
+        self.authentication_repository.get_user_secrets.assert_called_once_with(
+            "a@example.com"
+        )
+
+    def test_code_can_only_be_used_once(self):
+        code = pyotp.TOTP(self.secret).now()
+
+        self.assertTrue(self.authentication_service.verify_2fa("a@example.com", code))
+        self.assertFalse(self.authentication_service.verify_2fa("a@example.com", code))
+
+    def test_email_that_can_not_be_queued_raises(self):
+        email_queue = Mock()
+        email_queue.submit.return_value = False
+        authentication_service = AuthenticationService(
+            self.authentication_repository, email_queue
+        )
+
+        with self.assertRaises(EmailQueueFullError):
+            authentication_service.generate_2fa("a@example.com")
+
+    def test_configured_totp_cache_is_kept(self):
+        totp_cache = TTLCache(10, 5)
+
+        authentication_service = AuthenticationService(
+            self.authentication_repository, Mock(), totp_cache=totp_cache
+        )
+
+        self.assertIs(authentication_service.totp_cache, totp_cache)
+        self.assertEqual(authentication_service.totp_cache.ttl, 5)
+
+    def test_configured_used_code_store_is_kept(self):
+        used_code_store = RingBucketUsedCodeStore(buckets=3)
+
+        authentication_service = AuthenticationService(
+            self.authentication_repository, Mock(), used_code_store=used_code_store
+        )
+
+        self.assertIs(authentication_service.used_code_store, used_code_store)
+
+    def test_new_secret_invalidates_the_cached_totp(self):
+        self.authentication_service.get_totp("a@example.com")
+        self.authentication_service.generate_2fa("a@example.com")
+        self.authentication_service.get_totp("a@example.com")
+
+        self.assertEqual(self.authentication_repository.get_user_secrets.call_count, 2)
+
+    def test_user_id_is_the_one_of_the_email(self):
+        self.authentication_repository.get_user_by_email.return_value = {
+            "user_id": 1,
+            "email": "a@example.com",
+        }
+
+        self.assertEqual(self.authentication_service.get_user_id("a@example.com"), 1)
+
+    def test_unknown_email_has_no_user_id(self):
+        self.authentication_repository.get_user_by_email.return_value = None
+
+        with self.assertRaises(ValueError):
+            self.authentication_service.get_user_id("a@example.com")
+
+    def test_missing_secrets_are_not_cached(self):
+        self.authentication_repository.get_user_secrets.side_effect = ValueError(
+            "No user found with email a@example.com"
+        )
+
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                self.authentication_service.verify_2fa("a@example.com", "123456")
+        self.assertEqual(self.authentication_repository.get_user_secrets.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
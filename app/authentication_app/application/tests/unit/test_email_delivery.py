@@ -0,0 +1,96 @@
+"""
+Description: This file contains unit tests for the background email delivery:
+retries with backoff, dead-lettering and the bounded queue.
+"""
+
+
+import threading
+import time
+import unittest
+from email.mime.text import MIMEText
+from application.utils.email_delivery import EmailDeliveryQueue
+
+
+class FakeMailer:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.sent = []
+        self.closed = 0
+
+    def send(self, message):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("SMTP server unavailable")
+        self.sent.append(message["To"])
+
+    def close(self):
+        self.closed += 1
+
+
+def message(to):
+    msg = MIMEText("body")
+    msg["To"] = to
+    return msg
+
+
+class TestEmailDeliveryQueue(unittest.TestCase):
+    def create_queue(self, mailer, **kwargs):
+        email_queue = EmailDeliveryQueue(
+            lambda: mailer, workers=1, retry_backoff=0, **kwargs
+        )
+        self.addCleanup(email_queue.stop)
+        return email_queue
+
+    def test_emails_are_delivered_by_the_workers(self):
+        mailer = FakeMailer()
+        email_queue = self.create_queue(mailer)
+
+        email_queue.submit(message("a@example.com"))
+        email_queue.submit(message("b@example.com"))
+        email_queue.join()
+
+        self.assertEqual(mailer.sent, ["a@example.com", "b@example.com"])
+        self.assertEqual(email_queue.stats()["sent"], 2)
+
+    def test_failed_delivery_is_retried(self):
+        mailer = FakeMailer(failures=2)
+        email_queue = self.create_queue(mailer, max_attempts=3)
+
+        email_queue.submit(message("a@example.com"))
+        email_queue.join()
+
+        self.assertEqual(mailer.sent, ["a@example.com"])
+        self.assertEqual(email_queue.stats()["retried"], 2)
+
+    def test_undeliverable_email_is_dead_lettered(self):
+        mailer = FakeMailer(failures=5)
+        email_queue = self.create_queue(mailer, max_attempts=2)
+
+        email_queue.submit(message("a@example.com"))
+        email_queue.join()
+
+        self.assertEqual(mailer.sent, [])
+        self.assertEqual(email_queue.stats()["failed"], 1)
+        self.assertEqual(email_queue.dead_letters[0]["message"]["To"], "a@example.com")
+
+    def test_full_queue_dead_letters_instead_of_blocking(self):
+        release = threading.Event()
+        mailer = FakeMailer()
+        mailer.send = lambda message: release.wait()
+        email_queue = self.create_queue(mailer, max_queue_size=1)
+
+        # The first email keeps the worker busy and the second fills the queue.
+        email_queue.submit(message("a@example.com"))
+        while email_queue.stats()["queued"]:
+            time.sleep(0.001)
+        self.assertTrue(email_queue.submit(message("b@example.com")))
+        self.assertFalse(email_queue.submit(message("c@example.com")))
+        release.set()
+        email_queue.join()
+
+        self.assertEqual(len(email_queue.dead_letters), 1)
+        self.assertEqual(email_queue.dead_letters[0]["message"]["To"], "c@example.com")
+
+
+if __name__ == "__main__":
+    unittest.main()
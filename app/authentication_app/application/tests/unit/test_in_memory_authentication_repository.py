@@ -0,0 +1,71 @@
+"""
+Description: This file contains unit tests for the in-memory authentication
+repository, checking that 2FA works with it like with MongoDB.
+"""
+
+
+import unittest
+import pyotp
+from application.repositories.in_memory_authentication_repository import (
+    InMemoryAuthenticationRepository,
+)
+from application.services.authentication_service import AuthenticationService
+
+EMAIL = "citizen@example.com"
+
+
+class TestInMemoryAuthenticationRepository(unittest.TestCase):
+    def setUp(self):
+        self.repository = InMemoryAuthenticationRepository()
+        self.repository.store_user({"user_id": 1, "email": EMAIL, "password": "pass"})
+
+    def test_secrets_are_found_by_email(self):
+        self.repository.store_totp_secret(EMAIL, "SECRET")
+
+        self.assertEqual(
+            self.repository.get_user_secrets(EMAIL),
+            {
+                "user_id": 1,
+                "email": EMAIL,
+                "authentication_token": "SECRET",
+                "bearer_token": "",
+            },
+        )
+
+    def test_missing_secrets_raise(self):
+        with self.assertRaises(ValueError):
+            self.repository.get_user_secrets(EMAIL)
+
+    def test_verify_2fa(self):
+        secret = pyotp.random_base32()
+        self.repository.store_totp_secret(EMAIL, secret)
+        authentication_service = AuthenticationService(self.repository, None)
+
+        self.assertTrue(
+            authentication_service.verify_2fa(EMAIL, pyotp.TOTP(secret).now())
+        )
+
+    def test_new_secrets_do_not_replace_existing_ones(self):
+        self.repository.store_totp_secret(EMAIL, "SECRET")
+        self.repository.store_user(
+            {"user_id": 2, "email": "other@example.com", "password": "pass"}
+        )
+
+        stored = self.repository.store_new_totp_secrets(
+            [(1, EMAIL, "NEW"), (2, "other@example.com", "OTHER")]
+        )
+
+        self.assertEqual(stored, {2})
+        self.assertEqual(
+            self.repository.get_user_secrets(EMAIL)["authentication_token"], "SECRET"
+        )
+
+    def test_user_ids_by_emails(self):
+        self.assertEqual(
+            self.repository.get_user_ids_by_emails([EMAIL, "other@example.com"]),
+            {EMAIL: 1},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""
+Description: This file contains unit tests for the in-memory QR code rendering.
+"""
+
+
+import io
+import unittest
+from PIL import Image
+from application.utils.qr_code import render_qr_code
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+URI = "otpauth://totp/ElectEU:citizen%40example.com?secret=JBSWY3DPEHPK3PXP"
+
+
+class TestRenderQrCode(unittest.TestCase):
+    def test_renders_a_1_bit_png(self):
+        qr_code = render_qr_code(URI)
+
+        self.assertTrue(qr_code.startswith(PNG_SIGNATURE))
+        self.assertEqual(Image.open(io.BytesIO(qr_code)).mode, "1")
+
+    def test_compact_qr_code_is_smaller(self):
+        self.assertLess(
+            len(render_qr_code(URI, compact=True)), len(render_qr_code(URI))
+        )
+
+    def test_compact_qr_code_keeps_a_4_module_quiet_zone(self):
+        image = Image.open(io.BytesIO(render_qr_code(URI, compact=True)))
+
+        # 4 modules of 4 pixels on every side.
+        quiet_zone = image.crop((0, 0, image.width, 16)).getextrema()
+        self.assertEqual(quiet_zone, (255, 255))
+        self.assertEqual(image.crop((0, 0, 17, image.height)).getextrema()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
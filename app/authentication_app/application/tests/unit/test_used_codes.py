@@ -0,0 +1,51 @@
+"""
+Description: This file contains unit tests for the stores of used 2FA codes.
+"""
+
+
+import unittest
+from unittest.mock import Mock
+from pymongo.errors import DuplicateKeyError
+from application.utils.used_codes import MongoUsedCodeStore, RingBucketUsedCodeStore
+
+
+class TestRingBucketUsedCodeStore(unittest.TestCase):
+    def setUp(self):
+        self.store = RingBucketUsedCodeStore()
+
+    def test_code_is_used_once_per_time_step(self):
+        self.assertTrue(self.store.mark_used("a@example.com", 100))
+        self.assertFalse(self.store.mark_used("a@example.com", 100))
+        self.assertTrue(self.store.mark_used("b@example.com", 100))
+        self.assertTrue(self.store.mark_used("a@example.com", 101))
+
+    def test_expired_time_steps_are_forgotten(self):
+        for user in range(1000):
+            self.store.mark_used(user, 100)
+        self.store.mark_used(0, 101)
+        self.store.mark_used(0, 102)
+
+        self.assertEqual(len(self.store), 2)
+
+    def test_time_step_older_than_the_window_is_rejected(self):
+        self.store.mark_used("a@example.com", 102)
+
+        self.assertFalse(self.store.mark_used("b@example.com", 100))
+
+
+class TestMongoUsedCodeStore(unittest.TestCase):
+    def test_replayed_code_is_a_duplicate_key(self):
+        collection = Mock()
+        store = MongoUsedCodeStore(collection)
+
+        self.assertTrue(store.mark_used("a@example.com", 100))
+        document = collection.insert_one.call_args.args[0]
+        self.assertEqual(document["_id"], "a@example.com:100")
+        self.assertEqual(document["expires_at"].timestamp(), 102 * 30)
+
+        collection.insert_one.side_effect = DuplicateKeyError("dup")
+        self.assertFalse(store.mark_used("a@example.com", 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
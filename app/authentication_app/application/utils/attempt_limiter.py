@@ -0,0 +1,85 @@
+"""
+Description: This file contains the limiters of 2FA verification attempts.
+Both limiters implement a token bucket with the generic cell rate algorithm:
+every key only stores the time at which its bucket will be full again, so a
+check is O(1) and state can be evicted as soon as that time has passed.
+- MemoryAttemptLimiter keeps the state of the process in a bounded TTL cache.
+- MongoAttemptLimiter keeps it in a TTL-indexed collection shared by every
+  worker, so running more workers does not multiply the attempt budget.
+"""
+
+
+import threading
+import time
+from pymongo.errors import DuplicateKeyError
+from .ttl_cache import TTLCache
+
+
+class MemoryAttemptLimiter:
+    def __init__(self, interval, burst=1, max_keys=100000, clock=time.monotonic):
+        # One attempt is allowed every `interval` seconds, and up to `burst`
+        # attempts at once after a quiet period.
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+        # key -> time at which its bucket is full again, evicted at that time.
+        self._full_at = TTLCache(max_keys, interval * burst, clock=clock)
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        """Record an attempt for `key` and return whether it is allowed."""
+        # Concurrent attempts of the same key must not both be allowed.
+        with self._lock:
+            now = self.clock()
+            full_at = max(self._full_at.get(key, now), now)
+
+            if full_at - now > self.interval * (self.burst - 1):
+                return False
+
+            full_at += self.interval
+            self._full_at.set(key, full_at, ttl=full_at - now)
+            return True
+
+
+class MongoAttemptLimiter:
+    def __init__(self, collection, interval, burst=1, clock=time.time):
+        self.collection = collection
+        self.interval = interval
+        self.burst = burst
+        self.clock = clock
+
+    def allow(self, key):
+        """Record an attempt for `key` and return whether it is allowed."""
+        now = self.clock()
+        try:
+            # Matches only if an attempt is allowed. Otherwise the upsert tries
+            # to insert a second document with the same _id and fails, so the
+            # check and the update are a single atomic round trip.
+            self.collection.update_one(
+                {
+                    "_id": key,
+                    "full_at": {"$lte": now + self.interval * (self.burst - 1)},
+                },
+                [
+                    {
+                        "$set": {
+                            "full_at": {
+                                "$add": [
+                                    {"$max": [{"$ifNull": ["$full_at", now]}, now]},
+                                    self.interval,
+                                ]
+                            }
+                        }
+                    },
+                    # The TTL index removes the document once the bucket is full.
+                    {
+                        "$set": {
+                            "expires_at": {"$toDate": {"$multiply": ["$full_at", 1000]}}
+                        }
+                    },
+                ],
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return False
+        return True
@@ -1,12 +1,14 @@
 """
 Description: This file contains decorators for route access control in a authentication
 application. The `login_required` decorator ensures that a user is logged in, while the
-admin_required` decorator ensures that the logged-in user has admin privileges.
+admin_required` decorator ensures that the logged-in user has admin privileges. The
+`admin_token_required` decorator requires the ADMIN_TOKEN in the X-Admin-Token header.
 
 """
 
 
-from flask import jsonify
+import hmac
+from flask import current_app, jsonify, request
 
 # from flask_login import current_user
 from functools import wraps
@@ -30,3 +32,26 @@ def admin_required(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+
+def admin_token_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        admin_token = current_app.config.get("ADMIN_TOKEN")
+        token = request.headers.get("X-Admin-Token")
+        if not admin_token or not token or not hmac.compare_digest(token, admin_token):
+            return jsonify({"error": "Access denied. Admins only."}), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+
+def profile_token_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        profiler = current_app.extensions.get("profiler")
+        if not profiler or not profiler.has_valid_token():
+            return jsonify({"error": "Access denied. Admins only."}), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
@@ -0,0 +1,213 @@
+"""
+Description: This file contains the background delivery of outgoing emails.
+Emails are put on a bounded queue and sent by a pool of worker threads, each
+keeping its own SMTP connection open between emails. Failed deliveries are
+retried with an exponential backoff, and emails that can not be delivered end
+up in a bounded dead-letter list.
+"""
+
+
+import collections
+import contextvars
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from .tracing import SPAN_KIND_CLIENT, traced
+
+logger = logging.getLogger(__name__)
+
+
+class SmtpMailer:
+    """Sends emails over a single SMTP connection that is reused between emails."""
+
+    def __init__(
+        self,
+        host,
+        port,
+        username=None,
+        password=None,
+        use_ssl=True,
+        sender=None,
+        timeout=10,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.sender = sender
+        self.timeout = timeout
+        self._connection = None
+
+    @traced("smtp send", SPAN_KIND_CLIENT)
+    def send(self, message):
+        if self.sender and "From" not in message:
+            message["From"] = self.sender
+
+        try:
+            self._send(message)
+        except smtplib.SMTPServerDisconnected:
+            # The server closed the idle connection, reconnect once.
+            self.close()
+            self._send(message)
+
+    def close(self):
+        if self._connection is None:
+            return
+        try:
+            self._connection.quit()
+        except OSError:
+            # Covers smtplib.SMTPException, the connection is dropped anyway.
+            pass
+        self._connection = None
+
+    def _send(self, message):
+        if self._connection is None:
+            self._connection = self._connect()
+        self._connection.send_message(message)
+
+    def _connect(self):
+        if self.use_ssl:
+            connection = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            connection = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.username:
+            connection.login(self.username, self.password)
+        return connection
+
+
+class EmailDeliveryQueue:
+    def __init__(
+        self,
+        mailer_factory,
+        workers=2,
+        max_queue_size=10000,
+        max_attempts=5,
+        retry_backoff=1.0,
+        dead_letter_size=1000,
+    ):
+        # Called once per worker thread, so every worker owns its connection.
+        self.mailer_factory = mailer_factory
+        self.workers = workers
+        self.max_queue_size = max_queue_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.dead_letters = collections.deque(maxlen=dead_letter_size)
+
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._threads = []
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def submit(self, message, block=False):
+        """Queue an email for delivery without waiting for it to be sent.
+
+        When the queue is full the email is dead-lettered, unless `block` is
+        set, in which case the caller waits for room in the queue. Returns
+        whether the email was queued.
+        """
+        self._ensure_started()
+        try:
+            # Sent in the context of the caller, so it joins the caller's trace.
+            self._queue.put((message, contextvars.copy_context()), block=block)
+        except queue.Full:
+            self._dead_letter(message, "The delivery queue is full.")
+            return False
+        return True
+
+    def join(self):
+        """Wait until every queued email has been delivered or dead-lettered."""
+        self._queue.join()
+
+    def stop(self, timeout=None):
+        """Deliver the queued emails and stop the workers."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+            self._pid = None
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dead_letters": len(self.dead_letters),
+        }
+
+    def _ensure_started(self):
+        # The workers are started by the first email of every process, so a
+        # queue created before a pre-fork server forks still works in each worker.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._threads = [
+                threading.Thread(
+                    target=self._work, name=f"email-delivery-{number}", daemon=True
+                )
+                for number in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = os.getpid()
+
+    def _work(self):
+        mailer = self.mailer_factory()
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        return
+                    message, context = item
+                    context.run(self._deliver, mailer, message)
+                finally:
+                    self._queue.task_done()
+        finally:
+            mailer.close()
+
+    def _deliver(self, mailer, message):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                mailer.send(message)
+                with self._stats_lock:
+                    self.sent += 1
+                return
+            except Exception as e:
+                error = e
+                # Start the next attempt from a fresh connection.
+                mailer.close()
+
+            if attempt < self.max_attempts:
+                with self._stats_lock:
+                    self.retried += 1
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        self._dead_letter(message, str(error))
+
+    def _dead_letter(self, message, error):
+        logger.error("Failed to send an email to %s: %s", message["To"], error)
+        with self._stats_lock:
+            self.failed += 1
+        # The message is kept so that it can be inspected or submitted again.
+        self.dead_letters.append(
+            {"message": message, "error": error, "failed_at": time.time()}
+        )
@@ -0,0 +1,463 @@
+"""
+Description: This file contains the metrics of the application, exposed in the
+Prometheus text format on GET /metrics:
+- the latency, status and in-flight requests of every route,
+- the duration of the MongoDB commands, per collection and command,
+- the time requests wait for a connection of the MongoDB pool,
+- the counters of the caches and queues of the application.
+Recording a value takes no lock, so the metrics can stay on at peak load:
+every thread counts into its own preallocated shard, and the shards are only
+summed when the metrics are read. The shard of a thread that exits is folded
+into the retired values of the metric, so servers starting a thread per
+request do not keep one shard per thread that ever existed.
+
+Every gunicorn worker has its own metrics. When METRICS_DIR is set, every
+worker writes them to a file of that directory and /metrics reports the sum
+over all the files, whichever worker answers it.
+"""
+
+
+import bisect
+import json
+import os
+import threading
+import time
+import weakref
+from flask import g, request
+from pymongo import monitoring
+
+# Upper bounds, in seconds, of the latency buckets.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+# Seconds between two writes of the metrics of a worker to METRICS_DIR.
+WRITE_INTERVAL = 5.0
+
+
+class _ThreadExit:
+    """Freed with the thread-local data of its thread, when the thread exits."""
+
+
+class Metric:
+    """A metric whose values are kept per thread and per label values."""
+
+    type = None
+
+    def __init__(self, name, documentation, label_names=(), size=1):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        # Number of values kept per label values.
+        self.size = size
+
+        self._local = threading.local()
+        # id -> shard of every live thread that recorded a value
+        self._shards = {}
+        # Summed values of the threads that exited.
+        self._retired = {}
+        self._lock = threading.Lock()
+
+    def _values(self, labels):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            # Taken once per thread, recording a value never locks.
+            shard = self._local.shard = {}
+            self._local.thread_exit = thread_exit = _ThreadExit()
+            finalizer = weakref.finalize(thread_exit, self._retire, shard)
+            finalizer.atexit = False
+            with self._lock:
+                self._shards[id(shard)] = shard
+
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = [0] * self.size
+        return values
+
+    def _retire(self, shard):
+        """Fold the shard of an exited thread into the retired values."""
+        with self._lock:
+            del self._shards[id(shard)]
+            for labels, values in shard.items():
+                retired = self._retired.setdefault(labels, [0] * self.size)
+                for index, value in enumerate(values):
+                    retired[index] += value
+
+    def collect(self):
+        """Return the values summed over every thread, by label values."""
+        with self._lock:
+            shards = list(self._shards.values())
+            totals = {labels: list(values) for labels, values in self._retired.items()}
+
+        for shard in shards:
+            for labels, values in list(shard.items()):
+                total = totals.setdefault(labels, [0] * self.size)
+                for index, value in enumerate(values):
+                    total[index] += value
+        return totals
+
+    def samples(self, values):
+        """Return the (suffix, extra labels, value) samples of one series."""
+        return [("", (), values[0])]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount=1):
+        self._values(labels)[0] += amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount=1):
+        self._values(labels)[0] += amount
+
+    def dec(self, *labels, amount=1):
+        self._values(labels)[0] -= amount
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        # One count per bucket and for +Inf, followed by the sum.
+        super().__init__(name, documentation, label_names, len(buckets) + 2)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        values = self._values(labels)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def samples(self, values):
+        samples = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), values):
+            cumulative += count
+            samples.append(("_bucket", (("le", str(bound)),), cumulative))
+        samples.append(("_sum", (), values[-1]))
+        samples.append(("_count", (), cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        # name -> (function returning a dict of numbers, keys reported)
+        self.stats = {}
+
+    def counter(self, name, documentation, label_names=()):
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name, documentation, label_names=()):
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name, documentation, label_names=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def register_stats(self, name, stats, keys):
+        """Report `keys` of the dict returned by `stats` as `<name>_<key>`."""
+        self.stats[name] = (stats, tuple(keys))
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        """Return the current values as a JSON-serializable dict."""
+        snapshot = {
+            name: [
+                [list(labels), values] for labels, values in metric.collect().items()
+            ]
+            for name, metric in self.metrics.items()
+        }
+        for name, (stats, keys) in self.stats.items():
+            values = stats()
+            for key in keys:
+                snapshot[f"{name}_{key}"] = [[[], [values[key]]]]
+        return snapshot
+
+    def render(self, snapshots):
+        """Render the sum of the snapshots in the Prometheus text format.
+
+        Every snapshot is a (snapshot, alive) pair. Gauges and stats are only
+        summed over the snapshots of live processes, counters and histograms
+        also keep the counts of the workers that exited.
+        """
+        lines = []
+        for name, metric in self.metrics.items():
+            totals = merge(snapshots, name, metric.size, metric.type != "gauge")
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for labels, values in sorted(totals.items()):
+                label_pairs = tuple(zip(metric.label_names, labels))
+                for suffix, extra, value in metric.samples(values):
+                    lines.append(
+                        f"{name}{suffix}{format_labels(label_pairs + extra)} {value}"
+                    )
+
+        for name, (_, keys) in self.stats.items():
+            for key in keys:
+                totals = merge(snapshots, f"{name}_{key}", 1, False)
+                lines.append(f"# TYPE {name}_{key} untyped")
+                for values in totals.values():
+                    lines.append(f"{name}_{key} {values[0]}")
+        return "\n".join(lines) + "\n"
+
+
+def merge(snapshots, name, size, include_exited):
+    totals = {}
+    for snapshot, alive in snapshots:
+        if not alive and not include_exited:
+            continue
+        for labels, values in snapshot.get(name, []):
+            total = totals.setdefault(tuple(labels), [0] * size)
+            for index, value in enumerate(values):
+                total[index] += value
+    return totals
+
+
+def format_labels(label_pairs):
+    if not label_pairs:
+        return ""
+    labels = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in label_pairs
+    )
+    return "{" + labels + "}"
+
+
+def escape_label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def is_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsFileWriter:
+    """Writes the metrics of this process to `<directory>/<pid>.json`."""
+
+    def __init__(self, registry, directory, interval=WRITE_INTERVAL):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        # Started by the first request of every process, like the other
+        # background threads, so every gunicorn worker writes its own file.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            os.makedirs(self.directory, exist_ok=True)
+            threading.Thread(
+                target=self._run, name="metrics-writer", daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+    def write(self):
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        # Written next to the file and renamed, so readers never see half of it.
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(self.registry.snapshot(), file)
+        os.replace(f"{path}.tmp", path)
+
+    def read_all(self):
+        """Write the metrics of this process and return every (snapshot, alive)."""
+        self.write()
+
+        snapshots = []
+        for file_name in os.listdir(self.directory):
+            pid, extension = os.path.splitext(file_name)
+            if extension != ".json" or not pid.isdigit():
+                continue
+            try:
+                with open(os.path.join(self.directory, file_name)) as file:
+                    snapshots.append((json.load(file), is_alive(int(pid))))
+            except (OSError, ValueError):
+                continue
+        return snapshots
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                pass
+
+
+registry = MetricsRegistry()
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Time to answer a request, per route.",
+    ("method", "route"),
+)
+requests_total = registry.counter(
+    "http_requests_total",
+    "Answered requests, per route and status code.",
+    ("method", "route", "status"),
+)
+requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "Requests being answered."
+)
+mongodb_command_duration = registry.histogram(
+    "mongodb_command_duration_seconds",
+    "Duration of the MongoDB commands, per collection and command.",
+    ("collection", "command"),
+)
+mongodb_command_failures = registry.counter(
+    "mongodb_command_failures_total",
+    "Failed MongoDB commands, per collection and command.",
+    ("collection", "command"),
+)
+mongodb_pool_wait = registry.histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time waited for a connection of the MongoDB connection pool.",
+)
+mongodb_connections_checked_out = registry.gauge(
+    "mongodb_pool_connections_checked_out",
+    "Connections of the MongoDB connection pool in use.",
+)
+
+
+def command_collection(event):
+    """Return the collection of a started MongoDB command, "" if it has none."""
+    collection = event.command.get(event.command_name)
+    if event.command_name == "getMore":
+        collection = event.command.get("collection")
+    return collection if isinstance(collection, str) else ""
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Records the duration of every MongoDB command."""
+
+    def __init__(self):
+        # (connection, request id) -> collection of the running commands
+        self._collections = {}
+
+    def started(self, event):
+        key = (event.connection_id, event.request_id)
+        self._collections[key] = command_collection(event)
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        mongodb_command_duration.observe(
+            event.duration_micros / 1e6, collection, event.command_name
+        )
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        mongodb_command_duration.observe(
+            event.duration_micros / 1e6, collection, event.command_name
+        )
+        mongodb_command_failures.inc(collection, event.command_name)
+
+
+class PoolTimingListener(monitoring.ConnectionPoolListener):
+    """Records how long threads wait for a connection of the pool."""
+
+    def __init__(self):
+        # A checkout starts and ends in the thread that needs the connection.
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.start = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        mongodb_pool_wait.observe(time.perf_counter() - self._local.start)
+        mongodb_connections_checked_out.inc()
+
+    def connection_check_out_failed(self, event):
+        mongodb_pool_wait.observe(time.perf_counter() - self._local.start)
+
+    def connection_checked_in(self, event):
+        mongodb_connections_checked_out.dec()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+
+def mongo_event_listeners():
+    """Listeners to pass to the MongoDB client as `event_listeners`."""
+    return [CommandTimingListener(), PoolTimingListener()]
+
+
+def instrument_app(app, writer=None):
+    """Record the latency, status and in-flight requests of every route."""
+
+    @app.before_request
+    def start_request_metrics():
+        if writer:
+            writer.ensure_started()
+        g.metrics_start = time.perf_counter()
+        requests_in_flight.inc()
+
+    @app.after_request
+    def record_request_metrics(response):
+        start = g.get("metrics_start")
+        if start is not None:
+            # The rule keeps the number of routes bounded, unlike the path.
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            request_duration.observe(time.perf_counter() - start, request.method, route)
+            requests_total.inc(request.method, route, str(response.status_code))
+        return response
+
+    @app.teardown_request
+    def end_request_metrics(exception):
+        if g.pop("metrics_start", None) is not None:
+            requests_in_flight.dec()
+
+
+def render_metrics(writer=None):
+    """Return the metrics of this process, or of every worker with a writer."""
+    if writer:
+        return registry.render(writer.read_all())
+    return registry.render([(registry.snapshot(), True)])
@@ -0,0 +1,239 @@
+"""
+Description: This file contains the logging of the application. Records are
+written to stdout as JSON lines, one object per record, by a QueueListener
+thread: the request threads only put the records on a queue, so they never
+wait for the output. Every record carries:
+- the service, logger, level and message,
+- the id of the request it was logged in (the X-Request-ID header, or a new
+  one) and the id of its trace, when tracing is enabled,
+- the extra fields passed with `extra=`, and the traceback of exceptions.
+Levels are set for the root logger (LOG_LEVEL) and per module (LOG_LEVELS).
+Warnings and errors logged again and again with the same message, e.g. while
+the SMTP server is down, are rate limited per message, and the next record
+let through reports how many were suppressed.
+"""
+
+
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from flask import g, request
+from .tracing import current_trace_id
+
+REQUEST_ID_HEADER = "X-Request-ID"
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+# Messages kept by the rate limiter, the least recently logged are forgotten.
+RATE_LIMIT_MAX_KEYS = 1000
+
+# Attributes of every LogRecord, the others were passed with `extra=`.
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_request_id = contextvars.ContextVar("request_id", default=None)
+_lock = threading.Lock()
+_configured_pid = None
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+    """Adds the service, request id and trace id to every record."""
+
+    def __init__(self, service_name):
+        super().__init__()
+        self.service_name = service_name
+
+    def filter(self, record):
+        # Run in the thread that logs, where the ids of its request are known.
+        record.service = self.service_name
+        record.request_id = _request_id.get()
+        record.trace_id = current_trace_id()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through `burst` records per `interval` seconds for each message.
+
+    Only records of `level` and above are limited, a message is identified by
+    its logger and format string, not by its arguments.
+    """
+
+    def __init__(self, interval=60.0, burst=10, level=logging.WARNING):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.level = level
+        # (logger, message) -> [window start, records logged, suppressed]
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if self.burst <= 0 or record.levelno < self.level:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.pop(key, None)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                window = [now, 0, suppressed]
+            # Re-inserted, so the dict stays ordered from least recently used.
+            self._windows[key] = window
+            if len(self._windows) > RATE_LIMIT_MAX_KEYS:
+                del self._windows[next(iter(self._windows))]
+
+            if window[1] >= self.burst:
+                window[2] += 1
+                return False
+            window[1] += 1
+            suppressed, window[2] = window[2], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queues the records, dropping them instead of waiting when it is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Keeps the fields of the record, unlike QueueHandler.prepare, which
+        # merges everything into the message. The arguments and traceback are
+        # rendered here because they may not be picklable or thread-safe.
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc
+            ).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "service": getattr(record, "service", None),
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+            "trace_id": getattr(record, "trace_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(levels):
+    """Return the levels of `module=LEVEL,...` as a dict."""
+    parsed = {}
+    for item in levels.split(","):
+        if item.strip():
+            name, _, level = item.partition("=")
+            parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+
+def configure_logging(config, service_name, stream=None):
+    """Send the records of this process to stdout through a QueueListener.
+
+    Configured once per process, the later calls return the same handler.
+    """
+    global _configured_pid
+
+    with _lock:
+        root = logging.getLogger()
+        if _configured_pid == os.getpid():
+            return next(
+                handler
+                for handler in root.handlers
+                if isinstance(handler, NonBlockingQueueHandler)
+            )
+
+        log_queue = queue.Queue(maxsize=config["LOG_QUEUE_SIZE"])
+        handler = NonBlockingQueueHandler(log_queue)
+        handler.addFilter(ContextFilter(service_name))
+        handler.addFilter(
+            RateLimitFilter(
+                config["LOG_RATE_LIMIT_INTERVAL"], config["LOG_RATE_LIMIT_BURST"]
+            )
+        )
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter())
+        listener = logging.handlers.QueueListener(
+            log_queue, output, respect_handler_level=True
+        )
+        listener.start()
+        # The records still queued are written when the process exits.
+        atexit.register(listener.stop)
+
+        for existing in [
+            existing
+            for existing in root.handlers
+            if isinstance(existing, NonBlockingQueueHandler)
+        ]:
+            # Left by the parent of a forked process, its thread is gone.
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(config["LOG_LEVEL"].upper())
+        for name, level in parse_levels(config["LOG_LEVELS"]).items():
+            logging.getLogger(name).setLevel(level)
+
+        _configured_pid = os.getpid()
+        return handler
+
+
+def install_request_ids(app):
+    """Give every request an id, logged with its records and returned."""
+
+    @app.before_request
+    def set_request_id():
+        request_id = request.headers.get(REQUEST_ID_HEADER, "")
+        if not REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+        g.request_id_token = _request_id.set(request_id)
+
+    @app.after_request
+    def add_request_id(response):
+        request_id = _request_id.get()
+        if request_id:
+            response.headers[REQUEST_ID_HEADER] = request_id
+        return response
+
+    @app.teardown_request
+    def reset_request_id(exception):
+        token = g.pop("request_id_token", None)
+        if token:
+            _request_id.reset(token)
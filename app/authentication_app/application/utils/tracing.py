@@ -0,0 +1,394 @@
+"""
+Description: This file contains the lightweight tracing of requests across the
+services. A trace is identified by the W3C `traceparent` header of a request,
+or by the `trace_id` claim of its JWT, which the authentication service adds
+when it issues the token, so the vote of a voter joins the trace of their 2FA
+verification. Spans are recorded for:
+- every request (its controller), with the route and status code,
+- the service methods and helpers decorated with `traced`,
+- every MongoDB command, from a pymongo CommandListener.
+Finished spans are exported in batches by a background thread, as JSON lines
+to a file or as OTLP/JSON to a collector. When tracing is disabled nothing is
+installed and `traced` functions only check that there is no current span.
+"""
+
+
+import contextvars
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+import jwt
+from flask import g, request
+from pymongo import monitoring
+from .metrics import command_collection
+
+TRACEPARENT_HEADER = "traceparent"
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+TRACE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+# Span kinds, as numbered by OTLP.
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# Spans waiting to be exported, newer spans are dropped when it is full.
+EXPORT_QUEUE_SIZE = 10000
+EXPORT_BATCH_SIZE = 512
+# Seconds between two exports of the spans of a process.
+EXPORT_INTERVAL = 1.0
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def current_span():
+    return _current_span.get()
+
+
+def current_trace_id():
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def random_id(size):
+    return os.urandom(size).hex()
+
+
+class Span:
+    def __init__(self, tracer, name, trace_id, parent_id, kind, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random_id(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.error = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def child(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        return Span(
+            self.tracer, name, self.trace_id, self.span_id, kind, attributes or {}
+        )
+
+    def end(self, error=None):
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.tracer.export(self)
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_json(self):
+        return {
+            "service": self.tracer.service_name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Tracer:
+    def __init__(self, service_name, exporter, sample_ratio=1.0):
+        self.service_name = service_name
+        self.exporter = exporter
+        # Share of the new traces that are recorded.
+        self.sample_ratio = sample_ratio
+        self.dropped = 0
+
+        self._queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start_trace(self, name, trace_id=None, parent_id=None, attributes=None):
+        """Start the root span of this service, in a new or an existing trace."""
+        return Span(
+            self,
+            name,
+            trace_id or random_id(16),
+            parent_id,
+            SPAN_KIND_SERVER,
+            attributes or {},
+        )
+
+    def export(self, span):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self):
+        # Started by the first span of every process, like the other
+        # background threads.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+            threading.Thread(
+                target=self._run, name="span-exporter", daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            spans = [self._queue.get()]
+            deadline = time.monotonic() + EXPORT_INTERVAL
+            while len(spans) < EXPORT_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    spans.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                self.exporter.export(spans)
+            except Exception:
+                # Tracing must never break the service, the batch is lost.
+                self.dropped += len(spans)
+
+
+class FileSpanExporter:
+    """Appends the spans as JSON lines to a file shared by every worker."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def export(self, spans):
+        data = "".join(json.dumps(span.to_json()) + "\n" for span in spans)
+        # A single append, so the lines of several workers never interleave.
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+class OtlpSpanExporter:
+    """Posts the spans as OTLP/JSON to a collector, e.g. /v1/traces."""
+
+    def __init__(self, endpoint, timeout=2.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, spans):
+        body = json.dumps(
+            {
+                "resourceSpans": [
+                    {
+                        "resource": {
+                            "attributes": [
+                                otlp_attribute(
+                                    "service.name", spans[0].tracer.service_name
+                                )
+                            ]
+                        },
+                        "scopeSpans": [
+                            {
+                                "scope": {"name": "electeu"},
+                                "spans": [otlp_span(span) for span in spans],
+                            }
+                        ],
+                    }
+                ]
+            }
+        ).encode("utf-8")
+        http_request = urllib.request.Request(
+            self.endpoint,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(http_request, timeout=self.timeout) as response:
+            response.read()
+
+
+def otlp_span(span):
+    otlp = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [
+            otlp_attribute(key, value) for key, value in span.attributes.items()
+        ],
+        # 1 is OK and 2 is ERROR.
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id:
+        otlp["parentSpanId"] = span.parent_id
+    return otlp
+
+
+def otlp_attribute(key, value):
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def traced(name, kind=SPAN_KIND_INTERNAL):
+    """Record a span for every call made within a trace."""
+
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            parent = _current_span.get()
+            if parent is None:
+                return f(*args, **kwargs)
+
+            span = parent.child(name, kind)
+            token = _current_span.set(span)
+            try:
+                result = f(*args, **kwargs)
+            except BaseException as e:
+                span.end(e)
+                raise
+            finally:
+                _current_span.reset(token)
+            span.end()
+            return result
+
+        return decorated_function
+
+    return decorator
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """Records a span for every MongoDB command sent within a trace."""
+
+    def __init__(self):
+        # (connection, request id) -> span of the running commands
+        self._spans = {}
+
+    def started(self, event):
+        parent = _current_span.get()
+        if parent is None:
+            return
+
+        span = parent.child(
+            f"mongodb {event.command_name}",
+            SPAN_KIND_CLIENT,
+            {
+                "db.system": "mongodb",
+                "db.operation": event.command_name,
+                "db.mongodb.collection": command_collection(event),
+            },
+        )
+        self._spans[(event.connection_id, event.request_id)] = span
+
+    def succeeded(self, event):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span:
+            span.end()
+
+    def failed(self, event):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span:
+            span.end(RuntimeError(event.failure.get("errmsg", "command failed")))
+
+
+def parse_traceparent(value):
+    """Return the trace id, parent span id and sampled flag of a header."""
+    match = TRACEPARENT_PATTERN.match(value or "")
+    if not match:
+        return None, None, None
+    trace_id, parent_id, flags = match.groups()
+    return trace_id, parent_id, bool(int(flags, 16) & 1)
+
+
+def trace_id_from_token():
+    """Return the `trace_id` claim of the bearer token of the request.
+
+    The signature is checked by the route, the claim only correlates spans.
+    """
+    authorization = request.headers.get("Authorization", "")
+    if not authorization.startswith("Bearer "):
+        return None
+    try:
+        claims = jwt.decode(
+            authorization[len("Bearer ") :], options={"verify_signature": False}
+        )
+    except jwt.InvalidTokenError:
+        return None
+    trace_id = claims.get("trace_id")
+    if isinstance(trace_id, str) and TRACE_ID_PATTERN.match(trace_id):
+        return trace_id
+    return None
+
+
+def install_tracing(app, tracer):
+    """Record a span for every request, continuing the trace of its caller."""
+
+    @app.before_request
+    def start_request_span():
+        trace_id, parent_id, sampled = parse_traceparent(
+            request.headers.get(TRACEPARENT_HEADER)
+        )
+        if trace_id is None:
+            trace_id = trace_id_from_token()
+            sampled = random.random() < tracer.sample_ratio
+        if not sampled:
+            return
+
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        span = tracer.start_trace(
+            f"{request.method} {route}",
+            trace_id,
+            parent_id,
+            {"http.method": request.method, "http.route": route},
+        )
+        g.trace_span = span
+        g.trace_token = _current_span.set(span)
+
+    @app.after_request
+    def add_traceparent(response):
+        span = g.get("trace_span")
+        if span:
+            span.attributes["http.status_code"] = response.status_code
+            response.headers[TRACEPARENT_HEADER] = span.traceparent()
+        return response
+
+    @app.teardown_request
+    def end_request_span(exception):
+        span = g.pop("trace_span", None)
+        if span:
+            _current_span.reset(g.pop("trace_token"))
+            span.end(exception)
+
+
+def create_tracer(config, service_name):
+    """Return the tracer enabled by the configuration, or None."""
+    if not config["TRACING_ENABLED"]:
+        return None
+
+    if config["TRACE_EXPORTER"] == "otlp":
+        exporter = OtlpSpanExporter(config["TRACE_OTLP_ENDPOINT"])
+    else:
+        exporter = FileSpanExporter(config["TRACE_FILE"])
+    return Tracer(service_name, exporter, config["TRACE_SAMPLE_RATIO"])
@@ -0,0 +1,68 @@
+"""
+Description: This file contains a bounded, thread-safe cache whose entries
+expire after a time to live. It holds at most `max_size` entries, evicting the
+least recently used ones first, so its memory stays constant no matter how many
+distinct keys are seen.
+"""
+
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, max_size, ttl, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (expires_at, value), ordered from least to most recently used.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+
+            expires_at, value = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return default
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value, optionally with its own time to live."""
+        now = self.clock()
+        with self._lock:
+            self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            self._evict(now)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+        if entry is _MISSING or entry[0] <= self.clock():
+            return default
+        return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self, now):
+        # Drop expired entries from the least recently used end, then the
+        # oldest entries while over capacity. Both are O(1) per evicted entry.
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at > now and len(self._entries) <= self.max_size:
+                break
+            self._entries.popitem(last=False)
@@ -0,0 +1,76 @@
+"""
+Description: This file contains the stores of used 2FA codes, which make
+every TOTP code usable only once. A code is recorded by user and time step,
+and is only needed until its time step has passed, so both stores forget it
+automatically afterwards and hold at most active users x window entries.
+- RingBucketUsedCodeStore keeps the codes of the process in a ring of buckets,
+  one per time step, and empties a bucket when it is reused for a new step.
+- MongoUsedCodeStore keeps them in a TTL-indexed collection shared by every
+  worker, so a code can not be replayed against another worker.
+"""
+
+
+import datetime
+import threading
+from pymongo.errors import DuplicateKeyError
+
+# Seconds of one TOTP time step, the pyotp default.
+TOTP_INTERVAL = 30
+
+
+class RingBucketUsedCodeStore:
+    def __init__(self, buckets=2):
+        # One bucket per time step in the window: the current step, and the
+        # previous one for requests that straddle a step change.
+        self._timecodes = [None] * buckets
+        self._keys = [set() for _ in range(buckets)]
+        self._lock = threading.Lock()
+
+    def mark_used(self, key, timecode):
+        """Record the code of `key` for the time step `timecode`.
+
+        Returns False if that code was already used.
+        """
+        index = timecode % len(self._keys)
+        with self._lock:
+            bucket_timecode = self._timecodes[index]
+            if bucket_timecode is None or bucket_timecode < timecode:
+                # The bucket holds an earlier step whose codes have expired.
+                self._timecodes[index] = timecode
+                self._keys[index] = set()
+            elif bucket_timecode > timecode:
+                # The step is older than the window, its codes have expired.
+                return False
+
+            keys = self._keys[index]
+            if key in keys:
+                return False
+            keys.add(key)
+            return True
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._keys)
+
+
+class MongoUsedCodeStore:
+    def __init__(self, collection, interval=TOTP_INTERVAL):
+        self.collection = collection
+        self.interval = interval
+
+    def mark_used(self, key, timecode):
+        """Record the code of `key` for the time step `timecode`.
+
+        Returns False if that code was already used.
+        """
+        # Kept one step longer than needed, for clock differences between
+        # workers. The TTL index removes the document afterwards.
+        expires_at = datetime.datetime.fromtimestamp(
+            (timecode + 2) * self.interval, datetime.timezone.utc
+        )
+        try:
+            self.collection.insert_one(
+                {"_id": f"{key}:{timecode}", "expires_at": expires_at}
+            )
+        except DuplicateKeyError:
+            return False
+        return True
@@ -0,0 +1,53 @@
+"""
+Description: This file contains the fixtures of the service benchmarks. The
+repository fixture is parametrized with the in-memory backend and a MongoDB
+backend; the MongoDB one runs only with --mongo-uri, in its own database,
+which is dropped before and after the run.
+"""
+
+
+from types import SimpleNamespace
+import pytest
+from pymongo import MongoClient
+from application.bootstrap import bootstrap_database
+from application.repositories.authentication_repository import (
+    AuthenticationRepository,
+)
+from application.repositories.in_memory_authentication_repository import (
+    InMemoryAuthenticationRepository,
+)
+
+DATABASE = "electeu_service_benchmark"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--mongo-uri", help="Also run the benchmarks against this MongoDB."
+    )
+
+
+@pytest.fixture(scope="session")
+def mongo_db(request):
+    mongo_uri = request.config.getoption("--mongo-uri")
+    if not mongo_uri:
+        pytest.skip("MongoDB benchmarks need --mongo-uri.")
+
+    client = MongoClient(mongo_uri)
+    client.drop_database(DATABASE)
+    db = client[DATABASE]
+    bootstrap_database(db)
+    yield db
+    client.drop_database(DATABASE)
+    client.close()
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def authentication_repository(request):
+    if request.param == "memory":
+        return InMemoryAuthenticationRepository()
+
+    db = request.getfixturevalue("mongo_db")
+    for collection in ("users", "user_secrets"):
+        db[collection].delete_many({})
+    # The repository only needs the PyMongo attributes it reads.
+    return AuthenticationRepository(SimpleNamespace(cx=SimpleNamespace(votes_db=db)))
@@ -0,0 +1,179 @@
+"""
+Description: This file micro-benchmarks the 2FA replay protection on the
+verify_2fa hot path. It times the TOTP check alone, the used-code store alone
+with a given number of active users, and AuthenticationService.verify_2fa with
+and without the replay protection on the first use of codes, so the cost
+added per verification is visible next to the cost of the verification itself.
+
+Run it from app/authentication_app:
+    python -m benchmarks.replay_protection_benchmark
+Add --mongo-uri mongodb://localhost:27017 to also time the shared store, alone
+and in verify_2fa, which uses its own collection and drops it afterwards.
+"""
+
+
+import argparse
+import datetime
+import json
+import time
+import timeit
+import pyotp
+from pymongo import MongoClient
+from application.schemas import used_codes_indexes
+from application.services.authentication_service import AuthenticationService
+from application.utils.ttl_cache import TTLCache
+from application.utils.used_codes import (
+    TOTP_INTERVAL,
+    MongoUsedCodeStore,
+    RingBucketUsedCodeStore,
+)
+
+
+class StaticSecretRepository:
+    """Returns the same secrets for every email, without a database."""
+
+    def __init__(self, secret):
+        self.secret = secret
+
+    def get_user_secrets(self, email):
+        return {"email": email, "authentication_token": self.secret}
+
+
+class AllowAllAttemptLimiter:
+    def allow(self, key):
+        return True
+
+
+class NoReplayProtection:
+    """Accepts every code again, like verify_2fa did before."""
+
+    def mark_used(self, key, timecode):
+        return True
+
+
+def best_microseconds(statement, number, repeat):
+    """Best time of one call of `statement`, in microseconds."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+
+def time_verify(secret, number, repeat):
+    totp = pyotp.TOTP(secret)
+    code = totp.now()
+    return best_microseconds(
+        lambda: totp.verify(code, for_time=datetime.datetime.now()), number, repeat
+    )
+
+
+def time_mark_used(store, active_users, number, repeat):
+    timecode = pyotp.TOTP(pyotp.random_base32()).timecode(datetime.datetime.now())
+    for user in range(active_users):
+        store.mark_used(f"user{user}", timecode)
+
+    # Every call records the code of a new user, the common case.
+    users = iter(range(active_users, active_users + number * repeat))
+    return best_microseconds(
+        lambda: store.mark_used(f"user{next(users)}", timecode), number, repeat
+    )
+
+
+def wait_for_time_step(seconds):
+    """Wait for the next time step if fewer than `seconds` are left in this one."""
+    left = TOTP_INTERVAL - time.time() % TOTP_INTERVAL
+    if left < seconds:
+        time.sleep(left)
+
+
+def time_verify_2fa(secret, used_code_store, number, repeat):
+    # Every call verifies the code of a new user, the first use of a code, and
+    # not a rejected replay. Their TOTPs are cached, like those of active users.
+    emails = [f"user{user}@example.com" for user in range(number * repeat)]
+    authentication_service = AuthenticationService(
+        StaticSecretRepository(secret),
+        None,
+        attempt_limiter=AllowAllAttemptLimiter(),
+        totp_cache=TTLCache(len(emails), 3600),
+        used_code_store=used_code_store,
+    )
+    for email in emails:
+        authentication_service.get_totp(email)
+
+    # The code of every call is only valid if they all run in its time step.
+    wait_for_time_step(10)
+    totp = pyotp.TOTP(secret)
+    code = totp.now()
+    users = iter(emails)
+    result = best_microseconds(
+        lambda: authentication_service.verify_2fa(next(users), code), number, repeat
+    )
+    if not totp.verify(code):
+        raise RuntimeError("The time step changed while timing, run again.")
+    return result
+
+
+def run(active_users, number, repeat, mongo_uri=None, database=None):
+    secret = pyotp.random_base32()
+    ring_store = RingBucketUsedCodeStore()
+
+    results = {
+        "active_users": active_users,
+        "totp_verify_us": time_verify(secret, number, repeat),
+        "ring_mark_used_us": time_mark_used(ring_store, active_users, number, repeat),
+        "ring_entries": len(ring_store),
+        "verify_2fa_without_replay_protection_us": time_verify_2fa(
+            secret, NoReplayProtection(), number, repeat
+        ),
+        "verify_2fa_with_ring_store_us": time_verify_2fa(
+            secret, RingBucketUsedCodeStore(), number, repeat
+        ),
+    }
+
+    if mongo_uri:
+        client = MongoClient(mongo_uri)
+        collection = client[database].used_codes
+        collection.drop()
+        collection.create_indexes(used_codes_indexes)
+
+        # Round trips are much slower, so fewer of them are timed.
+        mongo_number = max(1, number // 100)
+        results["mongo_mark_used_us"] = time_mark_used(
+            MongoUsedCodeStore(collection), 0, mongo_number, repeat
+        )
+        results["verify_2fa_with_mongo_store_us"] = time_verify_2fa(
+            secret, MongoUsedCodeStore(collection), mongo_number, repeat
+        )
+
+        collection.drop()
+        client.close()
+
+    print(json.dumps(results, indent=2))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cost of the 2FA replay protection on verify_2fa."
+    )
+    parser.add_argument(
+        "--active-users",
+        type=int,
+        default=100000,
+        help="Users that already used a code in the current time step.",
+    )
+    parser.add_argument("--number", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mongo-uri")
+    parser.add_argument("--database", default="electeu_replay_benchmark")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run(
+        args.active_users, args.number, args.repeat, args.mongo_uri, args.database
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Description: This file contains the micro-benchmarks of the authentication
+service, run with pytest-benchmark against the in-memory repository and, with
+--mongo-uri, against MongoDB. verify_2fa is timed on accepted codes, one user
+per round, with the TOTP of the user cached, the common case, and looked up in
+the repository on every call.
+
+Run it from app/authentication_app, saving the results under .benchmarks and
+failing on a regression of the mean compared with the last saved run:
+    python -m pytest benchmarks --mongo-uri mongodb://localhost:27017 \
+        --benchmark-autosave --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+
+
+import pyotp
+import pytest
+from application.services.authentication_service import (
+    AuthenticationService,
+    TOTP_CACHE_SIZE,
+)
+from application.utils.ttl_cache import TTLCache
+
+pytest.importorskip("pytest_benchmark")
+
+# Users verifying a code, one per round so every code is accepted once.
+USERS = 1000
+
+
+class AllowAllAttemptLimiter:
+    def allow(self, key):
+        return True
+
+
+@pytest.mark.benchmark(group="verify_2fa")
+@pytest.mark.parametrize("totp_cache_ttl", [60, 0], ids=["cached", "uncached"])
+def test_verify_2fa(benchmark, authentication_repository, totp_cache_ttl):
+    secret = pyotp.random_base32()
+    emails = [f"citizen{user_id}@example.com" for user_id in range(1, USERS + 1)]
+    for user_id, email in enumerate(emails, 1):
+        authentication_repository.store_user(
+            {"user_id": user_id, "email": email, "password": "password"}
+        )
+    authentication_repository.store_new_totp_secrets(
+        [(user_id, email, secret) for user_id, email in enumerate(emails, 1)]
+    )
+
+    # Without the attempt limit, which would reject all but the first call.
+    authentication_service = AuthenticationService(
+        authentication_repository,
+        None,
+        attempt_limiter=AllowAllAttemptLimiter(),
+        totp_cache=TTLCache(TOTP_CACHE_SIZE, totp_cache_ttl),
+    )
+    for email in emails:
+        authentication_service.get_totp(email)
+
+    totp = pyotp.TOTP(secret)
+    users = iter(emails)
+
+    def next_user():
+        # Every round verifies the current code of a user that has not used it
+        # yet, so an accepted code is timed and not a rejected replay.
+        return (next(users), totp.now()), {}
+
+    accepted = benchmark.pedantic(
+        authentication_service.verify_2fa, setup=next_user, rounds=USERS
+    )
+
+    assert accepted
@@ -0,0 +1,51 @@
+"""
+Description: This file configures gunicorn, the production server of the
+authentication application. Run it from this directory with:
+    gunicorn application.app:app
+Every setting can be overridden with an environment variable. Send SIGHUP to
+the master process to gracefully reload the workers, e.g. after a deployment.
+"""
+
+
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5001')}"
+
+# Pre-fork workers, each serving requests from a pool of threads.
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", "4"))
+
+# Seconds an idle connection is kept open for the next request of the client.
+keepalive = int(os.environ.get("WEB_KEEPALIVE", "5"))
+timeout = int(os.environ.get("WEB_TIMEOUT", "30"))
+# Seconds workers get to finish their requests on a reload or shutdown.
+graceful_timeout = int(os.environ.get("WEB_GRACEFUL_TIMEOUT", "30"))
+
+# The application is imported by every worker after it was forked, so the
+# MongoDB client, its connection pool and monitoring threads are never shared
+# between processes. This also lets a reload pick up new code.
+preload_app = False
+
+# Serve HTTPS when the certificates are mounted, like the development server.
+cert_file = os.environ.get("CERT_FILE", "/certs/localhost+2.pem")
+key_file = os.environ.get("KEY_FILE", "/certs/localhost+2-key.pem")
+if os.path.exists(cert_file) and os.path.exists(key_file):
+    certfile = cert_file
+    keyfile = key_file
+
+accesslog = "-"
+
+# Every worker writes its metrics to this directory, so GET /metrics reports
+# the sum of all the workers. It is emptied when the server starts.
+metrics_dir = os.environ.setdefault(
+    "METRICS_DIR", os.path.join(tempfile.gettempdir(), "authentication-app-metrics")
+)
+
+
+def on_starting(server):
+    if os.path.isdir(metrics_dir):
+        for file_name in os.listdir(metrics_dir):
+            os.remove(os.path.join(metrics_dir, file_name))
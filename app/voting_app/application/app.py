@@ -1,11 +1,13 @@
 """
 Description : This module initializes a voting application, sets up MongoDB
 integration using Flask-PyMongo, and configures dependency injection
-using Flask-Injector. It also ensures the necessary collections
-in the MongoDB database with appropriate schema validation.
+using Flask-Injector. Creating the application does not connect to MongoDB:
+the collections, with their schema validation, are created by the
+`flask bootstrap` command or before the first request.
 """
 
 
+import logging
 import os
 from flask import Flask
 from flask_pymongo import PyMongo
@@ -16,47 +18,116 @@ from .services.user_service import UserService
 from .services.election_service import ElectionService
 from .repositories.user_repository import UserRepository
 from .repositories.vote_repository import VoteRepository
-from .schemas import (
-    user_schema,
-    vote_option_schema,
-    election_schema,
-    votes_schema,
-    candidates_schema,
+from .utils.election_cache import election_cache
+from .utils.profiler import create_profiler
+from .utils.json_provider import FastJSONProvider
+from .utils.structured_logging import configure_logging, install_request_ids
+from .utils.tracing import TracingCommandListener, create_tracer, install_tracing
+from .utils.metrics import (
+    MetricsFileWriter,
+    instrument_app,
+    mongo_event_listeners,
+    registry as metrics_registry,
 )
+from .config import Config
+from .bootstrap import bootstrap_database, bootstrap_before_first_request
 from .controllers.citizen_controller import blueprint_citizen
 from .controllers.admin_controller import blueprint_admin
+from .controllers.metrics_controller import blueprint_metrics
+from .controllers.profile_controller import blueprint_profiles
+from .commands import bootstrap_command, import_users_command
+
+logger = logging.getLogger(__name__)
 
 cert_file = "/certs/localhost+2.pem"
 key_file = "/certs/localhost+2-key.pem"
 
 
-# Initialize the app
-app = Flask(__name__)
-app.config["MONGO_URI"] = "mongodb://mongo:27017/votes_db"
-
-mongo = PyMongo(app)
-
-db = mongo.cx.votes_db
-if "users" not in db.list_collection_names():
-    db.create_collection("users", validator=user_schema)
-if "vote_options" not in db.list_collection_names():
-    db.create_collection("vote_options", validator=vote_option_schema)
-if "candidates" not in db.list_collection_names():
-    db.create_collection("candidates", validator=candidates_schema)
-if "elections" not in db.list_collection_names():
-    db.create_collection("elections", validator=election_schema)
-if "votes" not in db.list_collection_names():
-    db.create_collection("votes", validator=votes_schema)
-
-
-def configure(binder: Binder):
-    binder.bind(UserService, to=UserService(UserRepository(mongo)), scope=singleton)
-    binder.bind(
-        VoteService,
-        to=VoteService(UserRepository(mongo), VoteRepository(mongo)),
-        scope=singleton,
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    app.config.from_object(config)
+    configure_logging(app.config, "voting-app")
+    install_request_ids(app)
+
+    # The client connects on its first operation, so under gunicorn every
+    # worker connects after it was forked.
+    mongo = PyMongo(app, event_listeners=setup_metrics(app) + setup_tracing(app))
+    setup_profiling(app)
+    app.extensions["mongo"] = mongo
+
+    if app.config["DATABASE_BOOTSTRAP"] == "first_request":
+        bootstrap_before_first_request(app, mongo.cx.votes_db)
+
+    vote_repository = VoteRepository(
+        mongo,
+        app.config["VOTE_COUNTER_SHARDS"],
+        batch_size=app.config["VOTE_BATCH_SIZE"],
+        batch_max_delay=app.config["VOTE_BATCH_MAX_DELAY_MS"] / 1000,
     )
-    binder.bind(ElectionService, to=ElectionService(), scope=singleton)
+    if app.config["METRICS_ENABLED"]:
+        metrics_registry.register_stats(
+            "election_cache",
+            election_cache.stats,
+            ("hits", "reloads", "load_errors", "total_load_seconds"),
+        )
+        if vote_repository.vote_writer:
+            metrics_registry.register_stats(
+                "vote_group_commit",
+                vote_repository.vote_writer.stats,
+                ("queued", "batches", "votes"),
+            )
+
+    def configure(binder: Binder):
+        binder.bind(UserService, to=UserService(UserRepository(mongo)), scope=singleton)
+        binder.bind(VoteService, to=VoteService(vote_repository), scope=singleton)
+        binder.bind(ElectionService, to=ElectionService(), scope=singleton)
+
+    register_routes(app)
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(import_users_command)
+
+    # Set up Flask-Injector for dependency injection
+    flask_injector = FlaskInjector(app=app, modules=[configure])
+    app.extensions["injector"] = flask_injector.injector
+    return app
+
+
+def setup_metrics(app):
+    """Instrument the app, returning the listeners of its MongoDB client."""
+    if not app.config["METRICS_ENABLED"]:
+        return []
+
+    writer = None
+    if app.config["METRICS_DIR"]:
+        writer = MetricsFileWriter(metrics_registry, app.config["METRICS_DIR"])
+    app.extensions["metrics_writer"] = writer
+
+    instrument_app(app, writer)
+    app.register_blueprint(blueprint_metrics, url_prefix="")
+    return mongo_event_listeners()
+
+
+def setup_tracing(app):
+    """Trace the requests, returning the listeners of its MongoDB client."""
+    tracer = create_tracer(app.config, "voting-app")
+    if not tracer:
+        return []
+
+    app.extensions["tracer"] = tracer
+    install_tracing(app, tracer)
+    return [TracingCommandListener()]
+
+
+def setup_profiling(app):
+    # Nothing is installed unless profiling is enabled.
+    profiler = create_profiler(app.config)
+    if not profiler:
+        return
+
+    app.extensions["profiler"] = profiler
+    profiler.install(app)
+    app.register_blueprint(blueprint_profiles, url_prefix="")
 
 
 def register_routes(app):
@@ -65,21 +136,22 @@ def register_routes(app):
     app.register_blueprint(blueprint_admin, url_prefix="")
 
 
-register_routes(app)
-
-# Set up Flask-Injector for dependency injection
-FlaskInjector(app=app, modules=[configure])
+# Initialize the app
+app = create_app()
 
 
 def run_app():
+    # Development server, run the app with gunicorn in production.
+    bootstrap_database(app.extensions["mongo"].cx.votes_db)
+
     # Check if the certificate and key files exist
     if os.path.exists(cert_file) and os.path.exists(key_file):
         # If both exist, run with SSL context (HTTPS)
-        print("Running with SSL context")
+        logger.info("Running with SSL context")
         app.run(ssl_context=(cert_file, key_file), host="0.0.0.0", port=5000)
     else:
         # If the files don't exist, run without SSL (HTTP)
-        print("Running without SSL context")
+        logger.info("Running without SSL context")
         app.run(host="0.0.0.0", port=5000)
 
 
@@ -0,0 +1,70 @@
+"""
+Description: This module initializes the ASGI variant of the voting
+application. It serves the citizen and admin routes of the WSGI app with the
+same responses, but with asynchronous services and repositories built on
+Motor, so one process can hold many votes waiting for MongoDB at once.
+Run it with:
+    uvicorn application.asgi:app --host 0.0.0.0 --port 5000 --workers 4
+It needs the packages of requirements-asgi.txt.
+"""
+
+
+import asyncio
+import contextlib
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from starlette.applications import Starlette
+from .services.async_user_service import AsyncUserService
+from .services.async_vote_service import AsyncVoteService
+from .services.election_service import ElectionService
+from .repositories.async_user_repository import AsyncUserRepository
+from .repositories.async_vote_repository import AsyncVoteRepository
+from .config import Config
+from .bootstrap import bootstrap_database
+from .utils.structured_logging import configure_logging
+from .controllers.async_citizen_controller import citizen_routes
+from .controllers.async_admin_controller import admin_routes
+
+
+def bootstrap_with_new_client(mongo_uri):
+    client = MongoClient(mongo_uri)
+    try:
+        bootstrap_database(client.votes_db)
+    finally:
+        client.close()
+
+
+def create_asgi_app(config=Config):
+    configure_logging(
+        {name: getattr(config, name) for name in dir(config) if name.isupper()},
+        "voting-app",
+    )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        if config.DATABASE_BOOTSTRAP == "first_request":
+            # Once per worker, before it serves requests. The bootstrap is
+            # synchronous, so it runs outside the event loop.
+            await asyncio.get_running_loop().run_in_executor(
+                None, bootstrap_with_new_client, config.MONGO_URI
+            )
+
+        # Created in the worker's event loop, which Motor binds the client to.
+        client = AsyncIOMotorClient(config.MONGO_URI)
+        db = client.votes_db
+        app.state.user_service = AsyncUserService(AsyncUserRepository(db))
+        app.state.vote_service = AsyncVoteService(
+            AsyncVoteRepository(db, config.VOTE_COUNTER_SHARDS)
+        )
+        app.state.election_service = ElectionService()
+        app.state.election_max_age = config.ELECTION_MAX_AGE
+        try:
+            yield
+        finally:
+            client.close()
+
+    return Starlette(routes=citizen_routes + admin_routes, lifespan=lifespan)
+
+
+# Initialize the app
+app = create_asgi_app()
@@ -0,0 +1,75 @@
+"""
+Description: This file creates the collections of the voting application,
+with their schema validation, and their indexes. It does nothing for what
+already exists and is safe to run from several worker processes at once.
+"""
+
+
+import threading
+from pymongo.errors import CollectionInvalid, OperationFailure
+from .schemas import (
+    user_schema,
+    vote_option_schema,
+    election_schema,
+    votes_schema,
+    candidates_schema,
+    vote_counts_schema,
+    users_indexes,
+    votes_indexes,
+    vote_counts_indexes,
+)
+
+NAMESPACE_EXISTS_ERROR_CODE = 48
+
+collection_schemas = {
+    "users": user_schema,
+    "vote_options": vote_option_schema,
+    "candidates": candidates_schema,
+    "elections": election_schema,
+    "votes": votes_schema,
+    "vote_counts": vote_counts_schema,
+}
+
+
+def create_collection(db, name, validator):
+    try:
+        db.create_collection(name, validator=validator)
+    except CollectionInvalid:
+        pass
+    except OperationFailure as e:
+        # Another worker created it between the check and the creation.
+        if e.code != NAMESPACE_EXISTS_ERROR_CODE:
+            raise
+
+
+def bootstrap_database(db):
+    collection_names = db.list_collection_names()
+    for name, validator in collection_schemas.items():
+        if name not in collection_names:
+            create_collection(db, name, validator)
+
+    # Creating an index that already exists with the same options is a no-op.
+    db.users.create_indexes(users_indexes)
+    db.votes.create_indexes(votes_indexes)
+    db.vote_counts.create_indexes(vote_counts_indexes)
+
+
+def bootstrap_before_first_request(app, db):
+    """Bootstrap the database once, before the first request of the process.
+
+    Until it succeeds, e.g. while MongoDB is unreachable, it is tried again on
+    the next request.
+    """
+    lock = threading.Lock()
+    done = False
+
+    def bootstrap():
+        nonlocal done
+        if done:
+            return
+        with lock:
+            if not done:
+                bootstrap_database(db)
+                done = True
+
+    app.before_request(bootstrap)
@@ -0,0 +1,44 @@
+"""
+Description: This file defines the command line tools of the voting application,
+available through the Flask CLI:
+- Creating the collections and indexes of the database.
+- Importing an electoral roll of citizens.
+"""
+
+
+import json
+import click
+from flask import current_app
+from .bootstrap import bootstrap_database
+from .services.user_service import UserService, BULK_BATCH_SIZE, BULK_MAX_ERRORS
+from .utils.ndjson import iter_ndjson
+
+
+@click.command("bootstrap")
+def bootstrap_command():
+    """Create the collections and indexes of the application."""
+    bootstrap_database(current_app.extensions["mongo"].cx.votes_db)
+    click.echo("The database is ready.")
+
+
+@click.command("import-users")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=BULK_BATCH_SIZE, show_default=True)
+@click.option("--max-errors", default=BULK_MAX_ERRORS, show_default=True)
+def import_users_command(path, batch_size, max_errors):
+    """Register the citizens of a JSON array or NDJSON (.ndjson, .jsonl) file."""
+    user_service = current_app.extensions["injector"].get(UserService)
+
+    with open(path, "rb") as file:
+        if path.endswith((".ndjson", ".jsonl")):
+            rows = iter_ndjson(file)
+        else:
+            rows = json.load(file)
+            if not isinstance(rows, list):
+                raise click.BadParameter(
+                    "must contain a JSON array.", param_hint="PATH"
+                )
+
+        result = user_service.create_users(rows, batch_size, max_errors)
+
+    click.echo(json.dumps(result))
@@ -0,0 +1,84 @@
+"""
+Description: This file contains the configuration of the voting application.
+Every value can be overridden with an environment variable of the same name.
+"""
+
+
+import os
+import tempfile
+
+
+class Config:
+    MONGO_URI = os.environ.get("MONGO_URI", "mongodb://mongo:27017/votes_db")
+
+    # Number of sub-counters kept per vote option. Spreading the increments of
+    # a popular option over several documents avoids a single hot document.
+    # The app does not start with less than 1.
+    VOTE_COUNTER_SHARDS = int(os.environ.get("VOTE_COUNTER_SHARDS", "1"))
+
+    # Votes of concurrent requests are written with one insert per batch of up
+    # to VOTE_BATCH_SIZE votes, waiting at most VOTE_BATCH_MAX_DELAY_MS for a
+    # batch to fill. A batch size of 1 writes every vote on its own.
+    VOTE_BATCH_SIZE = int(os.environ.get("VOTE_BATCH_SIZE", "100"))
+    VOTE_BATCH_MAX_DELAY_MS = float(os.environ.get("VOTE_BATCH_MAX_DELAY_MS", "2"))
+
+    # Seconds a CDN, a reverse proxy or a browser may serve GET /election
+    # without revalidating it.
+    ELECTION_MAX_AGE = int(os.environ.get("ELECTION_MAX_AGE", "60"))
+
+    # "first_request" creates the collections and indexes before the first
+    # request of every process. Use "off" when `flask bootstrap` is run before
+    # the server is started.
+    DATABASE_BOOTSTRAP = os.environ.get("DATABASE_BOOTSTRAP", "first_request")
+
+    # Latency and status of the requests, and timing of the MongoDB commands,
+    # served on GET /metrics.
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+    # Directory where every worker process writes its metrics, so that /metrics
+    # reports the sum of all the workers. Each process reports its own if empty.
+    METRICS_DIR = os.environ.get("METRICS_DIR", "")
+
+    # Opt-in profiling of requests, off unless one of the three is set:
+    # - PROFILE_SLOW_REQUESTS_MS: keep the stacks, sampled every
+    #   PROFILE_SAMPLE_INTERVAL_MS, of the requests slower than this.
+    # - PROFILE_EVERY_N_REQUESTS: profile 1 in N requests with cProfile.
+    # - PROFILE_TOKEN: profile the requests sent with this token in the
+    #   X-Profile-Token header, which also gives access to GET /admin/profiles.
+    PROFILE_SLOW_REQUESTS_MS = float(os.environ.get("PROFILE_SLOW_REQUESTS_MS", "0"))
+    PROFILE_SAMPLE_INTERVAL_MS = float(
+        os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", "5")
+    )
+    PROFILE_EVERY_N_REQUESTS = int(os.environ.get("PROFILE_EVERY_N_REQUESTS", "0"))
+    PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN", "")
+    # Directory keeping the PROFILE_MAX_FILES most recent profiles.
+    PROFILE_DIR = os.environ.get(
+        "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "voting-app-profiles")
+    )
+    PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "100"))
+
+    # Tracing of the requests, continued across the services with the
+    # traceparent header and the trace_id claim of the JWT. Finished spans are
+    # appended to TRACE_FILE as JSON lines, or sent as OTLP/JSON to
+    # TRACE_OTLP_ENDPOINT when TRACE_EXPORTER is "otlp".
+    TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "false").lower() == "true"
+    TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "file")
+    TRACE_FILE = os.environ.get(
+        "TRACE_FILE", os.path.join(tempfile.gettempdir(), "voting-app-traces.jsonl")
+    )
+    TRACE_OTLP_ENDPOINT = os.environ.get(
+        "TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"
+    )
+    # Share of the requests starting a new trace that are traced.
+    TRACE_SAMPLE_RATIO = float(os.environ.get("TRACE_SAMPLE_RATIO", "1.0"))
+
+    # Records are written to stdout as JSON lines by a background thread. Set
+    # the level of single modules with LOG_LEVELS, e.g.
+    # "application.services=DEBUG,pymongo=WARNING".
+    LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+    LOG_LEVELS = os.environ.get("LOG_LEVELS", "")
+    # Records waiting to be written, newer records are dropped when it is full.
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    # Warnings and errors with the same message are logged at most
+    # LOG_RATE_LIMIT_BURST times per LOG_RATE_LIMIT_INTERVAL seconds, 0 for all.
+    LOG_RATE_LIMIT_BURST = int(os.environ.get("LOG_RATE_LIMIT_BURST", "10"))
+    LOG_RATE_LIMIT_INTERVAL = float(os.environ.get("LOG_RATE_LIMIT_INTERVAL", "60"))
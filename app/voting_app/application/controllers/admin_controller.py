@@ -1,7 +1,9 @@
 """
 Description: This file defines the admin-related functionalities:
 - Adding/Deleting users.
+- Registering citizens in bulk.
 - Retrieving all the votes.
+- Retrieving the results of the current election.
 """
 
 
@@ -11,6 +13,17 @@ from ..services.user_service import UserService
 from ..services.vote_service import VoteService
 from ..exceptions.user_not_found_error import UserNotFoundError
 from ..exceptions.missing_fields_error import MissingFieldsError
+from ..exceptions.invalid_pagination_error import InvalidPaginationError
+from ..utils.ndjson import iter_ndjson
+from ..utils.pagination import (
+    NDJSON_MIMETYPE,
+    is_paginated,
+    ndjson_response,
+    page,
+    parse_after,
+    parse_limit,
+    wants_ndjson,
+)
 
 blueprint_admin = Blueprint("admin", __name__)
 
@@ -19,7 +32,36 @@ blueprint_admin = Blueprint("admin", __name__)
 @inject
 def get_users(user_service: UserService):
     try:
+        after = parse_after(request.args)
+        if wants_ndjson(request):
+            return ndjson_response(user_service.iter_users(after))
+        if is_paginated(request):
+            limit = parse_limit(request.args)
+            return jsonify(page(user_service.get_users_page(after, limit), limit)), 200
+
         return jsonify(user_service.get_all_users()), 200
+    except InvalidPaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return jsonify({"error": msg}), 500
+
+
+@blueprint_admin.route("/users/bulk", methods=["POST"])
+@inject
+def create_users_bulk(user_service: UserService):
+    try:
+        # NDJSON bodies are read line by line instead of being parsed at once.
+        if request.mimetype == NDJSON_MIMETYPE:
+            rows = iter_ndjson(request.stream)
+        else:
+            # None when the body is not valid JSON.
+            rows = request.get_json(silent=True)
+            if not isinstance(rows, list):
+                msg = "The body must be a JSON array of citizens."
+                return jsonify({"error": msg}), 400
+
+        return jsonify(user_service.create_users(rows)), 200
     except Exception as e:
         msg = "Internal Server Error: " + str(e)
         return jsonify({"error": msg}), 500
@@ -51,7 +93,26 @@ def delete_user(user_service: UserService):
 @inject
 def get_votes(vote_service: VoteService):
     try:
+        after = parse_after(request.args)
+        if wants_ndjson(request):
+            return ndjson_response(vote_service.iter_votes(after))
+        if is_paginated(request):
+            limit = parse_limit(request.args)
+            return jsonify(page(vote_service.get_votes_page(after, limit), limit)), 200
+
         return jsonify(vote_service.get_all_votes()), 200
+    except InvalidPaginationError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return jsonify({"error": msg}), 500
+
+
+@blueprint_admin.route("/results", methods=["GET"])
+@inject
+def get_results(vote_service: VoteService):
+    try:
+        return jsonify(vote_service.get_results()), 200
     except Exception as e:
         msg = "Internal Server Error: " + str(e)
         return jsonify({"error": msg}), 500
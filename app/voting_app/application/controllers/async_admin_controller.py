@@ -0,0 +1,95 @@
+"""
+Description: This file defines the admin-related routes of the ASGI app, with
+the same paths and responses as the admin controller:
+- Deleting users.
+- Retrieving all the users and votes, at once, page by page or streamed.
+- Retrieving the results of the current election.
+Registering citizens in bulk is only served by the WSGI app.
+"""
+
+
+from starlette.routing import Route
+from ..exceptions.user_not_found_error import UserNotFoundError
+from ..exceptions.missing_fields_error import MissingFieldsError
+from ..exceptions.invalid_pagination_error import InvalidPaginationError
+from ..utils.async_responses import (
+    is_paginated,
+    json_response,
+    ndjson_response,
+    wants_ndjson,
+)
+from ..utils.pagination import page, parse_after, parse_limit
+
+
+async def get_users(request):
+    user_service = request.app.state.user_service
+    try:
+        after = parse_after(request.query_params)
+        if wants_ndjson(request):
+            return ndjson_response(user_service.iter_users(after))
+        if is_paginated(request):
+            limit = parse_limit(request.query_params)
+            users = await user_service.get_users_page(after, limit)
+            return json_response(page(users, limit), 200)
+
+        return json_response(await user_service.get_all_users(), 200)
+    except InvalidPaginationError as e:
+        return json_response({"error": str(e)}, 400)
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return json_response({"error": msg}, 500)
+
+
+async def delete_user(request):
+    try:
+        data = await request.json()
+        user_id = data.get("user_id")
+
+        if not user_id:
+            raise MissingFieldsError()
+
+        await request.app.state.user_service.delete_user(user_id)
+
+        return json_response({"message": "User deleted succesfully."}, 200)
+    except MissingFieldsError as e:
+        return json_response({"error": str(e)}, 400)
+    except UserNotFoundError as e:
+        return json_response({"error": str(e)}, 402)
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return json_response({"error": msg}, 500)
+
+
+async def get_votes(request):
+    vote_service = request.app.state.vote_service
+    try:
+        after = parse_after(request.query_params)
+        if wants_ndjson(request):
+            return ndjson_response(vote_service.iter_votes(after))
+        if is_paginated(request):
+            limit = parse_limit(request.query_params)
+            votes = await vote_service.get_votes_page(after, limit)
+            return json_response(page(votes, limit), 200)
+
+        return json_response(await vote_service.get_all_votes(), 200)
+    except InvalidPaginationError as e:
+        return json_response({"error": str(e)}, 400)
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return json_response({"error": msg}, 500)
+
+
+async def get_results(request):
+    try:
+        return json_response(await request.app.state.vote_service.get_results(), 200)
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return json_response({"error": msg}, 500)
+
+
+admin_routes = [
+    Route("/users", get_users, methods=["GET"]),
+    Route("/user", delete_user, methods=["DELETE"]),
+    Route("/votes", get_votes, methods=["GET"]),
+    Route("/results", get_results, methods=["GET"]),
+]
@@ -0,0 +1,94 @@
+"""
+Description: This file defines the citizen-related routes of the ASGI app,
+with the same paths and responses as the citizen controller:
+- Retrieving a election.
+- Registering a citizen.
+- Voting
+"""
+
+
+import logging
+import jwt
+from starlette.responses import Response
+from starlette.routing import Route
+from ..exceptions.user_already_exists_error import UserAlreadyExistsError
+from ..exceptions.missing_fields_error import MissingFieldsError
+from ..utils.async_responses import json_response
+from ..utils.http_caching import election_response
+
+logger = logging.getLogger(__name__)
+
+
+async def get_election(request):
+    try:
+        status, body, headers = election_response(
+            request.app.state.election_service.get_current_snapshot(),
+            request.headers.get("accept-encoding"),
+            request.headers.get("if-none-match"),
+            request.app.state.election_max_age,
+        )
+        return Response(body, status, headers, media_type="application/json")
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        return json_response({"error": msg}, 500)
+
+
+async def register_citizen(request):
+    try:
+        data = await request.json()
+
+        if not data.get("user_id") or not data.get("password") or not data.get("email"):
+            raise MissingFieldsError()
+
+        await request.app.state.user_service.create_user(data)
+
+        return json_response({"message": "Citizen created succesfully"}, 200)
+    except MissingFieldsError as e:
+        return json_response({"error": str(e)}, 400)
+    except UserAlreadyExistsError as e:
+        return json_response({"error": str(e)}, 402)
+    except Exception as e:
+        msg = "Internal Server Error: " + str(e)
+        logger.exception("Failed to register a citizen")
+        return json_response({"error": msg}, 500)
+
+
+async def vote(request):
+    auth_header = request.headers.get("Authorization")
+
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return json_response(
+            {"error": "Authorization token is missing or invalid"}, 401
+        )
+
+    token = auth_header.split(" ")[1]
+
+    try:
+        # Verify the token
+        decoded_token = jwt.decode(token, "your_secret_key", algorithms=["HS256"])
+        user_id = decoded_token["user_id"]
+
+        data = await request.json()
+        vote_option_id = data.get("vote_option_id")
+
+        if not user_id or not vote_option_id:
+            raise MissingFieldsError()
+
+        await request.app.state.vote_service.vote_in_election(user_id, vote_option_id)
+
+        return json_response({"message": "Vote submitted successfully."}, 200)
+    except MissingFieldsError as e:
+        return json_response({"error": str(e)}, 400)
+    except jwt.ExpiredSignatureError:
+        return json_response({"error": "Token has expired"}, 401)
+    except jwt.InvalidTokenError:
+        return json_response({"error": "Invalid token"}, 401)
+    except Exception as e:
+        return json_response({"error": str(e)}, 500)
+
+
+citizen_routes = [
+    Route("/election", get_election, methods=["GET"]),
+    Route("/register", register_citizen, methods=["POST"]),
+    Route("/vote", vote, methods=["POST"]),
+]
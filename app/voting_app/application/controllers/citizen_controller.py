@@ -6,15 +6,19 @@ Description: This file defines the citizen-related functionalities:
 """
 
 
-from flask import request, jsonify, Blueprint
+import logging
+from flask import current_app, request, jsonify, Blueprint, Response
 from flask_injector import inject
 from ..services.user_service import UserService
 from ..services.vote_service import VoteService
 from ..services.election_service import ElectionService
 from ..exceptions.user_already_exists_error import UserAlreadyExistsError
 from ..exceptions.missing_fields_error import MissingFieldsError
+from ..utils.http_caching import election_response
 import jwt
 
+logger = logging.getLogger(__name__)
+
 blueprint_citizen = Blueprint("citizen", __name__)
 
 
@@ -22,8 +26,13 @@ blueprint_citizen = Blueprint("citizen", __name__)
 @inject
 def get_election(election_service: ElectionService):
     try:
-        election = election_service.get_current_election()
-        return (jsonify(election), 200)
+        status, body, headers = election_response(
+            election_service.get_current_snapshot(),
+            request.headers.get("Accept-Encoding"),
+            request.headers.get("If-None-Match"),
+            current_app.config["ELECTION_MAX_AGE"],
+        )
+        return Response(body, status, headers, mimetype="application/json")
     except Exception as e:
         msg = "Internal Server Error: " + str(e)
         return jsonify({"error": msg}), 500
@@ -47,7 +56,7 @@ def register_citizen(user_service: UserService):
         return jsonify({"error": str(e)}), 402
     except Exception as e:
         msg = "Internal Server Error: " + str(e)
-        print(msg)  # Log the error message
+        logger.exception("Failed to register a citizen")
         return jsonify({"error": msg}), 500
 
 
@@ -0,0 +1,18 @@
+"""
+Description: This file defines the endpoint serving the metrics of the
+application in the Prometheus text format.
+"""
+
+
+from flask import Blueprint, Response, current_app
+from ..utils.metrics import render_metrics
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+blueprint_metrics = Blueprint("metrics", __name__)
+
+
+@blueprint_metrics.route("/metrics", methods=["GET"])
+def get_metrics():
+    metrics = render_metrics(current_app.extensions.get("metrics_writer"))
+    return Response(metrics, content_type=PROMETHEUS_CONTENT_TYPE)
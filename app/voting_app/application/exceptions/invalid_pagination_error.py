@@ -0,0 +1,13 @@
+"""
+Description: Exception raised when the pagination parameters of a request
+    are not valid.
+"""
+
+
+class InvalidPaginationError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(self.message)
+
+    def __str__(self):
+        return f"InvalidPaginationError: {self.message}"
@@ -0,0 +1,60 @@
+"""
+Description: This file contains the AsyncUserRepository class, the
+asynchronous counterpart of UserRepository used by the ASGI app. It reads and
+writes the users collection through Motor, so a request waiting for MongoDB
+does not hold a thread.
+"""
+
+
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+
+class AsyncUserRepository:
+    def __init__(self, db):
+        # A Motor database, e.g. AsyncIOMotorClient(uri).votes_db
+        self.users_table = db.users
+
+    async def store_user_if_absent(self, user_json):
+        """Store a new user unless one with the same user_id exists.
+
+        Returns True if the user was inserted and False if it already existed.
+        """
+        if not user_json.get("user_id"):
+            raise ValueError("user_id is required to store a user.")
+
+        try:
+            result = await self.users_table.update_one(
+                {"user_id": user_json["user_id"]},
+                {"$setOnInsert": user_json},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # A concurrent registration inserted the same user_id first.
+            return False
+
+        return result.upserted_id is not None
+
+    async def get_all_users(self):
+        """Retrieve all users from the user collection."""
+        return await self.users_table.find({}, {"_id": 0}).to_list(length=None)
+
+    async def get_users_page(self, after=None, limit=100):
+        """Retrieve up to `limit` users with a user_id greater than `after`."""
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        users = self.users_table.find(query, {"_id": 0})
+        return await users.sort("user_id", ASCENDING).limit(limit).to_list(length=None)
+
+    def iter_users(self, after=None, batch_size=1000):
+        """Return an async cursor over the users, ordered by user_id."""
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        users = self.users_table.find(query, {"_id": 0}, batch_size=batch_size)
+        return users.sort("user_id", ASCENDING)
+
+    async def get_user(self, user_id):
+        """Retrieve a user by their user_id."""
+        return await self.users_table.find_one({"user_id": user_id}, {"_id": 0})
+
+    async def delete_user(self, user_id):
+        """Delete a user by their user_id."""
+        return await self.users_table.delete_one({"user_id": user_id})
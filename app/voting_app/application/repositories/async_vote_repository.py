@@ -0,0 +1,66 @@
+"""
+Description: This file contains the AsyncVoteRepository class, the
+asynchronous counterpart of VoteRepository used by the ASGI app. It reads and
+writes the votes and vote_counts collections through Motor.
+"""
+
+
+import random
+from pymongo import ASCENDING
+
+
+class AsyncVoteRepository:
+    def __init__(self, db, counter_shards=1):
+        if counter_shards < 1:
+            raise ValueError("VOTE_COUNTER_SHARDS must be at least 1.")
+
+        # A Motor database, e.g. AsyncIOMotorClient(uri).votes_db
+        self.votes_table = db.votes
+        self.vote_counts_table = db.vote_counts
+        self.counter_shards = counter_shards
+
+    async def store_vote(self, vote_json):
+        """Store a vote and count it in the results of its election."""
+        await self.votes_table.insert_one(vote_json)
+        await self.increment_vote_count(
+            vote_json["election_id"], vote_json["vote_option_id"]
+        )
+
+    async def increment_vote_count(self, election_id, vote_option_id):
+        # Each increment goes to a random sub-counter of the vote option, so
+        # concurrent votes for the same option rarely update the same document.
+        await self.vote_counts_table.update_one(
+            {
+                "election_id": election_id,
+                "vote_option_id": vote_option_id,
+                "shard": random.randrange(self.counter_shards),
+            },
+            {"$inc": {"count": 1}},
+            upsert=True,
+        )
+
+    async def get_vote_counts(self, election_id):
+        """Return the number of votes of every vote option that has votes."""
+        counts = self.vote_counts_table.aggregate(
+            [
+                {"$match": {"election_id": election_id}},
+                {"$group": {"_id": "$vote_option_id", "count": {"$sum": "$count"}}},
+            ]
+        )
+        return {count["_id"]: count["count"] async for count in counts}
+
+    async def get_all_votes(self):
+        return await self.votes_table.find({}, {"_id": 0}).to_list(length=None)
+
+    async def get_votes_page(self, after=None, limit=100):
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        votes = self.votes_table.find(query, {"_id": 0})
+        return await votes.sort("user_id", ASCENDING).limit(limit).to_list(length=None)
+
+    def iter_votes(self, after=None, batch_size=1000):
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        votes = self.votes_table.find(query, {"_id": 0}, batch_size=batch_size)
+        return votes.sort("user_id", ASCENDING)
+
+    async def get_vote_by_voter_id(self, user_id):
+        return await self.votes_table.find_one({"user_id": user_id}, {"_id": 0})
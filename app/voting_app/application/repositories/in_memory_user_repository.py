@@ -0,0 +1,88 @@
+"""
+Description: This file contains the InMemoryUserRepository class, a drop-in
+replacement of UserRepository that keeps the users in a dict instead of MongoDB.
+Users are copied in and out like documents, and duplicates are detected like
+the unique user_id index does, so the services can be benchmarked and tested
+without a database.
+"""
+
+
+import threading
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class InMemoryUserRepository:
+    def __init__(self):
+        # user_id -> user, like the users collection with its unique index.
+        self.users = {}
+        self._lock = threading.Lock()
+
+    def store_user(self, user_json):
+        """Store a new user based on their user_id."""
+        if not user_json.get("user_id"):
+            raise ValueError("user_id is required to store a user.")
+
+        with self._lock:
+            if user_json["user_id"] in self.users:
+                raise DuplicateKeyError(
+                    "E11000 duplicate key error", DUPLICATE_KEY_ERROR_CODE
+                )
+            self.users[user_json["user_id"]] = dict(user_json)
+
+    def store_user_if_absent(self, user_json):
+        """Store a new user unless one with the same user_id exists."""
+        if not user_json.get("user_id"):
+            raise ValueError("user_id is required to store a user.")
+
+        with self._lock:
+            if user_json["user_id"] in self.users:
+                return False
+            self.users[user_json["user_id"]] = dict(user_json)
+            return True
+
+    def store_users(self, users_json):
+        """Store several users, reporting duplicates like an unordered insert."""
+        inserted = 0
+        write_errors = []
+        with self._lock:
+            for index, user_json in enumerate(users_json):
+                if user_json["user_id"] in self.users:
+                    write_errors.append(
+                        {
+                            "index": index,
+                            "code": DUPLICATE_KEY_ERROR_CODE,
+                            "errmsg": "E11000 duplicate key error",
+                        }
+                    )
+                    continue
+                self.users[user_json["user_id"]] = dict(user_json)
+                inserted += 1
+        return inserted, write_errors
+
+    def get_all_users(self):
+        return list(self.iter_users())
+
+    def get_users_page(self, after=None, limit=100):
+        return list(self.iter_users(after))[:limit]
+
+    def iter_users(self, after=None, batch_size=1000):
+        with self._lock:
+            users = [
+                dict(self.users[user_id])
+                for user_id in sorted(self.users)
+                if after is None or user_id > after
+            ]
+        return iter(users)
+
+    def get_user(self, user_id):
+        with self._lock:
+            user = self.users.get(user_id)
+        return dict(user) if user else None
+
+    def delete_user(self, user_id):
+        with self._lock:
+            deleted = self.users.pop(user_id, None) is not None
+        return SimpleNamespace(deleted_count=int(deleted))
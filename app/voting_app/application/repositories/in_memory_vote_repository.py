@@ -0,0 +1,72 @@
+"""
+Description: This file contains the InMemoryVoteRepository class, a drop-in
+replacement of VoteRepository that keeps the votes and vote counts in dicts
+instead of MongoDB. A second vote of the same voter raises DuplicateKeyError,
+like the unique user_id index does, so the services can be benchmarked and
+tested without a database.
+"""
+
+
+import threading
+from collections import Counter
+from types import SimpleNamespace
+from pymongo.errors import DuplicateKeyError
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class InMemoryVoteRepository:
+    def __init__(self):
+        # user_id -> vote, like the votes collection with its unique index.
+        self.votes = {}
+        # (election_id, vote_option_id) -> number of votes
+        self.vote_counts = Counter()
+        self.vote_writer = None
+        self._lock = threading.Lock()
+
+    def store_vote(self, vote_json):
+        """Store a vote and count it in the results of its election."""
+        with self._lock:
+            if vote_json["user_id"] in self.votes:
+                raise DuplicateKeyError(
+                    "E11000 duplicate key error", DUPLICATE_KEY_ERROR_CODE
+                )
+            self.votes[vote_json["user_id"]] = dict(vote_json)
+            self.vote_counts[
+                (vote_json["election_id"], vote_json["vote_option_id"])
+            ] += 1
+
+    def get_vote_counts(self, election_id):
+        """Return the number of votes of every vote option that has votes."""
+        with self._lock:
+            counts = list(self.vote_counts.items())
+        return {
+            vote_option_id: count
+            for (vote_election_id, vote_option_id), count in counts
+            if vote_election_id == election_id
+        }
+
+    def get_all_votes(self):
+        return list(self.iter_votes())
+
+    def get_votes_page(self, after=None, limit=100):
+        return list(self.iter_votes(after))[:limit]
+
+    def iter_votes(self, after=None, batch_size=1000):
+        with self._lock:
+            votes = [
+                dict(self.votes[user_id])
+                for user_id in sorted(self.votes)
+                if after is None or user_id > after
+            ]
+        return iter(votes)
+
+    def get_vote_by_voter_id(self, user_id):
+        with self._lock:
+            vote = self.votes.get(user_id)
+        return dict(vote) if vote else None
+
+    def delete_vote(self, user_id):
+        with self._lock:
+            deleted = self.votes.pop(user_id, None) is not None
+        return SimpleNamespace(deleted_count=int(deleted))
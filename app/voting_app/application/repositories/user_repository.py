@@ -1,4 +1,6 @@
 from injector import inject
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
 
 class UserRepository:
@@ -17,10 +19,55 @@ class UserRepository:
         # Insert the user into the users collection
         self.users_table.insert_one(user_json)
 
+    def store_user_if_absent(self, user_json):
+        """Store a new user unless one with the same user_id exists.
+
+        Returns True if the user was inserted and False if it already existed.
+        """
+        if not user_json.get("user_id"):
+            raise ValueError("user_id is required to store a user.")
+
+        try:
+            result = self.users_table.update_one(
+                {"user_id": user_json["user_id"]},
+                {"$setOnInsert": user_json},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # A concurrent registration inserted the same user_id first.
+            return False
+
+        return result.upserted_id is not None
+
+    def store_users(self, users_json):
+        """Store several users with a single unordered insert.
+
+        Returns the number of inserted users and the write errors of the users
+        that could not be stored, each with the index of the user in the list.
+        """
+        try:
+            result = self.users_table.insert_many(users_json, ordered=False)
+        except BulkWriteError as e:
+            return e.details["nInserted"], e.details["writeErrors"]
+
+        return len(result.inserted_ids), []
+
     def get_all_users(self):
         """Retrieve all users from the user collection."""
         return list(self.users_table.find({}, {"_id": 0}))
 
+    def get_users_page(self, after=None, limit=100):
+        """Retrieve up to `limit` users with a user_id greater than `after`."""
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        users = self.users_table.find(query, {"_id": 0})
+        return list(users.sort("user_id", ASCENDING).limit(limit))
+
+    def iter_users(self, after=None, batch_size=1000):
+        """Return a cursor over the users, ordered by user_id."""
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        users = self.users_table.find(query, {"_id": 0}, batch_size=batch_size)
+        return users.sort("user_id", ASCENDING)
+
     def get_user(self, user_id):
         """Retrieve a user by their user_id."""
         user = self.users_table.find_one({"user_id": user_id}, {"_id": 0})
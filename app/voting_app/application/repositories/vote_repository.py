@@ -1,18 +1,78 @@
+import random
 from injector import inject
+from pymongo import ASCENDING
+from ..utils.group_commit import GroupCommitVoteWriter
 
 
 class VoteRepository:
     @inject
-    def __init__(self, mongo):
+    def __init__(self, mongo, counter_shards=1, batch_size=1, batch_max_delay=0.0):
+        # Checked here, a vote would otherwise be stored but never counted.
+        if counter_shards < 1:
+            raise ValueError("VOTE_COUNTER_SHARDS must be at least 1.")
+
         self.mongo = mongo
         self.votes_table = mongo.cx.votes_db.votes
+        self.vote_counts_table = mongo.cx.votes_db.vote_counts
+        self.counter_shards = counter_shards
+
+        # With a batch size above 1, the votes of concurrent requests are
+        # written together by a group-commit writer.
+        self.vote_writer = None
+        if batch_size > 1:
+            self.vote_writer = GroupCommitVoteWriter(
+                self.votes_table,
+                self.vote_counts_table,
+                counter_shards,
+                batch_size,
+                batch_max_delay,
+            )
 
     def store_vote(self, vote_json):
+        """Store a vote and count it in the results of its election."""
+        if self.vote_writer:
+            self.vote_writer.write(vote_json)
+            return
+
         self.votes_table.insert_one(vote_json)
+        self.increment_vote_count(vote_json["election_id"], vote_json["vote_option_id"])
+
+    def increment_vote_count(self, election_id, vote_option_id):
+        # Each increment goes to a random sub-counter of the vote option, so
+        # concurrent votes for the same option rarely update the same document.
+        self.vote_counts_table.update_one(
+            {
+                "election_id": election_id,
+                "vote_option_id": vote_option_id,
+                "shard": random.randrange(self.counter_shards),
+            },
+            {"$inc": {"count": 1}},
+            upsert=True,
+        )
+
+    def get_vote_counts(self, election_id):
+        """Return the number of votes of every vote option that has votes."""
+        counts = self.vote_counts_table.aggregate(
+            [
+                {"$match": {"election_id": election_id}},
+                {"$group": {"_id": "$vote_option_id", "count": {"$sum": "$count"}}},
+            ]
+        )
+        return {count["_id"]: count["count"] for count in counts}
 
     def get_all_votes(self):
         return list(self.votes_table.find({}, {"_id": 0}))
 
+    def get_votes_page(self, after=None, limit=100):
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        votes = self.votes_table.find(query, {"_id": 0})
+        return list(votes.sort("user_id", ASCENDING).limit(limit))
+
+    def iter_votes(self, after=None, batch_size=1000):
+        query = {} if after is None else {"user_id": {"$gt": after}}
+        votes = self.votes_table.find(query, {"_id": 0}, batch_size=batch_size)
+        return votes.sort("user_id", ASCENDING)
+
     def get_vote_by_voter_id(self, user_id):
         vote = self.votes_table.find_one({"user_id": user_id}, {"_id": 0})
 
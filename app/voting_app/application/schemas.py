@@ -1,3 +1,5 @@
+from pymongo import ASCENDING, IndexModel
+
 # User Collection with Validation
 user_schema = {
     "$jsonSchema": {
@@ -39,6 +41,32 @@ votes_schema = {
     }
 }
 
+# Vote Counts Collection with Validation
+vote_counts_schema = {
+    "$jsonSchema": {
+        "bsonType": "object",
+        "required": ["election_id", "vote_option_id", "shard", "count"],
+        "properties": {
+            "election_id": {
+                "bsonType": "int",
+                "description": "ID of the election the votes belong to",
+            },
+            "vote_option_id": {
+                "bsonType": "int",
+                "description": "ID of the counted vote option",
+            },
+            "shard": {
+                "bsonType": "int",
+                "description": "Sub-counter of the vote option",
+            },
+            "count": {
+                "bsonType": ["int", "long"],
+                "description": "Number of votes counted by this sub-counter",
+            },
+        },
+    }
+}
+
 # Vote Options Collection with Validation
 vote_option_schema = {
     "$jsonSchema": {
@@ -98,3 +126,28 @@ election_schema = {
         },
     }
 }
+
+
+# Indexes created at startup. Keep the "users" indexes identical in both
+# services, as both of them create them.
+users_indexes = [
+    IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    IndexModel([("email", ASCENDING)], name="email"),
+]
+
+# A unique user_id makes the database enforce one vote per voter.
+votes_indexes = [
+    IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+]
+
+vote_counts_indexes = [
+    IndexModel(
+        [
+            ("election_id", ASCENDING),
+            ("vote_option_id", ASCENDING),
+            ("shard", ASCENDING),
+        ],
+        name="election_id_vote_option_id_shard_unique",
+        unique=True,
+    ),
+]
@@ -0,0 +1,58 @@
+"""
+Description: This file defines the AsyncUserService class, the asynchronous
+counterpart of UserService used by the ASGI app, with the following
+functionalities:
+- Creating a user.
+- Retrieving a single or all users.
+- Deleting a user.
+"""
+
+
+from ..models import Citizen, Admin
+from ..repositories.async_user_repository import AsyncUserRepository
+from ..exceptions.user_already_exists_error import UserAlreadyExistsError
+from ..exceptions.user_not_found_error import UserNotFoundError
+
+
+class AsyncUserService:
+    def __init__(self, user_repository: AsyncUserRepository):
+        self.user_repository = user_repository
+
+    async def create_user(self, data, admin_rights=False):
+        email, password, user_id = (
+            data.get("email"),
+            data.get("password"),
+            data.get("user_id"),
+        )
+
+        if admin_rights:
+            user = Admin(user_id, email, password)
+        else:
+            user = Citizen(user_id, email, password)
+
+        if not await self.user_repository.store_user_if_absent(user.to_json()):
+            raise UserAlreadyExistsError(user_id)
+
+    async def get_all_users(self):
+        return await self.user_repository.get_all_users()
+
+    async def get_users_page(self, after=None, limit=100):
+        return await self.user_repository.get_users_page(after, limit)
+
+    def iter_users(self, after=None):
+        return self.user_repository.iter_users(after)
+
+    async def get_user(self, user_id):
+        user = await self.user_repository.get_user(user_id)
+
+        if not user:
+            raise UserNotFoundError(user_id)
+
+        return user
+
+    async def delete_user(self, user_id):
+        result = await self.user_repository.delete_user(user_id)
+
+        # If no user was deleted, raise a `UserNotFoundError`
+        if result.deleted_count == 0:
+            raise UserNotFoundError(user_id)
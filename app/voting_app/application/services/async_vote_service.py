@@ -0,0 +1,67 @@
+"""
+Description: This file defines the AsyncVoteService class, the asynchronous
+counterpart of VoteService used by the ASGI app, with the following
+functionalities:
+- Voting in an election.
+- Retrieving a single vote or all votes.
+- Retrieving the results of the current election.
+"""
+
+from pymongo.errors import DuplicateKeyError
+from .vote_service import VoteService
+from ..repositories.async_vote_repository import AsyncVoteRepository
+from ..utils.election_cache import election_cache as shared_election_cache
+from ..exceptions.vote_not_found_error import VoteNotFoundError
+from ..exceptions.vote_option_not_found_error import VoteOptionNotFoundError
+from ..exceptions.user_has_already_voted_error import UserHasAlreadyVotedError
+
+
+class AsyncVoteService:
+    def __init__(
+        self,
+        vote_repository: AsyncVoteRepository,
+        election_cache=shared_election_cache,
+    ):
+        self.vote_repository = vote_repository
+        self.election_cache = election_cache
+
+    async def vote_in_election(self, user_id, vote_option_id):
+        # The cached election is only re-read when its file changed, so this
+        # does not block the event loop.
+        election = self.election_cache.get()
+
+        if vote_option_id not in election.vote_option_ids:
+            raise VoteOptionNotFoundError(vote_option_id)
+
+        vote = {
+            "user_id": user_id,
+            "vote_option_id": vote_option_id,
+            "election_id": election.election_id,
+        }
+        try:
+            await self.vote_repository.store_vote(vote)
+        except DuplicateKeyError:
+            # The unique index on votes.user_id allows a single vote per voter.
+            raise UserHasAlreadyVotedError(user_id)
+
+    async def get_results(self):
+        election = self.election_cache.get().election
+        vote_counts = await self.vote_repository.get_vote_counts(election.id)
+        return VoteService.build_results(election, vote_counts)
+
+    async def get_all_votes(self):
+        return await self.vote_repository.get_all_votes()
+
+    async def get_votes_page(self, after=None, limit=100):
+        return await self.vote_repository.get_votes_page(after, limit)
+
+    def iter_votes(self, after=None):
+        return self.vote_repository.iter_votes(after)
+
+    async def get_vote(self, user_id):
+        vote = await self.vote_repository.get_vote_by_voter_id(user_id)
+
+        if not vote:
+            raise VoteNotFoundError(user_id)
+
+        return vote
@@ -1,14 +1,20 @@
-# from ..models import Election, VoteOption
-from ..utils.data_loader import load_election
+import logging
+from ..utils.election_cache import election_cache as shared_election_cache
+from ..utils.tracing import traced
+
+logger = logging.getLogger(__name__)
 
 
 class ElectionService:
-    def __init__(self):
-        pass
+    def __init__(self, election_cache=shared_election_cache):
+        self.election_cache = election_cache
+
+    def get_current_snapshot(self):
+        return self.election_cache.get()
 
+    @traced("ElectionService.get_current_election")
     def get_current_election(self):
-        currentElection = load_election()
-        print("after load: ")
-        print(currentElection)
+        currentElection = self.get_current_snapshot().election
+        logger.debug("Loaded the current election %s", currentElection.id)
 
         return currentElection.to_json()
@@ -2,42 +2,150 @@
 Description: This file defines the UserService class, with the
 following functionalities:
 - Creating a user.
+- Creating citizens in bulk.
 - Retrieving a single or all users.
 - Deleting a user.
 
 """
 
 
+import heapq
 from ..models import Citizen, Admin
 from ..repositories.user_repository import UserRepository
 from ..exceptions.user_already_exists_error import UserAlreadyExistsError
 from ..exceptions.user_not_found_error import UserNotFoundError
+from ..exceptions.missing_fields_error import MissingFieldsError
+from ..utils.tracing import traced
+
+# Citizens validated and written with a single insert when registering in bulk.
+BULK_BATCH_SIZE = 1000
+# Rows reported with their error when registering in bulk, the others are only
+# counted, so importing a roll that was already imported keeps a small response.
+BULK_MAX_ERRORS = 1000
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class RowErrors:
+    """Counts the rows that failed, keeping the errors of the first ones."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.count = 0
+        # Max-heap on the row number of the kept errors.
+        self._kept = []
+
+    def add(self, row, user_id, error):
+        self.count += 1
+        item = (-row, {"row": row, "user_id": user_id, "error": error})
+        if len(self._kept) < self.limit:
+            heapq.heappush(self._kept, item)
+        elif self._kept and row < -self._kept[0][0]:
+            heapq.heapreplace(self._kept, item)
+
+    def first(self):
+        """Return the kept errors, ordered by row."""
+        return [error for _, error in sorted(self._kept, reverse=True)]
 
 
 class UserService:
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
 
+    @traced("UserService.create_user")
     def create_user(self, data, admin_rights=False):
-        all_users = self.user_repository.get_all_users()
         email, password, user_id = (
             data.get("email"),
             data.get("password"),
             data.get("user_id"),
         )
 
-        if any(user.get("user_id") == user_id for user in all_users):
-            raise UserAlreadyExistsError(user_id)
-
         if admin_rights:
             user = Admin(user_id, email, password)
         else:
             user = Citizen(user_id, email, password)
-        self.user_repository.store_user(user.to_json())
+
+        # The unique index on user_id detects duplicates, so registering does
+        # not depend on the number of users already stored.
+        if not self.user_repository.store_user_if_absent(user.to_json()):
+            raise UserAlreadyExistsError(user_id)
+
+    @traced("UserService.create_users")
+    def create_users(
+        self, rows, batch_size=BULK_BATCH_SIZE, max_errors=BULK_MAX_ERRORS
+    ):
+        """Register citizens in bulk.
+
+        `rows` can be any iterable of citizen dicts, such as the lines of an
+        NDJSON file being read. Rows are validated and stored batch by batch.
+        The rows that could not be registered are counted, and the first
+        `max_errors` of them are reported with the reason.
+        """
+        inserted = 0
+        errors = RowErrors(max_errors)
+        batch, batch_rows = [], []
+
+        for row_number, row in enumerate(rows):
+            error = self._validate_citizen(row)
+            if error:
+                user_id = row.get("user_id") if isinstance(row, dict) else None
+                errors.add(row_number, user_id, error)
+                continue
+
+            user = Citizen(row["user_id"], row["email"], row["password"])
+            batch.append(user.to_json())
+            batch_rows.append(row_number)
+
+            if len(batch) == batch_size:
+                inserted += self._store_batch(batch, batch_rows, errors)
+                batch, batch_rows = [], []
+
+        if batch:
+            inserted += self._store_batch(batch, batch_rows, errors)
+
+        return {
+            "inserted": inserted,
+            "error_count": errors.count,
+            "errors": errors.first(),
+        }
+
+    def _store_batch(self, batch, batch_rows, errors):
+        inserted, write_errors = self.user_repository.store_users(batch)
+
+        for write_error in write_errors:
+            user_id = batch[write_error["index"]]["user_id"]
+            if write_error["code"] == DUPLICATE_KEY_ERROR_CODE:
+                error = str(UserAlreadyExistsError(user_id))
+            else:
+                error = write_error["errmsg"]
+            errors.add(batch_rows[write_error["index"]], user_id, error)
+
+        return inserted
+
+    @staticmethod
+    def _validate_citizen(row):
+        """Return why a row can not be registered, or None if it is valid."""
+        if isinstance(row, ValueError):
+            # A line of an NDJSON body that could not be parsed.
+            return f"Invalid JSON: {row}"
+        if not isinstance(row, dict):
+            return "Row must be a JSON object."
+        if not row.get("user_id") or not row.get("password") or not row.get("email"):
+            return str(MissingFieldsError())
+        if not isinstance(row["user_id"], int) or isinstance(row["user_id"], bool):
+            return "user_id must be an integer."
+        if not isinstance(row["email"], str) or not isinstance(row["password"], str):
+            return "email and password must be strings."
+        return None
 
     def get_all_users(self):
         return self.user_repository.get_all_users()
 
+    def get_users_page(self, after=None, limit=100):
+        return self.user_repository.get_users_page(after, limit)
+
+    def iter_users(self, after=None):
+        return self.user_repository.iter_users(after)
+
     def get_user(self, user_id):
         user = self.user_repository.get_user(user_id)
 
@@ -50,5 +158,5 @@ class UserService:
         result = self.user_repository.delete_user(user_id)
 
         # If no user was deleted, raise a `UserNotFoundError`
-        if result == 0:
+        if result.deleted_count == 0:
             raise UserNotFoundError(user_id)
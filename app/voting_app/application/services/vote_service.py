@@ -3,45 +3,77 @@ Description: This file defines the VoteService class with the
 following functionalities:
 - Voting in an election.
 - Retrieving a sigle vote or all votes
+- Retrieving the results of the current election.
 """
 
-from ..repositories.user_repository import UserRepository
+from pymongo.errors import DuplicateKeyError
 from ..repositories.vote_repository import VoteRepository
-from ..utils.data_loader import load_election
+from ..utils.election_cache import election_cache as shared_election_cache
+from ..utils.tracing import traced
 from ..exceptions.vote_not_found_error import VoteNotFoundError
-from ..exceptions.user_not_found_error import UserNotFoundError
 from ..exceptions.vote_option_not_found_error import VoteOptionNotFoundError
 from ..exceptions.user_has_already_voted_error import UserHasAlreadyVotedError
 
 
 class VoteService:
     def __init__(
-        self, user_repository: UserRepository, vote_repository: VoteRepository
+        self, vote_repository: VoteRepository, election_cache=shared_election_cache
     ):
-        self.user_repository = user_repository
         self.vote_repository = vote_repository
+        self.election_cache = election_cache
 
+    @traced("VoteService.vote_in_election")
     def vote_in_election(self, user_id, vote_option_id):
-        user = self.user_repository.get_user(user_id)
-        vote = self.vote_repository.get_vote_by_voter_id(user_id)
-        vote_options = load_election().to_json()["vote_options"]
-
-        if not user:
-            raise UserNotFoundError(user_id)
-        if not any(
-            vote_option.get("vote_option_id") == vote_option_id
-            for vote_option in vote_options
-        ):
+        # The authentication service signs the token with the user_id of the
+        # user the 2FA code belongs to, so the voter is not looked up again and
+        # the only round trip is the insert itself.
+        election = self.election_cache.get()
+
+        if vote_option_id not in election.vote_option_ids:
             raise VoteOptionNotFoundError(vote_option_id)
-        if vote:
+
+        vote = {
+            "user_id": user_id,
+            "vote_option_id": vote_option_id,
+            "election_id": election.election_id,
+        }
+        try:
+            self.vote_repository.store_vote(vote)
+        except DuplicateKeyError:
+            # The unique index on votes.user_id allows a single vote per voter.
             raise UserHasAlreadyVotedError(user_id)
 
-        vote = {"user_id": user_id, "vote_option_id": vote_option_id}
-        self.vote_repository.store_vote(vote)
+    @traced("VoteService.get_results")
+    def get_results(self):
+        election = self.election_cache.get().election
+        vote_counts = self.vote_repository.get_vote_counts(election.id)
+        return self.build_results(election, vote_counts)
+
+    @staticmethod
+    def build_results(election, vote_counts):
+        results = [
+            {
+                "vote_option_id": vote_option.id,
+                "party_name": vote_option.party_name,
+                "votes": vote_counts.get(vote_option.id, 0),
+            }
+            for vote_option in election.vote_options
+        ]
+        return {
+            "election_id": election.id,
+            "total_votes": sum(result["votes"] for result in results),
+            "results": results,
+        }
 
     def get_all_votes(self):
         return self.vote_repository.get_all_votes()
 
+    def get_votes_page(self, after=None, limit=100):
+        return self.vote_repository.get_votes_page(after, limit)
+
+    def iter_votes(self, after=None):
+        return self.vote_repository.iter_votes(after)
+
     def get_vote(self, user_id):
         vote = self.vote_repository.get_vote_by_voter_id(user_id)
 
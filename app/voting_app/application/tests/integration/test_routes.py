@@ -4,6 +4,7 @@ Testing the endpoints related to storing votes and retrieving votes.
 """
 
 
+import json
 import pytest
 import jwt
 import datetime
@@ -70,12 +71,18 @@ def test_get_election(client, mock_election_service):
             },
         ],
     }
-    mock_election_service.return_value.get_current_election.return_value = election
+    snapshot = mock_election_service.return_value.get_current_snapshot.return_value
+    snapshot.response_bytes = json.dumps(election).encode("utf-8")
 
     response = client.get("/election")
     assert response.status_code == 200
     assert response.json == election
 
+    etag = response.headers["ETag"]
+    response = client.get("/election", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
 
 def test_register_citizen_success(client, mock_user_service):
     mock_user_service.return_value.create_user.return_value = None  # Simulate success
@@ -182,3 +189,10 @@ def test_vote_missing_fields(client, valid_token):
     )
     assert response.status_code == 400
     assert "error" in response.json
+
+
+@pytest.mark.parametrize("body", ["[{", '{"user_id": 1}'])
+def test_create_users_bulk_requires_a_json_array(client, body):
+    response = client.post("/users/bulk", data=body, content_type="application/json")
+    assert response.status_code == 400
+    assert response.json["error"] == "The body must be a JSON array of citizens."
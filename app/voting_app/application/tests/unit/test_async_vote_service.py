@@ -0,0 +1,63 @@
+"""
+Description: This file contains unit tests for the AsyncVoteService of the
+ASGI app, checking that it behaves like the VoteService.
+"""
+
+
+import unittest
+from unittest.mock import AsyncMock, Mock
+from pymongo.errors import DuplicateKeyError
+from application.models import Election, VoteOption
+from application.services.async_vote_service import AsyncVoteService
+from application.utils.election_cache import ElectionSnapshot
+from application.exceptions.user_has_already_voted_error import (
+    UserHasAlreadyVotedError,
+)
+from application.exceptions.vote_option_not_found_error import (
+    VoteOptionNotFoundError,
+)
+
+
+class TestAsyncVoteService(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        election = Election(
+            1,
+            "06-10-2024",
+            [VoteOption(2, "party2", [], "photo"), VoteOption(3, "party3", [], "")],
+        )
+        election_cache = Mock()
+        election_cache.get.return_value = ElectionSnapshot(election)
+
+        self.vote_repository = AsyncMock()
+        self.vote_service = AsyncVoteService(self.vote_repository, election_cache)
+
+    async def test_vote_is_stored_with_a_single_insert(self):
+        await self.vote_service.vote_in_election(1234, 2)
+
+        self.vote_repository.store_vote.assert_awaited_once_with(
+            {"user_id": 1234, "vote_option_id": 2, "election_id": 1}
+        )
+
+    async def test_duplicate_vote_raises_user_has_already_voted(self):
+        self.vote_repository.store_vote.side_effect = DuplicateKeyError("dup")
+
+        with self.assertRaises(UserHasAlreadyVotedError):
+            await self.vote_service.vote_in_election(1234, 2)
+
+    async def test_unknown_vote_option_is_rejected_before_writing(self):
+        with self.assertRaises(VoteOptionNotFoundError):
+            await self.vote_service.vote_in_election(1234, 42)
+
+        self.vote_repository.store_vote.assert_not_awaited()
+
+    async def test_results_match_the_vote_service(self):
+        self.vote_repository.get_vote_counts.return_value = {2: 5}
+
+        results = await self.vote_service.get_results()
+
+        self.assertEqual(results["total_votes"], 5)
+        self.assertEqual([result["votes"] for result in results["results"]], [5, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+Description: This file contains unit tests for the database bootstrap,
+covering concurrent workers and the bootstrap before the first request.
+"""
+
+
+import unittest
+from unittest.mock import MagicMock
+from flask import Flask
+from pymongo.errors import CollectionInvalid, OperationFailure
+from application.bootstrap import (
+    bootstrap_before_first_request,
+    bootstrap_database,
+    collection_schemas,
+)
+
+
+class TestBootstrapDatabase(unittest.TestCase):
+    def setUp(self):
+        self.db = MagicMock()
+        self.db.list_collection_names.return_value = ["users"]
+
+    def test_missing_collections_are_created(self):
+        bootstrap_database(self.db)
+
+        self.db.list_collection_names.assert_called_once_with()
+        created = [call.args[0] for call in self.db.create_collection.call_args_list]
+        self.assertEqual(created, [name for name in collection_schemas][1:])
+
+    def test_collection_created_by_another_worker_is_ignored(self):
+        self.db.create_collection.side_effect = [
+            CollectionInvalid("collection votes already exists"),
+            OperationFailure("Collection already exists", code=48),
+        ] + [None] * len(collection_schemas)
+
+        bootstrap_database(self.db)
+
+        self.db.users.create_indexes.assert_called_once()
+
+    def test_other_errors_are_raised(self):
+        self.db.create_collection.side_effect = OperationFailure("denied", code=13)
+
+        with self.assertRaises(OperationFailure):
+            bootstrap_database(self.db)
+
+
+class TestBootstrapBeforeFirstRequest(unittest.TestCase):
+    def test_database_is_bootstrapped_once(self):
+        app = Flask(__name__)
+        db = MagicMock()
+        db.list_collection_names.return_value = list(collection_schemas)
+        bootstrap_before_first_request(app, db)
+
+        client = app.test_client()
+        client.get("/")
+        client.get("/")
+
+        db.list_collection_names.assert_called_once_with()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Description: This file contains unit tests for the election cache, checking
+that the election file is only parsed again when it changes.
+"""
+
+
+import json
+import os
+import tempfile
+import unittest
+from application.utils.election_cache import ElectionCache
+
+ELECTION = {
+    "election_id": 1,
+    "date": "06-10-2024",
+    "vote_options": [
+        {
+            "vote_option_id": 1,
+            "party_name": "party1",
+            "candidates": ["name0"],
+            "photo": "photo1",
+        },
+        {
+            "vote_option_id": 2,
+            "party_name": "party2",
+            "candidates": ["name1"],
+            "photo": "photo2",
+        },
+    ],
+}
+
+
+class TestElectionCache(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.write_election(ELECTION)
+        self.cache = ElectionCache(self.path, check_interval=0)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write_election(self, election):
+        with open(self.path, "w") as file:
+            json.dump(election, file)
+
+    def test_snapshot_contents(self):
+        snapshot = self.cache.get()
+        self.assertEqual(snapshot.election_id, 1)
+        self.assertEqual(snapshot.vote_option_ids, frozenset({1, 2}))
+        self.assertEqual(json.loads(snapshot.response_bytes), ELECTION)
+
+    def test_unchanged_file_is_not_reloaded(self):
+        first = self.cache.get()
+        second = self.cache.get()
+        self.assertIs(first, second)
+        self.assertEqual(self.cache.stats()["reloads"], 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_changed_file_is_reloaded(self):
+        first = self.cache.get()
+        election = dict(ELECTION, vote_options=ELECTION["vote_options"][:1])
+        self.write_election(election)
+        os.utime(self.path, ns=(0, 1))
+
+        second = self.cache.get()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.vote_option_ids, frozenset({1}))
+        self.assertEqual(self.cache.stats()["reloads"], 2)
+
+    def test_invalid_file_keeps_previous_snapshot(self):
+        first = self.cache.get()
+        with open(self.path, "w") as file:
+            file.write("{")
+        os.utime(self.path, ns=(0, 1))
+
+        self.assertIs(self.cache.get(), first)
+        self.assertEqual(self.cache.stats()["load_errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Description: This file contains unit tests for the group-commit vote writer,
+checking that concurrent votes are written together and that every caller
+gets the outcome of its own vote.
+"""
+
+
+import threading
+import unittest
+from unittest.mock import Mock
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from application.utils.group_commit import GroupCommitVoteWriter
+
+
+class TestGroupCommitVoteWriter(unittest.TestCase):
+    def setUp(self):
+        self.votes_table = Mock()
+        self.vote_counts_table = Mock()
+        self.vote_writer = GroupCommitVoteWriter(
+            self.votes_table, self.vote_counts_table, batch_size=4, max_delay=5
+        )
+        self.addCleanup(self.vote_writer.stop)
+
+    def write_concurrently(self, votes):
+        outcomes = {}
+
+        def write(vote):
+            try:
+                self.vote_writer.write(vote)
+                outcomes[vote["user_id"]] = "stored"
+            except DuplicateKeyError:
+                outcomes[vote["user_id"]] = "duplicate"
+
+        threads = [threading.Thread(target=write, args=(vote,)) for vote in votes]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return outcomes
+
+    def vote(self, user_id, vote_option_id):
+        return {"user_id": user_id, "vote_option_id": vote_option_id, "election_id": 1}
+
+    def test_full_batch_is_written_with_one_insert(self):
+        outcomes = self.write_concurrently([self.vote(n, n % 2 + 2) for n in range(4)])
+
+        self.assertEqual(outcomes, {n: "stored" for n in range(4)})
+        self.votes_table.insert_many.assert_called_once()
+        (votes,), kwargs = self.votes_table.insert_many.call_args
+        self.assertEqual(len(votes), 4)
+        self.assertEqual(kwargs, {"ordered": False})
+
+        (updates,), _ = self.vote_counts_table.bulk_write.call_args
+        counts = {
+            update._filter["vote_option_id"]: update._doc["$inc"]["count"]
+            for update in updates
+        }
+        self.assertEqual(counts, {2: 2, 3: 2})
+
+    def test_each_caller_gets_its_own_duplicate_key_error(self):
+        def insert_many(votes, ordered):
+            index = next(i for i, vote in enumerate(votes) if vote["user_id"] == 2)
+            raise BulkWriteError(
+                {
+                    "writeErrors": [
+                        {"index": index, "code": 11000, "errmsg": "duplicate key"}
+                    ],
+                    "writeConcernErrors": [],
+                    "nInserted": len(votes) - 1,
+                }
+            )
+
+        self.votes_table.insert_many.side_effect = insert_many
+        outcomes = self.write_concurrently([self.vote(n, 2) for n in range(4)])
+
+        self.assertEqual(
+            outcomes, {0: "stored", 1: "stored", 2: "duplicate", 3: "stored"}
+        )
+        (updates,), _ = self.vote_counts_table.bulk_write.call_args
+        self.assertEqual(updates[0]._doc, {"$inc": {"count": 3}})
+
+    def test_partial_batch_is_written_after_the_delay(self):
+        self.vote_writer.max_delay = 0.01
+
+        self.vote_writer.write(self.vote(1, 2))
+
+        self.votes_table.insert_many.assert_called_once()
+
+    def test_failed_batch_fails_every_caller(self):
+        self.vote_writer.max_delay = 0.01
+        self.votes_table.insert_many.side_effect = ConnectionError("unreachable")
+
+        with self.assertRaises(ConnectionError):
+            self.vote_writer.write(self.vote(1, 2))
+        self.vote_counts_table.bulk_write.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
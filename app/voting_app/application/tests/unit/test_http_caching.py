@@ -0,0 +1,98 @@
+"""
+Description: This file contains unit tests for the cacheable GET /election
+response, checking the choice of the precompressed body, the ETags and the
+conditional requests.
+"""
+
+
+import gzip
+import json
+import unittest
+import brotli
+from application.models import Election, VoteOption
+from application.utils.election_cache import ElectionSnapshot
+from application.utils.http_caching import (
+    choose_encoding,
+    election_response,
+    etag_matches,
+)
+
+
+def make_snapshot(party_name="party2"):
+    return ElectionSnapshot(
+        Election(1, "06-10-2024", [VoteOption(2, party_name, ["name0"], "photo")])
+    )
+
+
+class TestChooseEncoding(unittest.TestCase):
+    def test_brotli_is_preferred(self):
+        self.assertEqual(choose_encoding("gzip, deflate, br"), "br")
+
+    def test_quality_values_are_respected(self):
+        self.assertEqual(choose_encoding("br;q=0.5, gzip"), "gzip")
+        self.assertEqual(choose_encoding("br;q=0, gzip;q=0"), "identity")
+        self.assertEqual(choose_encoding("*"), "br")
+
+    def test_no_header_gets_the_identity(self):
+        self.assertEqual(choose_encoding(None), "identity")
+        self.assertEqual(choose_encoding("deflate"), "identity")
+
+
+class TestElectionResponse(unittest.TestCase):
+    def test_precompressed_bodies_hold_the_election(self):
+        snapshot = make_snapshot()
+
+        status, body, headers = election_response(snapshot, "gzip", None, 60)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(body), snapshot.response_bytes)
+
+        status, body, headers = election_response(snapshot, "br", None, 60)
+        self.assertEqual(headers["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(body), snapshot.response_bytes)
+
+        status, body, headers = election_response(snapshot, None, None, 60)
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(json.loads(body)["election_id"], 1)
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertEqual(
+            headers["Cache-Control"], "public, max-age=60, stale-while-revalidate=60"
+        )
+
+    def test_every_representation_has_its_own_strong_etag(self):
+        snapshot = make_snapshot()
+
+        etags = {etag for _, etag in snapshot.encodings.values()}
+
+        self.assertEqual(len(etags), 3)
+        self.assertEqual(make_snapshot().etag, snapshot.etag)
+        self.assertNotEqual(make_snapshot("party3").etag, snapshot.etag)
+
+    def test_matching_etag_gets_a_304_without_body(self):
+        snapshot = make_snapshot()
+        _, _, headers = election_response(snapshot, "br", None, 60)
+
+        status, body, headers = election_response(
+            snapshot, "gzip", f'"other", W/{headers["ETag"]}', 60
+        )
+
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+        self.assertEqual(headers["ETag"], snapshot.encodings["gzip"][1])
+
+    def test_etag_of_another_election_gets_the_body(self):
+        status, _, _ = election_response(
+            make_snapshot(), None, make_snapshot("party3").etag, 60
+        )
+
+        self.assertEqual(status, 200)
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches("*", {'"a"'}))
+        self.assertTrue(etag_matches('"b", "a"', {'"a"'}))
+        self.assertFalse(etag_matches('"b"', {'"a"'}))
+        self.assertFalse(etag_matches(None, {'"a"'}))
+
+
+if __name__ == "__main__":
+    unittest.main()
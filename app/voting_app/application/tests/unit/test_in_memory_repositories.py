@@ -0,0 +1,81 @@
+"""
+Description: This file contains unit tests for the in-memory repositories,
+checking that the services behave with them like with MongoDB.
+"""
+
+
+import unittest
+from application.repositories.in_memory_user_repository import InMemoryUserRepository
+from application.repositories.in_memory_vote_repository import InMemoryVoteRepository
+from application.services.user_service import UserService
+from application.services.vote_service import VoteService
+from application.utils.election_cache import ElectionCache
+from application.exceptions.user_already_exists_error import UserAlreadyExistsError
+from application.exceptions.user_has_already_voted_error import (
+    UserHasAlreadyVotedError,
+)
+from application.exceptions.user_not_found_error import UserNotFoundError
+
+CITIZEN = {"user_id": 1234, "email": "citizen@example.com", "password": "pass"}
+
+
+class TestInMemoryUserRepository(unittest.TestCase):
+    def setUp(self):
+        self.user_service = UserService(InMemoryUserRepository())
+
+    def test_create_user_once(self):
+        self.user_service.create_user(CITIZEN)
+
+        with self.assertRaises(UserAlreadyExistsError):
+            self.user_service.create_user(CITIZEN)
+        self.assertEqual(
+            self.user_service.get_user(1234), dict(CITIZEN, admin_rights=False)
+        )
+
+    def test_create_users_reports_duplicates(self):
+        self.user_service.create_user(CITIZEN)
+        rows = [dict(CITIZEN, user_id=user_id) for user_id in (1, 1234, 2)]
+
+        result = self.user_service.create_users(rows)
+
+        self.assertEqual(result["inserted"], 2)
+        self.assertEqual([error["row"] for error in result["errors"]], [1])
+
+    def test_users_page_is_ordered_by_user_id(self):
+        for user_id in (3, 1, 2):
+            self.user_service.create_user(dict(CITIZEN, user_id=user_id))
+
+        page = self.user_service.get_users_page(after=1, limit=1)
+
+        self.assertEqual([user["user_id"] for user in page], [2])
+
+    def test_delete_missing_user_raises(self):
+        with self.assertRaises(UserNotFoundError):
+            self.user_service.delete_user(1234)
+
+
+class TestInMemoryVoteRepository(unittest.TestCase):
+    def setUp(self):
+        self.vote_service = VoteService(InMemoryVoteRepository(), ElectionCache())
+        self.vote_option_ids = sorted(
+            self.vote_service.election_cache.get().vote_option_ids
+        )
+
+    def test_vote_once(self):
+        self.vote_service.vote_in_election(1, self.vote_option_ids[0])
+
+        with self.assertRaises(UserHasAlreadyVotedError):
+            self.vote_service.vote_in_election(1, self.vote_option_ids[1])
+
+    def test_results_count_the_votes(self):
+        for user_id in range(1, 4):
+            self.vote_service.vote_in_election(user_id, self.vote_option_ids[0])
+
+        results = self.vote_service.get_results()
+
+        self.assertEqual(results["total_votes"], 3)
+        self.assertEqual(results["results"][0]["votes"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
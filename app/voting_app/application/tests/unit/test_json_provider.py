@@ -0,0 +1,76 @@
+"""
+Description: This file contains unit tests for the JSON provider, checking
+that orjson and its fallback on the json module return the same bytes, and
+that the BSON types are serialized.
+"""
+
+
+import datetime
+import json
+import unittest
+from unittest.mock import patch
+from bson import Decimal128, ObjectId
+from flask import Flask, jsonify, request
+from application.utils import json_provider
+from application.utils.json_provider import FastJSONProvider, dumps
+
+DOCUMENT = {
+    "user_id": 2**40,
+    "_id": ObjectId("65f000000000000000000000"),
+    "created": datetime.datetime(2024, 6, 10, 12, 30, 0, 500),
+    "date": datetime.date(2024, 6, 10),
+    "amount": Decimal128("1.50"),
+    "email": "électeur@example.com",
+    "vote_options": [1, 2.5, None, True],
+}
+EXPECTED = {
+    "user_id": 2**40,
+    "_id": "65f000000000000000000000",
+    "created": "2024-06-10T12:30:00.000500",
+    "date": "2024-06-10",
+    "amount": "1.50",
+    "email": "électeur@example.com",
+    "vote_options": [1, 2.5, None, True],
+}
+
+
+class TestDumps(unittest.TestCase):
+    def test_bson_types_are_serialized(self):
+        self.assertEqual(json.loads(dumps(DOCUMENT)), EXPECTED)
+
+    @unittest.skipIf(json_provider.orjson is None, "orjson is not installed")
+    def test_fallback_returns_the_same_bytes(self):
+        encoded = dumps(DOCUMENT, sort_keys=True)
+
+        with patch.object(json_provider, "orjson", None):
+            self.assertEqual(dumps(DOCUMENT, sort_keys=True), encoded)
+
+    def test_integers_orjson_does_not_support_are_serialized(self):
+        self.assertEqual(dumps({"user_id": 2**70}), b'{"user_id":%d}' % 2**70)
+
+
+class TestFastJSONProvider(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+
+        @self.app.route("/users", methods=["POST"])
+        def users():
+            return jsonify([request.get_json(), DOCUMENT])
+
+        self.client = self.app.test_client()
+
+    def test_jsonify_and_get_json(self):
+        response = self.client.post("/users", json={"b": 1, "a": 2})
+
+        self.assertEqual(response.mimetype, "application/json")
+        self.assertTrue(response.data.startswith(b'[{"a":2,"b":1},{"_id":'))
+        self.assertTrue(response.data.endswith(b"\n"))
+        self.assertEqual(response.json, [{"a": 2, "b": 1}, EXPECTED])
+
+    def test_options_of_the_json_module_are_supported(self):
+        self.assertEqual(self.app.json.dumps({"a": 1}, indent=1), '{\n "a": 1\n}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+"""
+Description: This file contains unit tests for the metrics, checking what is
+recorded per route and per MongoDB command, and the Prometheus text format.
+"""
+
+
+import threading
+import unittest
+from types import SimpleNamespace
+from flask import Flask
+from application.utils.metrics import (
+    CommandTimingListener,
+    MetricsRegistry,
+    instrument_app,
+    mongodb_command_duration,
+    mongodb_command_failures,
+    requests_in_flight,
+    requests_total,
+)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def render(self):
+        return self.registry.render([(self.registry.snapshot(), True)])
+
+    def test_histogram_is_rendered_cumulatively(self):
+        histogram = self.registry.histogram(
+            "latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0)
+        )
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value, "/vote")
+
+        self.assertIn(
+            'latency_seconds_bucket{route="/vote",le="0.1"} 1\n'
+            'latency_seconds_bucket{route="/vote",le="1.0"} 3\n'
+            'latency_seconds_bucket{route="/vote",le="+Inf"} 4\n'
+            'latency_seconds_sum{route="/vote"} 6.05\n'
+            'latency_seconds_count{route="/vote"} 4\n',
+            self.render(),
+        )
+
+    def test_counts_of_every_thread_are_summed(self):
+        counter = self.registry.counter("votes_total", "Votes.")
+
+        def count():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=count) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn("# TYPE votes_total counter\nvotes_total 4000\n", self.render())
+
+    def test_shards_of_exited_threads_are_retired(self):
+        counter = self.registry.counter("votes_total", "Votes.")
+        counter.inc()
+
+        for _ in range(10):
+            thread = threading.Thread(target=counter.inc)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(counter._shards), 1)
+        self.assertIn("votes_total 11\n", self.render())
+
+    def test_label_values_are_escaped(self):
+        counter = self.registry.counter("errors_total", "Errors.", ("error",))
+        counter.inc('a "quoted"\nvalue')
+
+        self.assertIn(r'errors_total{error="a \"quoted\"\nvalue"} 1', self.render())
+
+    def test_gauges_of_exited_workers_are_dropped(self):
+        self.registry.counter("requests_total", "Requests.")
+        self.registry.gauge("in_flight", "In flight.")
+        exited = {"requests_total": [[[], [5]]], "in_flight": [[[], [3]]]}
+        alive = {"requests_total": [[[], [2]]], "in_flight": [[[], [1]]]}
+
+        metrics = self.registry.render([(exited, False), (alive, True)])
+
+        self.assertIn("requests_total 7\n", metrics)
+        self.assertIn("in_flight 1\n", metrics)
+
+    def test_stats_are_reported(self):
+        self.registry.register_stats(
+            "cache", lambda: {"hits": 3, "last_seconds": 0.5}, ("hits",)
+        )
+
+        metrics = self.render()
+
+        self.assertIn("cache_hits 3\n", metrics)
+        self.assertNotIn("last_seconds", metrics)
+
+
+class TestInstrumentApp(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        instrument_app(app)
+
+        @app.route("/users/<int:user_id>")
+        def get_user(user_id):
+            return {"user_id": user_id}
+
+        self.client = app.test_client()
+
+    def test_requests_are_counted_per_route_and_status(self):
+        before = requests_total.collect()
+
+        self.client.get("/users/1")
+        self.client.get("/users/2")
+        self.client.get("/missing")
+
+        after = requests_total.collect()
+        for labels, count in (
+            (("GET", "/users/<int:user_id>", "200"), 2),
+            (("GET", "unmatched", "404"), 1),
+        ):
+            self.assertEqual(
+                after[labels][0] - before.get(labels, [0])[0], count, labels
+            )
+        self.assertEqual(requests_in_flight.collect()[()][0], 0)
+
+
+class TestCommandTimingListener(unittest.TestCase):
+    def test_commands_are_timed_per_collection(self):
+        listener = CommandTimingListener()
+        before = mongodb_command_duration.collect().get(("votes", "insert"))
+        before_count = sum(before[:-1]) if before else 0
+
+        listener.started(
+            SimpleNamespace(
+                command={"insert": "votes"},
+                command_name="insert",
+                connection_id=("localhost", 27017),
+                request_id=1,
+            )
+        )
+        listener.succeeded(
+            SimpleNamespace(
+                command_name="insert",
+                connection_id=("localhost", 27017),
+                request_id=1,
+                duration_micros=1500,
+            )
+        )
+
+        after = mongodb_command_duration.collect()[("votes", "insert")]
+        self.assertEqual(sum(after[:-1]) - before_count, 1)
+
+    def test_failed_get_more_is_counted(self):
+        listener = CommandTimingListener()
+        labels = ("users", "getMore")
+        before = mongodb_command_failures.collect().get(labels, [0])[0]
+
+        listener.started(
+            SimpleNamespace(
+                command={"getMore": 1234, "collection": "users"},
+                command_name="getMore",
+                connection_id=("localhost", 27017),
+                request_id=2,
+            )
+        )
+        listener.failed(
+            SimpleNamespace(
+                command_name="getMore",
+                connection_id=("localhost", 27017),
+                request_id=2,
+                duration_micros=100,
+            )
+        )
+
+        self.assertEqual(mongodb_command_failures.collect()[labels][0] - before, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Description: This file contains unit tests for the pagination helpers used by
+the admin exports: parsing `after`/`limit` and streaming NDJSON.
+"""
+
+
+import json
+import unittest
+from flask import Flask
+from application.utils.pagination import (
+    MAX_PAGE_LIMIT,
+    ndjson_response,
+    page,
+    parse_after,
+    parse_limit,
+)
+from application.exceptions.invalid_pagination_error import InvalidPaginationError
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.documents)
+
+    def close(self):
+        self.closed = True
+
+
+class TestPagination(unittest.TestCase):
+    def test_parse_after(self):
+        self.assertIsNone(parse_after({}))
+        self.assertEqual(parse_after({"after": "42"}), 42)
+        with self.assertRaises(InvalidPaginationError):
+            parse_after({"after": "abc"})
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit({"limit": "10"}), 10)
+        with self.assertRaises(InvalidPaginationError):
+            parse_limit({"limit": "0"})
+        with self.assertRaises(InvalidPaginationError):
+            parse_limit({"limit": str(MAX_PAGE_LIMIT + 1)})
+
+    def test_page_has_next_after_only_when_full(self):
+        documents = [{"user_id": 1}, {"user_id": 2}]
+        self.assertEqual(page(documents, 2)["next_after"], 2)
+        self.assertIsNone(page(documents, 3)["next_after"])
+
+    def test_ndjson_response_streams_every_document(self):
+        cursor = FakeCursor([{"user_id": user_id} for user_id in range(1200)])
+        app = Flask(__name__)
+
+        with app.test_request_context():
+            response = ndjson_response(cursor)
+            lines = response.get_data(as_text=True).splitlines()
+
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        self.assertEqual(
+            [json.loads(line)["user_id"] for line in lines], list(range(1200))
+        )
+        self.assertTrue(cursor.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
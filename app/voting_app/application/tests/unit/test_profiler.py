@@ -0,0 +1,118 @@
+"""
+Description: This file contains unit tests for the request profiler, checking
+which requests are profiled, the ring directory of profiles and the access to
+the admin endpoints.
+"""
+
+
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from flask import Flask
+from application.controllers.profile_controller import blueprint_profiles
+from application.utils.profiler import ProfileStore, RequestProfiler, create_profiler
+
+TOKEN = "profile-token"
+
+
+class TestProfileStore(unittest.TestCase):
+    def test_only_the_most_recent_profiles_are_kept(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = ProfileStore(directory, max_files=2)
+            for number in range(4):
+                store.save(
+                    f"{number}-GET-vote.collapsed",
+                    lambda path: open(path, "w").close(),
+                )
+
+            self.assertEqual(
+                [profile["name"] for profile in store.list()],
+                ["3-GET-vote.collapsed", "2-GET-vote.collapsed"],
+            )
+
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = ProfileStore(directory.name)
+
+    def create_client(self, profiler):
+        app = Flask(__name__)
+        app.extensions["profiler"] = profiler
+        profiler.install(app)
+        app.register_blueprint(blueprint_profiles)
+
+        @app.route("/vote")
+        def vote():
+            return "ok"
+
+        @app.route("/slow")
+        def slow():
+            time.sleep(0.05)
+            return "ok"
+
+        return app.test_client()
+
+    def profile_names(self):
+        return [profile["name"] for profile in self.store.list()]
+
+    def test_profiling_is_off_by_default(self):
+        config = {
+            "PROFILE_SLOW_REQUESTS_MS": 0,
+            "PROFILE_EVERY_N_REQUESTS": 0,
+            "PROFILE_TOKEN": "",
+        }
+
+        self.assertIsNone(create_profiler(config))
+
+    def test_one_in_n_requests_is_profiled(self):
+        client = self.create_client(RequestProfiler(self.store, every_n_requests=3))
+
+        for _ in range(6):
+            client.get("/vote")
+
+        names = self.profile_names()
+        self.assertEqual(len(names), 2)
+        self.assertTrue(all("-GET-vote-" in name for name in names))
+        stats = pstats.Stats(os.path.join(self.store.directory, names[0]))
+        self.assertTrue(stats.total_calls)
+
+    def test_only_slow_requests_keep_their_samples(self):
+        client = self.create_client(
+            RequestProfiler(self.store, slow_threshold=0.03, sample_interval=0.001)
+        )
+
+        client.get("/vote")
+        client.get("/slow")
+
+        names = self.profile_names()
+        self.assertEqual(len(names), 1)
+        self.assertIn("-GET-slow-", names[0])
+        with open(os.path.join(self.store.directory, names[0])) as file:
+            self.assertIn("slow (test_profiler.py:", file.read())
+
+    def test_token_profiles_the_request_and_gives_access(self):
+        client = self.create_client(RequestProfiler(self.store, token=TOKEN))
+        headers = {"X-Profile-Token": TOKEN}
+
+        client.get("/vote", headers=headers)
+        client.get("/vote", headers={"X-Profile-Token": "wrong"})
+
+        self.assertEqual(client.get("/admin/profiles").status_code, 403)
+        response = client.get("/admin/profiles", headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json), 1)
+        name = response.json[0]["name"]
+        with client.get(f"/admin/profiles/{name}", headers=headers) as response:
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            client.get("/admin/profiles/missing.pstats", headers=headers).status_code,
+            404,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Description: This file contains unit tests for the logging of the application,
+checking the JSON records, the ids attached to them and the rate limiting of
+repeated errors.
+"""
+
+
+import json
+import logging
+import queue
+import sys
+import unittest
+from unittest.mock import patch
+from flask import Flask
+from application.utils.structured_logging import (
+    ContextFilter,
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    current_request_id,
+    install_request_ids,
+    parse_levels,
+)
+
+
+def make_record(msg, *args, level=logging.ERROR, name="application.test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class TestRateLimitFilter(unittest.TestCase):
+    def test_repeated_errors_are_suppressed_and_counted(self):
+        rate_limit = RateLimitFilter(interval=60, burst=2)
+
+        with patch("time.monotonic", return_value=100.0):
+            allowed = [
+                rate_limit.filter(make_record("Failed to send to %s", f"{n}@a.eu"))
+                for n in range(5)
+            ]
+        self.assertEqual(allowed, [True, True, False, False, False])
+
+        record = make_record("Failed to send to %s", "a@a.eu")
+        with patch("time.monotonic", return_value=160.0):
+            self.assertTrue(rate_limit.filter(record))
+        self.assertEqual(record.suppressed, 3)
+
+    def test_info_records_are_not_limited(self):
+        rate_limit = RateLimitFilter(interval=60, burst=1)
+
+        self.assertTrue(
+            all(
+                rate_limit.filter(make_record("Voted", level=logging.INFO))
+                for _ in range(5)
+            )
+        )
+
+
+class TestJsonRecords(unittest.TestCase):
+    def test_queued_record_is_formatted_as_json(self):
+        log_queue = queue.Queue()
+        handler = NonBlockingQueueHandler(log_queue)
+        handler.addFilter(ContextFilter("voting-app"))
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord(
+                "application.test",
+                logging.ERROR,
+                __file__,
+                1,
+                "Failed %s",
+                ("x",),
+                sys.exc_info(),
+            )
+        record.user_id = 7
+        handler.handle(record)
+
+        entry = json.loads(JsonFormatter().format(log_queue.get_nowait()))
+        self.assertEqual(entry["message"], "Failed x")
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["service"], "voting-app")
+        self.assertEqual(entry["user_id"], 7)
+        self.assertIn("ValueError: boom", entry["exception"])
+
+    def test_full_queue_drops_records(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.handle(make_record("first"))
+        handler.handle(make_record("second"))
+
+        self.assertEqual(handler.dropped, 1)
+
+    def test_parse_levels(self):
+        self.assertEqual(
+            parse_levels("application.services=debug, pymongo=WARNING"),
+            {"application.services": "DEBUG", "pymongo": "WARNING"},
+        )
+
+
+class TestRequestIds(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        install_request_ids(app)
+
+        @app.route("/election")
+        def election():
+            return {"request_id": current_request_id()}
+
+        self.client = app.test_client()
+
+    def test_request_id_of_the_header_is_kept(self):
+        response = self.client.get("/election", headers={"X-Request-ID": "abc-123"})
+
+        self.assertEqual(response.json["request_id"], "abc-123")
+        self.assertEqual(response.headers["X-Request-ID"], "abc-123")
+
+    def test_invalid_request_id_is_replaced(self):
+        response = self.client.get("/election", headers={"X-Request-ID": "a b;c"})
+
+        self.assertEqual(len(response.json["request_id"]), 32)
+        self.assertIsNone(current_request_id())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Description: This file contains unit tests for the tracing of requests,
+checking how traces are continued from the traceparent header and the JWT, and
+which spans are recorded.
+"""
+
+
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+import jwt
+from flask import Flask
+from application.utils.tracing import (
+    FileSpanExporter,
+    Tracer,
+    TracingCommandListener,
+    _current_span,
+    current_trace_id,
+    install_tracing,
+    parse_traceparent,
+    traced,
+)
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+class RecordingExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@traced("count_votes")
+def count_votes():
+    return current_trace_id()
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tracer = Tracer("voting-app", RecordingExporter())
+        # Spans are recorded synchronously instead of by the export thread.
+        self.tracer.export = self.tracer.exporter.spans.append
+
+        app = Flask(__name__)
+        install_tracing(app, self.tracer)
+
+        @app.route("/vote", methods=["POST"])
+        def vote():
+            return {"trace_id": count_votes()}
+
+        self.client = app.test_client()
+
+    def spans(self):
+        return {span.name: span for span in self.tracer.exporter.spans}
+
+    def test_parse_traceparent(self):
+        self.assertEqual(
+            parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01"),
+            (TRACE_ID, PARENT_ID, True),
+        )
+        self.assertEqual(parse_traceparent("invalid"), (None, None, None))
+
+    def test_request_continues_the_trace_of_the_traceparent_header(self):
+        response = self.client.post(
+            "/vote", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+        )
+
+        self.assertEqual(response.json["trace_id"], TRACE_ID)
+        spans = self.spans()
+        request_span = spans["POST /vote"]
+        self.assertEqual(request_span.parent_id, PARENT_ID)
+        self.assertEqual(request_span.attributes["http.status_code"], 200)
+        self.assertEqual(spans["count_votes"].parent_id, request_span.span_id)
+        self.assertEqual(
+            response.headers["traceparent"], f"00-{TRACE_ID}-{request_span.span_id}-01"
+        )
+
+    def test_request_continues_the_trace_of_the_token(self):
+        token = jwt.encode({"trace_id": TRACE_ID}, "secret", algorithm="HS256")
+
+        response = self.client.post(
+            "/vote", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        self.assertEqual(response.json["trace_id"], TRACE_ID)
+        self.assertIsNone(self.spans()["POST /vote"].parent_id)
+
+    def test_request_starts_a_new_trace(self):
+        response = self.client.post("/vote")
+
+        self.assertNotEqual(response.json["trace_id"], TRACE_ID)
+        self.assertEqual(len(response.json["trace_id"]), 32)
+
+    def test_unsampled_request_is_not_traced(self):
+        response = self.client.post(
+            "/vote", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-00"}
+        )
+
+        self.assertIsNone(response.json["trace_id"])
+        self.assertNotIn("traceparent", response.headers)
+        self.assertEqual(self.tracer.exporter.spans, [])
+
+    def test_traced_function_outside_a_trace_records_nothing(self):
+        self.assertIsNone(count_votes())
+        self.assertEqual(self.tracer.exporter.spans, [])
+
+    def test_mongodb_commands_are_child_spans(self):
+        listener = TracingCommandListener()
+        started = SimpleNamespace(
+            command_name="insert",
+            command={"insert": "votes"},
+            connection_id=("localhost", 27017),
+            request_id=1,
+        )
+        root = self.tracer.start_trace("POST /vote")
+
+        @traced("store_vote")
+        def store_vote():
+            listener.started(started)
+            listener.succeeded(started)
+
+        token = _current_span.set(root)
+        try:
+            store_vote()
+        finally:
+            _current_span.reset(token)
+
+        spans = self.spans()
+        self.assertEqual(spans["mongodb insert"].parent_id, spans["store_vote"].span_id)
+        self.assertEqual(
+            spans["mongodb insert"].attributes["db.mongodb.collection"], "votes"
+        )
+
+
+class TestFileSpanExporter(unittest.TestCase):
+    def test_spans_are_appended_as_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            tracer = Tracer("voting-app", FileSpanExporter(path))
+            span = tracer.start_trace("GET /election")
+            span.end_ns = span.start_ns + 1000000
+
+            tracer.exporter.export([span])
+            tracer.exporter.export([span])
+
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(lines[0]["name"], "GET /election")
+            self.assertEqual(lines[0]["duration_ms"], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Description: This file contains unit tests for the UserService, checking that
+registering a citizen relies on the write result instead of reading every user.
+"""
+
+
+import unittest
+from unittest.mock import Mock
+from application.services.user_service import UserService
+from application.utils.ndjson import iter_ndjson
+from application.exceptions.user_already_exists_error import UserAlreadyExistsError
+
+CITIZEN = {"user_id": 1234, "email": "citizen@example.com", "password": "pass"}
+
+
+class TestUserService(unittest.TestCase):
+    def setUp(self):
+        self.user_repository = Mock()
+        self.user_service = UserService(self.user_repository)
+
+    def test_create_user_stores_citizen(self):
+        self.user_repository.store_user_if_absent.return_value = True
+
+        self.user_service.create_user(CITIZEN)
+
+        self.user_repository.store_user_if_absent.assert_called_once_with(
+            dict(CITIZEN, admin_rights=False)
+        )
+        self.user_repository.get_all_users.assert_not_called()
+
+    def test_create_existing_user_raises(self):
+        self.user_repository.store_user_if_absent.return_value = False
+
+        with self.assertRaises(UserAlreadyExistsError):
+            self.user_service.create_user(CITIZEN)
+
+    def test_create_users_stores_valid_rows_in_batches(self):
+        self.user_repository.store_users.side_effect = lambda users: (len(users), [])
+        rows = [dict(CITIZEN, user_id=user_id) for user_id in range(1, 6)]
+
+        result = self.user_service.create_users(rows, batch_size=2)
+
+        self.assertEqual(result, {"inserted": 5, "error_count": 0, "errors": []})
+        batch_sizes = [
+            len(call.args[0])
+            for call in self.user_repository.store_users.call_args_list
+        ]
+        self.assertEqual(batch_sizes, [2, 2, 1])
+
+    def test_create_users_reports_invalid_and_duplicate_rows(self):
+        duplicate = {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key"}
+        self.user_repository.store_users.return_value = (1, [duplicate])
+        rows = [
+            CITIZEN,
+            {"user_id": 5},
+            None,
+            dict(CITIZEN, user_id=1234),
+        ]
+
+        result = self.user_service.create_users(rows)
+
+        self.assertEqual(result["inserted"], 1)
+        self.assertEqual([error["row"] for error in result["errors"]], [1, 2, 3])
+        self.assertEqual(
+            result["errors"][0]["error"], "MissingFieldsError: Missing fields."
+        )
+        self.assertEqual(
+            result["errors"][2]["error"],
+            "UserAlreadyExistsError: User with id 1234 already exists.",
+        )
+
+    def test_create_users_reports_invalid_json_lines(self):
+        self.user_repository.store_users.side_effect = lambda users: (len(users), [])
+        lines = [b'{"user_id": 1, "email": "a@example.com", "password": "p"}\n']
+        lines += [b"\n", b'{"user_id": 2,\n', b"[1]\n"]
+
+        result = self.user_service.create_users(iter_ndjson(lines))
+
+        self.assertEqual(result["inserted"], 1)
+        self.assertTrue(result["errors"][0]["error"].startswith("Invalid JSON: "))
+        self.assertEqual(result["errors"][1]["error"], "Row must be a JSON object.")
+
+    def test_create_users_reports_the_first_errors_only(self):
+        self.user_repository.store_users.side_effect = lambda users: (
+            0,
+            [
+                {"index": index, "code": 11000, "errmsg": "E11000 duplicate key"}
+                for index in range(len(users))
+            ],
+        )
+        rows = [dict(CITIZEN, user_id=user_id) for user_id in range(1, 11)]
+        rows[7] = None
+
+        result = self.user_service.create_users(rows, batch_size=4, max_errors=3)
+
+        self.assertEqual(result["inserted"], 0)
+        self.assertEqual(result["error_count"], 10)
+        self.assertEqual([error["row"] for error in result["errors"]], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Description: This file contains unit tests for the VoteService, checking that
+a vote is cast with a single insert and that the unique index is what rejects
+a second vote.
+"""
+
+
+import unittest
+from unittest.mock import Mock
+from pymongo.errors import DuplicateKeyError
+from application.models import Election, VoteOption
+from application.repositories.vote_repository import VoteRepository
+from application.services.vote_service import VoteService
+from application.utils.election_cache import ElectionSnapshot
+from application.exceptions.user_has_already_voted_error import (
+    UserHasAlreadyVotedError,
+)
+from application.exceptions.vote_option_not_found_error import (
+    VoteOptionNotFoundError,
+)
+
+
+class TestVoteService(unittest.TestCase):
+    def setUp(self):
+        election = Election(
+            1,
+            "06-10-2024",
+            [VoteOption(2, "party2", [], "photo"), VoteOption(3, "party3", [], "")],
+        )
+        election_cache = Mock()
+        election_cache.get.return_value = ElectionSnapshot(election)
+
+        self.vote_repository = Mock()
+        self.vote_service = VoteService(self.vote_repository, election_cache)
+
+    def test_vote_is_stored_with_a_single_insert(self):
+        self.vote_service.vote_in_election(1234, 2)
+
+        self.vote_repository.store_vote.assert_called_once_with(
+            {"user_id": 1234, "vote_option_id": 2, "election_id": 1}
+        )
+        self.vote_repository.get_vote_by_voter_id.assert_not_called()
+
+    def test_duplicate_vote_raises_user_has_already_voted(self):
+        self.vote_repository.store_vote.side_effect = DuplicateKeyError("dup")
+
+        with self.assertRaises(UserHasAlreadyVotedError):
+            self.vote_service.vote_in_election(1234, 2)
+
+    def test_unknown_vote_option_is_rejected_before_writing(self):
+        with self.assertRaises(VoteOptionNotFoundError):
+            self.vote_service.vote_in_election(1234, 42)
+
+        self.vote_repository.store_vote.assert_not_called()
+
+    def test_results_include_options_without_votes(self):
+        self.vote_repository.get_vote_counts.return_value = {2: 5}
+
+        results = self.vote_service.get_results()
+
+        self.vote_repository.get_vote_counts.assert_called_once_with(1)
+        self.assertEqual(results["total_votes"], 5)
+        self.assertEqual(
+            results["results"],
+            [
+                {"vote_option_id": 2, "party_name": "party2", "votes": 5},
+                {"vote_option_id": 3, "party_name": "party3", "votes": 0},
+            ],
+        )
+
+
+class TestVoteRepository(unittest.TestCase):
+    def test_counter_shards_must_be_positive(self):
+        for counter_shards in (0, -1):
+            with self.assertRaises(ValueError):
+                VoteRepository(Mock(), counter_shards)
+
+
+if __name__ == "__main__":
+    unittest.main()
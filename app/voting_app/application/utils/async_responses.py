@@ -0,0 +1,65 @@
+"""
+Description: This file contains the response helpers of the ASGI app. JSON
+bodies are serialized like jsonify with the FastJSONProvider (sorted keys,
+compact separators and a trailing newline), so both apps return the same
+bytes for a route.
+Collections are streamed as newline-delimited JSON from an async cursor.
+"""
+
+
+from starlette.responses import Response, StreamingResponse
+from .json_provider import dumps
+from .pagination import NDJSON_CHUNK_SIZE, NDJSON_MIMETYPE
+
+
+def json_response(data, status_code=200):
+    body = dumps(data, sort_keys=True) + b"\n"
+    return Response(body, status_code, media_type="application/json")
+
+
+def is_paginated(request):
+    return "after" in request.query_params or "limit" in request.query_params
+
+
+def wants_ndjson(request):
+    if request.query_params.get("format") == "ndjson":
+        return True
+    return best_accepted_mimetype(request.headers.get("accept", "")) == NDJSON_MIMETYPE
+
+
+def best_accepted_mimetype(accept):
+    """Return the media type of the Accept header with the highest quality."""
+    best, best_quality = None, 0.0
+    for media_range in accept.split(","):
+        mimetype, *parameters = media_range.split(";")
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > best_quality:
+            best, best_quality = mimetype.strip(), quality
+    return best
+
+
+def ndjson_response(documents):
+    """Stream the documents of an async cursor, one JSON document per line."""
+
+    async def generate():
+        try:
+            lines = []
+            async for document in documents:
+                lines.append(dumps(document))
+                if len(lines) == NDJSON_CHUNK_SIZE:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+        finally:
+            # Release the server-side cursor if the client goes away early.
+            await documents.close()
+
+    return StreamingResponse(generate(), media_type=NDJSON_MIMETYPE)
@@ -8,12 +8,12 @@ import json
 import os
 from ..models import Election, VoteOption
 
+ELECTION_FILE_PATH = os.path.join(
+    os.path.dirname(__file__), "../", "data", "election.json"
+)
 
-def load_election():
-    json_file_path = os.path.join(
-        os.path.dirname(__file__), "../", "data", "election.json"
-    )
 
+def load_election(json_file_path=ELECTION_FILE_PATH):
     with open(json_file_path, "r") as file:
         data = json.load(file)
 
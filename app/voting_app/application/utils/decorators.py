@@ -5,7 +5,7 @@ admin_required` decorator ensures that the logged-in user has admin privileges.
 """
 
 
-from flask import jsonify
+from flask import current_app, jsonify
 
 # from flask_login import current_user
 from functools import wraps
@@ -29,3 +29,14 @@ def admin_required(f):
         return f(*args, **kwargs)
 
     return decorated_function
+
+
+def profile_token_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        profiler = current_app.extensions.get("profiler")
+        if not profiler or not profiler.has_valid_token():
+            return jsonify({"error": "Access denied. Admins only."}), 403
+        return f(*args, **kwargs)
+
+    return decorated_function
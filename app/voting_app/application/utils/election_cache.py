@@ -0,0 +1,124 @@
+"""
+Description: This file contains a process-wide cache of the current election.
+The election file is parsed once into an immutable snapshot, which is only
+rebuilt when the file's inode, mtime or size change. Readers always get a
+complete snapshot because a new one is swapped in with a single assignment.
+The GET /election response is also encoded once per snapshot: its JSON body,
+precompressed with gzip and brotli, and a strong ETag for each of them.
+"""
+
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+import brotli
+from .data_loader import ELECTION_FILE_PATH, load_election
+
+
+class ElectionSnapshot:
+    """Immutable view of an election together with the data derived from it."""
+
+    def __init__(self, election, file_key=None):
+        election_json = election.to_json()
+
+        self.election = election
+        self.file_key = file_key
+        self.election_id = election.id
+        self.vote_option_ids = frozenset(
+            vote_option["vote_option_id"]
+            for vote_option in election_json["vote_options"]
+        )
+        # Body of the GET /election response, serialized once per snapshot.
+        self.response_bytes = json.dumps(election_json, separators=(",", ":")).encode(
+            "utf-8"
+        )
+        # Derived from the content, so every worker returns the same ETag.
+        digest = hashlib.sha256(self.response_bytes).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # Content coding -> (body, ETag) of every representation of the body.
+        self.encodings = {
+            "identity": (self.response_bytes, self.etag),
+            "gzip": (gzip.compress(self.response_bytes, mtime=0), f'"{digest}-gzip"'),
+            "br": (brotli.compress(self.response_bytes), f'"{digest}-br"'),
+        }
+
+
+class ElectionCache:
+    def __init__(self, json_file_path=ELECTION_FILE_PATH, check_interval=1.0):
+        self.json_file_path = json_file_path
+        # Seconds between two stat() calls on the election file.
+        self.check_interval = check_interval
+
+        self._snapshot = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.reloads = 0
+        self.load_errors = 0
+        self.last_load_seconds = 0.0
+        self.total_load_seconds = 0.0
+
+    def get(self):
+        """Return the current election snapshot, reloading it if the file changed."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < self._next_check:
+            self.hits += 1
+            return snapshot
+
+        return self._refresh()
+
+    def stats(self):
+        """Return the cache counters, e.g. for monitoring."""
+        return {
+            "hits": self.hits,
+            "reloads": self.reloads,
+            "load_errors": self.load_errors,
+            "last_load_seconds": self.last_load_seconds,
+            "total_load_seconds": self.total_load_seconds,
+        }
+
+    def _file_key(self):
+        stat = os.stat(self.json_file_path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        with self._lock:
+            snapshot = self._snapshot
+
+            # Another thread may have refreshed the snapshot while we waited.
+            if snapshot is not None and time.monotonic() < self._next_check:
+                self.hits += 1
+                return snapshot
+
+            try:
+                file_key = self._file_key()
+                if snapshot is None or snapshot.file_key != file_key:
+                    start = time.perf_counter()
+                    snapshot = ElectionSnapshot(
+                        load_election(self.json_file_path), file_key
+                    )
+                    elapsed = time.perf_counter() - start
+
+                    self._snapshot = snapshot
+                    self.reloads += 1
+                    self.last_load_seconds = elapsed
+                    self.total_load_seconds += elapsed
+                else:
+                    self.hits += 1
+            except (OSError, ValueError, KeyError):
+                # Keep serving the previous election if the file is being
+                # rewritten or is temporarily invalid.
+                self.load_errors += 1
+                if snapshot is None:
+                    raise
+
+            self._next_check = time.monotonic() + self.check_interval
+            return snapshot
+
+
+# Shared by every service of the process.
+election_cache = ElectionCache()
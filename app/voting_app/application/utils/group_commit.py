@@ -0,0 +1,184 @@
+"""
+Description: This file contains the group-commit writer of votes. Votes cast
+by concurrent requests are put on a queue and written by a flusher thread with
+one unordered insert_many per batch, followed by one bulk update of the vote
+counts. A batch is written once it holds `batch_size` votes or its first vote
+waited `max_delay` seconds, whichever comes first. Every caller waits until
+the batch was acknowledged by MongoDB, with the collection's write concern,
+and gets the outcome of its own vote.
+"""
+
+
+import os
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+
+DUPLICATE_KEY_ERROR_CODE = 11000
+
+
+class GroupCommitVoteWriter:
+    def __init__(
+        self,
+        votes_table,
+        vote_counts_table,
+        counter_shards=1,
+        batch_size=100,
+        max_delay=0.002,
+    ):
+        self.votes_table = votes_table
+        self.vote_counts_table = vote_counts_table
+        self.counter_shards = counter_shards
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+
+        self.batches = 0
+        self.votes = 0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def write(self, vote_json):
+        """Store a vote and count it, waiting until its batch was written.
+
+        Raises DuplicateKeyError if the voter already voted, like insert_one.
+        """
+        future = Future()
+        self._ensure_started()
+        self._queue.put((vote_json, future))
+        return future.result()
+
+    def stop(self, timeout=None):
+        """Write the queued votes and stop the flusher."""
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+            self._pid = None
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "votes": self.votes,
+        }
+
+    def _ensure_started(self):
+        # Started by the first vote of every process, so a writer created
+        # before a pre-fork server forks still works in each worker.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = queue.Queue()
+            self._thread = threading.Thread(
+                target=self._run, name="vote-group-commit", daemon=True
+            )
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            stopping = False
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch):
+        try:
+            errors = self._insert([vote_json for vote_json, _ in batch])
+            stored = [
+                vote_json
+                for index, (vote_json, _) in enumerate(batch)
+                if index not in errors
+            ]
+            self._count(stored)
+        except BaseException as e:
+            # Nothing is known about the votes of the batch, like when a
+            # single insert fails, so every caller gets the error.
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.votes += len(stored)
+        for index, (_, future) in enumerate(batch):
+            if index in errors:
+                future.set_exception(errors[index])
+            else:
+                future.set_result(None)
+
+    def _insert(self, votes):
+        """Insert the votes, returning the error of every vote not inserted."""
+        try:
+            self.votes_table.insert_many(votes, ordered=False)
+        except BulkWriteError as e:
+            if e.details.get("writeConcernErrors"):
+                raise
+            errors = {}
+            for write_error in e.details["writeErrors"]:
+                if write_error["code"] == DUPLICATE_KEY_ERROR_CODE:
+                    error_class = DuplicateKeyError
+                else:
+                    error_class = WriteError
+                errors[write_error["index"]] = error_class(
+                    write_error["errmsg"], write_error["code"], write_error
+                )
+            return errors
+        return {}
+
+    def _count(self, votes):
+        # One increment per vote option of the batch instead of one per vote.
+        counts = Counter(
+            (vote_json["election_id"], vote_json["vote_option_id"])
+            for vote_json in votes
+        )
+        if not counts:
+            return
+
+        self.vote_counts_table.bulk_write(
+            [
+                UpdateOne(
+                    {
+                        "election_id": election_id,
+                        "vote_option_id": vote_option_id,
+                        "shard": random.randrange(self.counter_shards),
+                    },
+                    {"$inc": {"count": count}},
+                    upsert=True,
+                )
+                for (election_id, vote_option_id), count in counts.items()
+            ],
+            ordered=False,
+        )
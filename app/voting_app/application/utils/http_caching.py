@@ -0,0 +1,82 @@
+"""
+Description: This file contains the conditional and cacheable responses of
+GET /election, shared by the WSGI and ASGI apps. The body is chosen among the
+precompressed representations of the election snapshot by the Accept-Encoding
+header of the request, and a request whose If-None-Match header holds the ETag
+of the election gets a 304 without a body. The Cache-Control header lets a CDN
+or a reverse proxy serve the election for `max_age` seconds, and a stale one
+while it revalidates it.
+"""
+
+
+# Preferred first when the client accepts several with the same quality.
+CONTENT_CODINGS = ("br", "gzip")
+
+
+def parse_quality(parameters):
+    for parameter in parameters:
+        name, _, value = parameter.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def choose_encoding(accept_encoding, available=CONTENT_CODINGS):
+    """Return the best content coding of `available` accepted by the client.
+
+    Returns "identity" when the client accepts none of them.
+    """
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *parameters = item.split(";")
+        coding = coding.strip().lower()
+        if coding:
+            qualities[coding] = parse_quality(parameters)
+
+    best, best_quality = "identity", 0.0
+    for coding in available:
+        quality = qualities.get(coding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def etag_matches(if_none_match, etags):
+    """Return whether an If-None-Match header matches one of the `etags`."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for etag in if_none_match.split(","):
+        etag = etag.strip()
+        # If-None-Match uses the weak comparison.
+        if etag.startswith("W/"):
+            etag = etag[2:]
+        if etag in etags:
+            return True
+    return False
+
+
+def election_response(snapshot, accept_encoding, if_none_match, max_age):
+    """Return the status code, body and headers of GET /election."""
+    encoding = choose_encoding(accept_encoding)
+    body, etag = snapshot.encodings[encoding]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={max_age}, stale-while-revalidate={max_age}"
+        ),
+        "Vary": "Accept-Encoding",
+    }
+
+    # Any representation of the same election is still valid for the client.
+    etags = {etag for _, etag in snapshot.encodings.values()}
+    if etag_matches(if_none_match, etags):
+        return 304, b"", headers
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return 200, body, headers
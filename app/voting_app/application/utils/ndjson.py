@@ -0,0 +1,23 @@
+"""
+Description: This file contains the functionality to read newline-delimited
+JSON lazily, one document per line, so large uploads and files never have to
+be held in memory at once.
+"""
+
+
+import json
+
+
+def iter_ndjson(lines):
+    """Yield the document of every non-blank line.
+
+    A line that is not valid JSON yields the ValueError raised when parsing it,
+    so the row can be reported as invalid without ending the upload.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
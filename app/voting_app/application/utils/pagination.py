@@ -0,0 +1,76 @@
+"""
+Description: This file contains the helpers used to export whole collections.
+Collections are either read page by page, using keyset pagination on the
+indexed user_id (`after` and `limit` query parameters), or streamed as
+newline-delimited JSON straight from the database cursor.
+"""
+
+
+from flask import Response, stream_with_context
+from ..exceptions.invalid_pagination_error import InvalidPaginationError
+from .json_provider import dumps
+
+DEFAULT_PAGE_LIMIT = 100
+MAX_PAGE_LIMIT = 1000
+NDJSON_MIMETYPE = "application/x-ndjson"
+# Documents written to the socket at once when streaming.
+NDJSON_CHUNK_SIZE = 500
+
+
+def parse_after(args):
+    """Return the user_id the page starts after, or None for the first page."""
+    after = args.get("after")
+    if after is None:
+        return None
+
+    try:
+        return int(after)
+    except ValueError:
+        raise InvalidPaginationError("'after' must be an integer user_id.")
+
+
+def parse_limit(args):
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise InvalidPaginationError("'limit' must be an integer.")
+
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise InvalidPaginationError(f"'limit' must be between 1 and {MAX_PAGE_LIMIT}.")
+    return limit
+
+
+def is_paginated(request):
+    return "after" in request.args or "limit" in request.args
+
+
+def wants_ndjson(request):
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def page(documents, limit, key="user_id"):
+    """Wrap a page of documents with the value to request the next page."""
+    next_after = documents[-1][key] if len(documents) == limit else None
+    return {"items": documents, "next_after": next_after}
+
+
+def ndjson_response(documents):
+    """Stream the documents of a cursor, one JSON document per line."""
+
+    def generate():
+        try:
+            lines = []
+            for document in documents:
+                lines.append(dumps(document))
+                if len(lines) == NDJSON_CHUNK_SIZE:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+        finally:
+            # Release the server-side cursor if the client goes away early.
+            documents.close()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,229 @@
+"""
+Description: This file contains the opt-in request profiler. It can:
+- sample the stack of every request and keep the samples of the requests
+  slower than a threshold, as collapsed stacks (for flame graphs),
+- profile 1 in N requests with cProfile, as pstats files,
+- profile with cProfile the requests sent with the profiling token in the
+  X-Profile-Token header.
+Profiles are written to a ring directory holding at most `max_files` files,
+which the admin endpoints list and serve. When profiling is disabled no hook
+is installed, so requests do not pay anything for it.
+"""
+
+
+import cProfile
+import hmac
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from flask import g, request
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+COLLAPSED_EXTENSION = ".collapsed"
+PSTATS_EXTENSION = ".pstats"
+
+
+class ProfileStore:
+    """A directory keeping the `max_files` most recent profiles."""
+
+    def __init__(self, directory, max_files=100):
+        self.directory = directory
+        self.max_files = max_files
+
+    def save(self, name, write):
+        """Write a profile with `write(path)` and remove the oldest ones."""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        write(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        self._prune()
+
+    def list(self):
+        """Return the profiles, most recent first."""
+        profiles = []
+        for name in self._names():
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            profiles.append(
+                {"name": name, "size": stat.st_size, "created": stat.st_mtime}
+            )
+        return sorted(profiles, key=lambda profile: profile["name"], reverse=True)
+
+    def _names(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            name
+            for name in names
+            if name.endswith((COLLAPSED_EXTENSION, PSTATS_EXTENSION))
+        ]
+
+    def _prune(self):
+        # Names start with the time in microseconds, so they sort by age.
+        for name in sorted(self._names())[: -self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # Removed by another worker process.
+                pass
+
+
+class StackSampler:
+    """Samples the stacks of the threads answering a request.
+
+    A background thread takes the stack of every registered thread each
+    `interval` seconds and counts the samples per collapsed stack.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        # thread ident -> Counter of collapsed stacks
+        self._active = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._ensure_started()
+        self._active[threading.get_ident()] = Counter()
+
+    def stop(self):
+        """Return the samples taken since `start` in this thread."""
+        return self._active.pop(threading.get_ident(), Counter())
+
+    def _ensure_started(self):
+        # Started in every process, like the other background threads.
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._active = {}
+            threading.Thread(
+                target=self._run, name="stack-sampler", daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._active:
+                continue
+
+            frames = sys._current_frames()
+            for ident, samples in list(self._active.items()):
+                frame = frames.get(ident)
+                if frame is not None:
+                    samples[collapse_stack(frame)] += 1
+
+
+def collapse_stack(frame):
+    """Return the stack of a frame as `root;...;leaf`, one function each."""
+    functions = []
+    while frame is not None:
+        code = frame.f_code
+        file_name = os.path.basename(code.co_filename)
+        functions.append(f"{code.co_name} ({file_name}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(functions))
+
+
+class RequestProfiler:
+    def __init__(
+        self,
+        store,
+        slow_threshold=None,
+        every_n_requests=0,
+        token="",
+        sample_interval=0.005,
+    ):
+        self.store = store
+        # Seconds after which the samples of a request are kept, None if off.
+        self.slow_threshold = slow_threshold
+        self.every_n_requests = every_n_requests
+        self.token = token
+        self.sampler = StackSampler(sample_interval) if slow_threshold else None
+        self._requests = itertools.count(1)
+
+    def has_valid_token(self):
+        token = request.headers.get(PROFILE_TOKEN_HEADER)
+        return bool(self.token and token and hmac.compare_digest(token, self.token))
+
+    def install(self, app):
+        app.before_request(self._start)
+        app.teardown_request(self._stop)
+
+    def _start(self):
+        g.profile_start = time.perf_counter()
+
+        if self.has_valid_token() or (
+            self.every_n_requests and next(self._requests) % self.every_n_requests == 0
+        ):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                g.profile = profile
+            except ValueError:
+                # Another profiler is already active in this thread.
+                pass
+        if self.sampler:
+            self.sampler.start()
+
+    def _stop(self, exception):
+        start = g.pop("profile_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        samples = self.sampler.stop() if self.sampler else None
+
+        profile = g.pop("profile", None)
+        if profile:
+            profile.disable()
+            self.store.save(self._name(elapsed, PSTATS_EXTENSION), profile.dump_stats)
+
+        if samples and elapsed >= self.slow_threshold:
+            self.store.save(
+                self._name(elapsed, COLLAPSED_EXTENSION),
+                lambda path: write_collapsed(path, samples),
+            )
+
+    @staticmethod
+    def _name(elapsed, extension):
+        route = request.url_rule.rule if request.url_rule else request.path
+        route = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_")[:64] or "root"
+        return (
+            f"{time.time_ns() // 1000}-{os.getpid()}-{request.method}-{route}"
+            f"-{round(elapsed * 1000)}ms{extension}"
+        )
+
+
+def write_collapsed(path, samples):
+    with open(path, "w") as file:
+        for stack, count in samples.most_common():
+            file.write(f"{stack} {count}\n")
+
+
+def create_profiler(config):
+    """Return the profiler enabled by the configuration, or None."""
+    slow_threshold_ms = config["PROFILE_SLOW_REQUESTS_MS"]
+    every_n_requests = config["PROFILE_EVERY_N_REQUESTS"]
+    token = config["PROFILE_TOKEN"]
+    if not (slow_threshold_ms or every_n_requests or token):
+        return None
+
+    return RequestProfiler(
+        ProfileStore(config["PROFILE_DIR"], config["PROFILE_MAX_FILES"]),
+        slow_threshold=slow_threshold_ms / 1000 if slow_threshold_ms else None,
+        every_n_requests=every_n_requests,
+        token=token,
+        sample_interval=config["PROFILE_SAMPLE_INTERVAL_MS"] / 1000,
+    )
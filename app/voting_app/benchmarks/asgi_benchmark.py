@@ -0,0 +1,175 @@
+"""
+Description: This file benchmarks POST /vote on the WSGI app (gunicorn) against
+the ASGI app (uvicorn). For every server and number of concurrent clients, a
+batch of votes is cast by distinct voters and the throughput, latency
+percentiles and errors are reported.
+
+Start both servers against the same MongoDB, e.g. with
+`docker-compose --profile asgi up`, then run it from app/voting_app:
+    python -m benchmarks.asgi_benchmark --wsgi-url http://localhost:5000 \
+        --asgi-url http://localhost:5002 --mongo-uri mongodb://localhost:27017
+The benchmark voters use user_ids from --first-user-id on. Their votes are
+removed, and the vote counts corrected, before and after every run.
+It needs the packages of requirements-asgi.txt.
+"""
+
+
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import time
+import aiohttp
+import jwt
+from pymongo import MongoClient
+
+JWT_SECRET = "your_secret_key"
+
+
+def mint_tokens(first_user_id, votes):
+    expires = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+    return [
+        jwt.encode(
+            {
+                "user_id": user_id,
+                "email": f"voter{user_id}@example.com",
+                "exp": expires,
+            },
+            JWT_SECRET,
+            algorithm="HS256",
+        )
+        for user_id in range(first_user_id, first_user_id + votes)
+    ]
+
+
+def remove_votes(db, first_user_id, votes):
+    """Delete the benchmark votes and take them out of the vote counts."""
+    user_ids = {"$gte": first_user_id, "$lt": first_user_id + votes}
+    counts = db.votes.aggregate(
+        [
+            {"$match": {"user_id": user_ids}},
+            {
+                "$group": {
+                    "_id": {
+                        "election_id": "$election_id",
+                        "vote_option_id": "$vote_option_id",
+                    },
+                    "count": {"$sum": 1},
+                }
+            },
+        ]
+    )
+    for count in counts:
+        db.vote_counts.update_one(
+            {**count["_id"], "shard": 0},
+            {"$inc": {"count": -count["count"]}},
+            upsert=True,
+        )
+    db.votes.delete_many({"user_id": user_ids})
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[
+        min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    ]
+
+
+async def get_vote_option_ids(base_url):
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base_url}/election") as response:
+            election = await response.json()
+    return [vote_option["vote_option_id"] for vote_option in election["vote_options"]]
+
+
+async def cast_votes(base_url, tokens, vote_option_ids, concurrency):
+    latencies = []
+    statuses = {}
+    requests = iter(zip(tokens, itertools.cycle(vote_option_ids)))
+
+    async def client(session):
+        # Closed loop: every client sends its next vote once the last one is
+        # answered, so `concurrency` votes are in flight at any time.
+        for token, vote_option_id in requests:
+            start = time.perf_counter()
+            async with session.post(
+                f"{base_url}/vote",
+                json={"vote_option_id": vote_option_id},
+                headers={"Authorization": f"Bearer {token}"},
+            ) as response:
+                await response.read()
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "votes": len(latencies),
+        "statuses": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "votes_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "max_ms": round(latencies[-1] * 1000, 2),
+    }
+
+
+def run(servers, mongo_uri, concurrencies, votes, first_user_id):
+    client = MongoClient(mongo_uri)
+    db = client.votes_db
+    tokens = mint_tokens(first_user_id, votes)
+
+    results = []
+    for name, base_url in servers:
+        vote_option_ids = asyncio.run(get_vote_option_ids(base_url))
+        for concurrency in concurrencies:
+            remove_votes(db, first_user_id, votes)
+            result = {"server": name, "url": base_url, "concurrency": concurrency}
+            result.update(
+                asyncio.run(cast_votes(base_url, tokens, vote_option_ids, concurrency))
+            )
+            results.append(result)
+            print(json.dumps(result))
+
+    remove_votes(db, first_user_id, votes)
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="POST /vote throughput and latency of the WSGI and ASGI apps."
+    )
+    parser.add_argument("--wsgi-url", default="http://localhost:5000")
+    parser.add_argument("--asgi-url", default="http://localhost:5002")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument(
+        "--concurrency",
+        default="10,100,1000",
+        help="Comma separated numbers of concurrent clients.",
+    )
+    parser.add_argument("--votes", type=int, default=5000, help="Votes per run.")
+    parser.add_argument("--first-user-id", type=int, default=900000000)
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    servers = [("wsgi", args.wsgi_url), ("asgi", args.asgi_url)]
+    concurrencies = [int(concurrency) for concurrency in args.concurrency.split(",")]
+    results = run(
+        servers, args.mongo_uri, concurrencies, args.votes, args.first_user_id
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Description: This file contains the fixtures of the service benchmarks. Every
+repository fixture is parametrized with the in-memory backend and a MongoDB
+backend; the MongoDB one runs only with --mongo-uri, in its own database,
+which is dropped before and after the run.
+"""
+
+
+from types import SimpleNamespace
+import pytest
+from pymongo import MongoClient
+from application.bootstrap import bootstrap_database
+from application.repositories.in_memory_user_repository import InMemoryUserRepository
+from application.repositories.in_memory_vote_repository import InMemoryVoteRepository
+from application.repositories.user_repository import UserRepository
+from application.repositories.vote_repository import VoteRepository
+
+DATABASE = "electeu_service_benchmark"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--mongo-uri", help="Also run the benchmarks against this MongoDB."
+    )
+
+
+@pytest.fixture(scope="session")
+def mongo_db(request):
+    mongo_uri = request.config.getoption("--mongo-uri")
+    if not mongo_uri:
+        pytest.skip("MongoDB benchmarks need --mongo-uri.")
+
+    client = MongoClient(mongo_uri)
+    client.drop_database(DATABASE)
+    db = client[DATABASE]
+    bootstrap_database(db)
+    yield db
+    client.drop_database(DATABASE)
+    client.close()
+
+
+@pytest.fixture(params=["memory", "mongo"])
+def backend(request):
+    return request.param
+
+
+@pytest.fixture
+def mongo(backend, request):
+    """The PyMongo attributes the repositories read, or None in memory."""
+    if backend == "memory":
+        return None
+
+    db = request.getfixturevalue("mongo_db")
+    for collection in ("users", "votes", "vote_counts"):
+        db[collection].delete_many({})
+    return SimpleNamespace(cx=SimpleNamespace(votes_db=db))
+
+
+@pytest.fixture
+def user_repository(mongo):
+    return UserRepository(mongo) if mongo else InMemoryUserRepository()
+
+
+@pytest.fixture
+def vote_repository(mongo):
+    return VoteRepository(mongo) if mongo else InMemoryVoteRepository()
@@ -0,0 +1,143 @@
+"""
+Description: This file benchmarks the JSON serialization of the large admin and
+export responses (GET /users, GET /votes and GET /user_secrets of the
+authentication app, which serializes with the same provider). For every number
+of documents it serializes them with:
+- flask: Flask's default JSON provider, as before FastJSONProvider,
+- json: FastJSONProvider without orjson, its fallback on the json module,
+- orjson: FastJSONProvider with orjson,
+both as one JSON body (jsonify of the whole list) and as the NDJSON stream of
+?format=ndjson, and reports the serialization time and the peak RSS.
+
+Every run is done in a new process, so the peak RSS of a run is not hidden by
+a previous one. The peak RSS includes the documents: the body mode holds all of
+them in a list, like get_all_users(), while the NDJSON mode reads them one by
+one, like a database cursor. Run it from app/voting_app:
+    python -m benchmarks.json_benchmark [--sizes 10000 1000000 10000000]
+Bodies of more than --max-body-documents (default 1000000) documents are
+skipped, holding 10M documents in memory takes several GB.
+"""
+
+
+import argparse
+import json
+import multiprocessing
+import resource
+import time
+from flask import Flask
+from application.models import Citizen
+from application.utils import json_provider
+from application.utils.json_provider import FastJSONProvider
+from application.utils.pagination import ndjson_response
+
+ENCODERS = ("flask", "json", "orjson")
+MODES = ("body", "ndjson")
+KINDS = ("users", "votes")
+
+
+def document(kind, number):
+    if kind == "users":
+        return Citizen(number, f"citizen{number}@example.com", "password").to_json()
+    return {"user_id": number, "vote_option_id": number % 7, "election_id": 1}
+
+
+class Cursor:
+    """Yields the documents one by one, like a MongoDB cursor."""
+
+    def __init__(self, kind, size):
+        self._documents = (document(kind, number) for number in range(size))
+
+    def __iter__(self):
+        return self._documents
+
+    def close(self):
+        pass
+
+
+def peak_rss_mb():
+    # In kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(encoder, mode, kind, size, results):
+    if encoder == "json":
+        json_provider.orjson = None
+
+    app = Flask(__name__)
+    if encoder != "flask":
+        app.json = FastJSONProvider(app)
+
+    with app.test_request_context():
+        if mode == "body":
+            documents = [document(kind, number) for number in range(size)]
+            input_rss_mb = peak_rss_mb()
+            start = time.perf_counter()
+            response_bytes = len(app.json.response(documents).get_data())
+        else:
+            input_rss_mb = peak_rss_mb()
+            start = time.perf_counter()
+            response = ndjson_response(Cursor(kind, size))
+            response_bytes = sum(len(chunk) for chunk in response.response)
+        elapsed = time.perf_counter() - start
+
+    results.put(
+        {
+            "encoder": encoder,
+            "mode": mode,
+            "kind": kind,
+            "documents": size,
+            "seconds": round(elapsed, 3),
+            "documents_per_second": round(size / elapsed),
+            "response_mb": round(response_bytes / 1024 / 1024, 1),
+            "input_peak_rss_mb": round(input_rss_mb, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+    )
+
+
+def run_in_new_process(*args):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=run, args=args + (results,))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 1000000, 10000000]
+    )
+    parser.add_argument("--encoders", nargs="+", choices=ENCODERS, default=ENCODERS)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=["users"])
+    parser.add_argument("--max-body-documents", type=int, default=1000000)
+    parser.add_argument("--output", help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    if json_provider.orjson is None:
+        print("orjson is not installed, its results are those of the json module.")
+
+    results = []
+    for kind in args.kinds:
+        for size in args.sizes:
+            for mode in args.modes:
+                if mode == "body" and size > args.max_body_documents:
+                    continue
+                for encoder in args.encoders:
+                    if mode == "ndjson" and encoder == "flask":
+                        # Flask has no NDJSON serialization of its own.
+                        continue
+                    result = run_in_new_process(encoder, mode, kind, size)
+                    print(json.dumps(result))
+                    results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Description: This file benchmarks citizen registration (UserService.create_user)
+against the number of users already stored. For every size the users collection
+is grown to that size and a batch of new citizens is registered, so the
+latency curve shows whether registration depends on the size of the table.
+
+It needs a running mongod and uses its own database, which is dropped first.
+Run it from app/voting_app:
+    python -m benchmarks.registration_benchmark --mongo-uri mongodb://localhost:27017
+Add --compare-scan to also time the previous full-collection-scan registration.
+"""
+
+
+import argparse
+import json
+import statistics
+import time
+from types import SimpleNamespace
+from pymongo import MongoClient
+from application.models import Citizen
+from application.repositories.user_repository import UserRepository
+from application.schemas import user_schema, users_indexes
+from application.services.user_service import UserService
+from application.exceptions.user_already_exists_error import UserAlreadyExistsError
+
+SEED_BATCH_SIZE = 10000
+
+
+class FullScanUserService(UserService):
+    """Registration as it was before the unique index: a scan of every user."""
+
+    def create_user(self, data, admin_rights=False):
+        all_users = self.user_repository.get_all_users()
+        user_id = data.get("user_id")
+
+        if any(user.get("user_id") == user_id for user in all_users):
+            raise UserAlreadyExistsError(user_id)
+
+        user = Citizen(user_id, data.get("email"), data.get("password"))
+        self.user_repository.store_user(user.to_json())
+
+
+def citizen(user_id):
+    return Citizen(user_id, f"citizen{user_id}@example.com", "password").to_json()
+
+
+def seed(users_table, start, end):
+    """Insert the citizens with user_id in [start, end)."""
+    for batch_start in range(start, end, SEED_BATCH_SIZE):
+        batch_end = min(batch_start + SEED_BATCH_SIZE, end)
+        users_table.insert_many(
+            [citizen(user_id) for user_id in range(batch_start, batch_end)],
+            ordered=False,
+        )
+
+
+def time_registrations(user_service, users_table, first_user_id, samples):
+    latencies = []
+    for user_id in range(first_user_id, first_user_id + samples):
+        start = time.perf_counter()
+        user_service.create_user(citizen(user_id))
+        latencies.append(time.perf_counter() - start)
+
+    # Remove the new citizens so the table keeps the size being measured.
+    users_table.delete_many({"user_id": {"$gte": first_user_id}})
+    return latencies
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    p99_index = min(len(latencies) - 1, len(latencies) * 99 // 100)
+    return {
+        "samples": len(latencies),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[p99_index] * 1000,
+    }
+
+
+def run(mongo_uri, database, sizes, samples, scan_samples, compare_scan):
+    client = MongoClient(mongo_uri)
+    client.drop_database(database)
+    db = client[database]
+    db.create_collection("users", validator=user_schema)
+    db.users.create_indexes(users_indexes)
+
+    # The repositories only need the PyMongo attributes they read.
+    mongo = SimpleNamespace(cx=SimpleNamespace(votes_db=db))
+    user_repository = UserRepository(mongo)
+    user_service = UserService(user_repository)
+    scan_user_service = FullScanUserService(user_repository)
+
+    results = []
+    stored = 0
+    for size in sorted(sizes):
+        seed(db.users, stored + 1, size + 1)
+        stored = size
+
+        result = {
+            "users": size,
+            "indexed": summarize(
+                time_registrations(user_service, db.users, size + 1, samples)
+            ),
+        }
+        if compare_scan:
+            result["full_scan"] = summarize(
+                time_registrations(scan_user_service, db.users, size + 1, scan_samples)
+            )
+        results.append(result)
+        print(json.dumps(result))
+
+    client.drop_database(database)
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Registration latency against the size of the users collection."
+    )
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="electeu_registration_benchmark")
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000,1000000",
+        help="Comma separated numbers of stored users.",
+    )
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--scan-samples", type=int, default=20)
+    parser.add_argument("--compare-scan", action="store_true")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = run(
+        args.mongo_uri,
+        args.database,
+        sizes,
+        args.samples,
+        args.scan_samples,
+        args.compare_scan,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
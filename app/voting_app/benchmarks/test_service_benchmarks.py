@@ -0,0 +1,111 @@
+"""
+Description: This file contains the micro-benchmarks of the voting services,
+run with pytest-benchmark against the in-memory repositories and, with
+--mongo-uri, against MongoDB. Every benchmark of a group runs the same
+operation, so the backends are shown side by side. The cost the metrics add
+to every request, and the serialization of a large response by the JSON
+providers, are measured as well.
+
+Run it from app/voting_app, saving the results under .benchmarks and failing
+on a regression of the mean compared with the last saved run:
+    python -m pytest benchmarks --mongo-uri mongodb://localhost:27017 \
+        --benchmark-autosave --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+
+
+import itertools
+import pytest
+from flask import Flask
+from application.models import Citizen
+from application.services.election_service import ElectionService
+from application.services.user_service import UserService
+from application.services.vote_service import VoteService
+from application.utils.data_loader import load_election
+from application.utils.election_cache import ElectionCache
+from application.utils.json_provider import FastJSONProvider
+from application.utils.metrics import request_duration, requests_total
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.benchmark(group="vote_in_election")
+def test_vote_in_election(benchmark, vote_repository):
+    vote_service = VoteService(vote_repository, ElectionCache())
+    vote_option_id = min(vote_service.election_cache.get().vote_option_ids)
+    # Every vote is cast by a new voter, like in an election.
+    user_ids = itertools.count(1)
+
+    benchmark(lambda: vote_service.vote_in_election(next(user_ids), vote_option_id))
+
+
+@pytest.mark.benchmark(group="get_results")
+def test_get_results(benchmark, vote_repository):
+    vote_service = VoteService(vote_repository, ElectionCache())
+    for user_id, vote_option_id in enumerate(
+        sorted(vote_service.election_cache.get().vote_option_ids) * 100, 1
+    ):
+        vote_service.vote_in_election(user_id, vote_option_id)
+
+    results = benchmark(vote_service.get_results)
+
+    assert results["total_votes"] == user_id
+
+
+@pytest.mark.benchmark(group="create_user")
+def test_create_user(benchmark, user_repository):
+    user_service = UserService(user_repository)
+    user_ids = itertools.count(1)
+
+    def create_user():
+        user_id = next(user_ids)
+        user_service.create_user(
+            {
+                "user_id": user_id,
+                "email": f"citizen{user_id}@example.com",
+                "password": "password",
+            }
+        )
+
+    benchmark(create_user)
+
+
+@pytest.mark.benchmark(group="get_current_election")
+def test_get_current_election(benchmark):
+    election_service = ElectionService(ElectionCache())
+
+    election = benchmark(election_service.get_current_election)
+
+    assert election["vote_options"]
+
+
+@pytest.mark.benchmark(group="load_election")
+def test_load_election(benchmark):
+    election = benchmark(load_election)
+
+    assert election.vote_options
+
+
+@pytest.mark.benchmark(group="metrics")
+def test_record_request_metrics(benchmark):
+    def record_request():
+        request_duration.observe(0.003, "POST", "/vote")
+        requests_total.inc("POST", "/vote", "201")
+
+    benchmark(record_request)
+
+
+@pytest.mark.benchmark(group="jsonify_users")
+@pytest.mark.parametrize("provider", ["flask", "fast"])
+def test_jsonify_users(benchmark, provider):
+    app = Flask(__name__)
+    if provider == "fast":
+        app.json = FastJSONProvider(app)
+    users = [
+        Citizen(user_id, f"citizen{user_id}@example.com", "password").to_json()
+        for user_id in range(10000)
+    ]
+
+    with app.app_context():
+        response = benchmark(app.json.response, users)
+
+    assert response.json[-1]["user_id"] == 9999
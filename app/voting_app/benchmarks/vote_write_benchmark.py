@@ -0,0 +1,135 @@
+"""
+Description: This file benchmarks the sustained write throughput of votes
+(VoteRepository.store_vote) with and without the group-commit writer. For every
+batch size and number of concurrent threads, every thread stores the votes of
+its own voters and the votes per second and latency percentiles are reported.
+A batch size of 1 is the previous behaviour: one insert_one per vote.
+
+It needs a running mongod and uses its own database, which is dropped first.
+Run it from app/voting_app:
+    python -m benchmarks.vote_write_benchmark --mongo-uri mongodb://localhost:27017
+"""
+
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+from pymongo import MongoClient
+from application.bootstrap import bootstrap_database
+from application.repositories.vote_repository import VoteRepository
+
+
+def store_votes(vote_repository, user_ids, latencies):
+    for user_id in user_ids:
+        vote = {"user_id": user_id, "vote_option_id": user_id % 3 + 1, "election_id": 1}
+        start = time.perf_counter()
+        vote_repository.store_vote(vote)
+        latencies.append(time.perf_counter() - start)
+
+
+def time_writes(db, batch_size, max_delay, threads, votes_per_thread):
+    db.votes.delete_many({})
+    db.vote_counts.delete_many({})
+
+    # The repositories only need the PyMongo attributes they read.
+    mongo = SimpleNamespace(cx=SimpleNamespace(votes_db=db))
+    vote_repository = VoteRepository(
+        mongo, batch_size=batch_size, batch_max_delay=max_delay
+    )
+
+    latencies = [[] for _ in range(threads)]
+    workers = [
+        threading.Thread(
+            target=store_votes,
+            args=(
+                vote_repository,
+                range(n * votes_per_thread, (n + 1) * votes_per_thread),
+                latencies[n],
+            ),
+        )
+        for n in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    if vote_repository.vote_writer:
+        vote_repository.vote_writer.stop()
+
+    latencies = sorted(latency for thread in latencies for latency in thread)
+    p99_index = min(len(latencies) - 1, len(latencies) * 99 // 100)
+    return {
+        "batch_size": batch_size,
+        "threads": threads,
+        "votes": len(latencies),
+        "stored": db.votes.count_documents({}),
+        "votes_per_second": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[p99_index] * 1000, 3),
+    }
+
+
+def run(mongo_uri, database, batch_sizes, max_delay, thread_counts, votes):
+    client = MongoClient(mongo_uri)
+    client.drop_database(database)
+    db = client[database]
+    bootstrap_database(db)
+
+    results = []
+    for batch_size in batch_sizes:
+        for threads in thread_counts:
+            result = time_writes(
+                db, batch_size, max_delay, threads, max(1, votes // threads)
+            )
+            results.append(result)
+            print(json.dumps(result))
+
+    client.drop_database(database)
+    client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Vote write throughput with and without group commit."
+    )
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="electeu_vote_write_benchmark")
+    parser.add_argument(
+        "--batch-sizes",
+        default="1,100",
+        help="Comma separated batch sizes, 1 writes every vote on its own.",
+    )
+    parser.add_argument("--max-delay-ms", type=float, default=2)
+    parser.add_argument(
+        "--threads",
+        default="1,16,64",
+        help="Comma separated numbers of concurrent threads.",
+    )
+    parser.add_argument("--votes", type=int, default=20000, help="Votes per run.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run(
+        args.mongo_uri,
+        args.database,
+        [int(batch_size) for batch_size in args.batch_sizes.split(",")],
+        args.max_delay_ms / 1000,
+        [int(threads) for threads in args.threads.split(",")],
+        args.votes,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Description: This package generates load against the ElectEU services with
+asyncio, reusing keep-alive connections from a pool. Requests are sent in a
+closed loop (a fixed number of clients, each waiting for its response) or an
+open loop (a fixed arrival rate, independent of the responses), and a JSON
+report with the throughput, latency percentiles and errors is written so runs
+can be compared. Run `python3 -m experiment.loadgen --help` from the project
+directory for the scenarios and options.
+"""
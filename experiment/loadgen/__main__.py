@@ -0,0 +1,87 @@
+"""
+Description: This file is the command line of the load generator, e.g.:
+    python3 -m experiment.loadgen vote --mode closed --concurrency 100
+    python3 -m experiment.loadgen election --mode open --rate 2000 --duration 30
+    python3 -m experiment.loadgen verify-2fa --email ElectEU@gmail.com
+The JSON report is printed and, with --output, written to a file.
+"""
+
+import argparse
+import asyncio
+import json
+from .runner import run
+from .scenarios import SCENARIOS
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python3 -m experiment.loadgen",
+        description="Asyncio load generator for the ElectEU services.",
+    )
+    parser.add_argument("scenario", choices=list(SCENARIOS))
+    parser.add_argument("--voting-url", default="http://localhost:5000")
+    parser.add_argument("--auth-url", default="http://localhost:5001")
+    parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    parser.add_argument(
+        "--concurrency", type=int, default=10, help="Clients of the closed loop."
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=100.0,
+        help="Requests per second of the open loop.",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds.")
+    parser.add_argument(
+        "--requests", type=int, help="Stop after this many requests instead."
+    )
+    parser.add_argument(
+        "--connections", type=int, default=100, help="Size of the connection pool."
+    )
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per request.")
+    parser.add_argument(
+        "--first-user-id",
+        type=int,
+        default=800000000,
+        help="user_id of the first citizen registered or voting.",
+    )
+    parser.add_argument("--email", default="ElectEU@gmail.com", help="For verify-2fa.")
+    parser.add_argument(
+        "--codes", choices=["sequential", "random"], default="sequential"
+    )
+    parser.add_argument("--limit", type=int, default=100, help="Admin page size.")
+    parser.add_argument("--output", help="Write the report to this JSON file.")
+    inputargs = parser.parse_args()
+
+    scenario = SCENARIOS[inputargs.scenario](inputargs)
+    if scenario.service == "authentication":
+        base_url = inputargs.auth_url
+    else:
+        base_url = inputargs.voting_url
+
+    report = asyncio.run(
+        run(
+            scenario,
+            base_url,
+            mode=inputargs.mode,
+            concurrency=inputargs.concurrency,
+            rate=inputargs.rate,
+            # Without a time limit when a number of requests is given.
+            duration=float("inf") if inputargs.requests else inputargs.duration,
+            total=inputargs.requests,
+            connections=inputargs.connections,
+            timeout=inputargs.timeout,
+        )
+    )
+    report = {
+        "scenario": inputargs.scenario,
+        "url": base_url,
+        "mode": inputargs.mode,
+        "concurrency": inputargs.concurrency if inputargs.mode == "closed" else None,
+        "rate": inputargs.rate if inputargs.mode == "open" else None,
+        **report,
+    }
+
+    print(json.dumps(report, indent=2))
+    if inputargs.output:
+        with open(inputargs.output, "w") as file:
+            json.dump(report, file, indent=2)
@@ -0,0 +1,90 @@
+"""
+Description: This file runs a scenario in a closed or open loop over a pool
+of keep-alive connections.
+- Closed loop: `concurrency` clients each send their next request as soon as
+  the previous one was answered, so the server sets the pace.
+- Open loop: requests start at a fixed `rate` per second whether or not the
+  previous ones were answered, and their latency is measured from the time
+  they were due, so a slow server can not hide its queueing delay.
+"""
+
+import asyncio
+import itertools
+import time
+import aiohttp
+from .stats import RunStats
+
+
+async def send(session, base_url, scenario, n, stats, due=None):
+    method, path, body, headers = scenario.request(n)
+    start = time.perf_counter() if due is None else due
+    try:
+        async with session.request(
+            method, f"{base_url}{path}", json=body, headers=headers
+        ) as response:
+            await response.read()
+        stats.record(time.perf_counter() - start, status=response.status)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        stats.record(time.perf_counter() - start, error=e)
+
+
+async def closed_loop(session, base_url, scenario, stats, concurrency, end, total):
+    counter = itertools.count() if total is None else iter(range(total))
+
+    async def client():
+        for n in counter:
+            if time.perf_counter() >= end:
+                return
+            await send(session, base_url, scenario, n, stats)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+
+async def open_loop(session, base_url, scenario, stats, rate, end, total):
+    start = time.perf_counter()
+    tasks = set()
+    for n in itertools.count():
+        due = start + n / rate
+        if due >= end or (total is not None and n >= total):
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        task = asyncio.ensure_future(send(session, base_url, scenario, n, stats, due))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.wait(tasks)
+
+
+async def run(
+    scenario,
+    base_url,
+    mode="closed",
+    concurrency=10,
+    rate=100.0,
+    duration=10.0,
+    total=None,
+    connections=100,
+    timeout=30.0,
+):
+    """Run the scenario and return the report of the run."""
+    connector = aiohttp.TCPConnector(limit=connections, keepalive_timeout=60)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=client_timeout
+    ) as session:
+        await scenario.setup(session, base_url)
+
+        stats = RunStats()
+        start = time.perf_counter()
+        end = start + duration
+        if mode == "open":
+            await open_loop(session, base_url, scenario, stats, rate, end, total)
+        else:
+            await closed_loop(
+                session, base_url, scenario, stats, concurrency, end, total
+            )
+        return stats.report(time.perf_counter() - start)
@@ -0,0 +1,129 @@
+"""
+Description: This file contains the load scenarios, one per endpoint. A
+scenario prepares what it needs once, e.g. the vote options of the election,
+and then builds the n-th request of the run.
+"""
+
+import datetime
+import random
+import jwt
+
+# Secret the authentication service signs its tokens with.
+JWT_SECRET = "your_secret_key"
+
+
+class Scenario:
+    # "voting" or "authentication", the service the requests are sent to.
+    service = "voting"
+
+    def __init__(self, options):
+        self.options = options
+
+    async def setup(self, session, base_url):
+        pass
+
+    def request(self, n):
+        """Return the method, path, JSON body and headers of request n."""
+        raise NotImplementedError
+
+
+class RegisterScenario(Scenario):
+    """Registers a new citizen per request."""
+
+    def request(self, n):
+        user_id = self.options.first_user_id + n
+        body = {
+            "user_id": user_id,
+            "email": f"loadgen{user_id}@example.com",
+            "password": "password",
+        }
+        return "POST", "/register", body, None
+
+
+class ElectionScenario(Scenario):
+    def request(self, n):
+        return "GET", "/election", None, None
+
+
+class VoteScenario(Scenario):
+    """Casts the vote of a new voter per request, with a minted token.
+
+    The tokens are signed with the secret of the authentication service,
+    /verify-2fa only issues them for registered users, so the voters of the run
+    do not need to exist.
+    """
+
+    async def setup(self, session, base_url):
+        async with session.get(f"{base_url}/election") as response:
+            election = await response.json()
+        self.vote_option_ids = [
+            vote_option["vote_option_id"] for vote_option in election["vote_options"]
+        ]
+        self.expires = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    def request(self, n):
+        user_id = self.options.first_user_id + n
+        token = jwt.encode(
+            {
+                "user_id": user_id,
+                "email": f"loadgen{user_id}@example.com",
+                "exp": self.expires,
+            },
+            JWT_SECRET,
+            algorithm="HS256",
+        )
+        body = {"vote_option_id": self.vote_option_ids[n % len(self.vote_option_ids)]}
+        return "POST", "/vote", body, {"Authorization": f"Bearer {token}"}
+
+
+class Verify2faScenario(Scenario):
+    """Tries 2FA codes for one user, in order or at random like an attacker."""
+
+    service = "authentication"
+
+    def request(self, n):
+        if self.options.codes == "random":
+            code = f"{random.randrange(1000000):06d}"
+        else:
+            code = f"{n % 1000000:06d}"
+        body = {"email": self.options.email, "code": code}
+        return "POST", "/verify-2fa", body, None
+
+
+class ListingScenario(Scenario):
+    """Reads the first page of an admin listing."""
+
+    path = None
+
+    def request(self, n):
+        return "GET", f"{self.path}?limit={self.options.limit}", None, None
+
+
+class UsersScenario(ListingScenario):
+    path = "/users"
+
+
+class VotesScenario(ListingScenario):
+    path = "/votes"
+
+
+class ResultsScenario(Scenario):
+    def request(self, n):
+        return "GET", "/results", None, None
+
+
+class UserSecretsScenario(ListingScenario):
+    service = "authentication"
+    path = "/user_secrets"
+
+
+SCENARIOS = {
+    "register": RegisterScenario,
+    "election": ElectionScenario,
+    "vote": VoteScenario,
+    "verify-2fa": Verify2faScenario,
+    "users": UsersScenario,
+    "votes": VotesScenario,
+    "results": ResultsScenario,
+    "user-secrets": UserSecretsScenario,
+}
@@ -0,0 +1,79 @@
+"""
+Description: This file collects the outcome of every request of a run and
+turns it into the JSON report: throughput, latency percentiles, a latency
+histogram, and the responses and errors broken down by status or type.
+"""
+
+import collections
+from array import array
+
+# Upper bounds, in milliseconds, of the histogram buckets.
+HISTOGRAM_BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class RunStats:
+    def __init__(self):
+        self.latencies = array("d")
+        self.statuses = collections.Counter()
+        self.errors = collections.Counter()
+
+    def record(self, latency, status=None, error=None):
+        """Record a response status, or the error that prevented a response."""
+        self.latencies.append(latency)
+        if error is None:
+            self.statuses[str(status)] += 1
+        else:
+            self.errors[type(error).__name__] += 1
+
+    def report(self, elapsed):
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        successes = sum(n for status, n in self.statuses.items() if int(status) < 400)
+
+        return {
+            "requests": count,
+            "successes": successes,
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_rps": round(count / elapsed, 1) if elapsed else 0.0,
+            "success_rps": round(successes / elapsed, 1) if elapsed else 0.0,
+            "latency_ms": self._percentiles(latencies),
+            "histogram_ms": self._histogram(latencies),
+            "statuses": dict(sorted(self.statuses.items())),
+            "errors": dict(sorted(self.errors.items())),
+        }
+
+    @staticmethod
+    def _percentiles(latencies):
+        if not latencies:
+            return {}
+
+        def percentile(fraction):
+            index = min(len(latencies) - 1, int(len(latencies) * fraction))
+            return round(latencies[index] * 1000, 3)
+
+        return {
+            "min": round(latencies[0] * 1000, 3),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50": percentile(0.50),
+            "p90": percentile(0.90),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "p999": percentile(0.999),
+            "max": round(latencies[-1] * 1000, 3),
+        }
+
+    @staticmethod
+    def _histogram(latencies):
+        buckets = collections.Counter()
+        for latency in latencies:
+            latency_ms = latency * 1000
+            bound = next(
+                (str(bound) for bound in HISTOGRAM_BOUNDS_MS if latency_ms <= bound),
+                "inf",
+            )
+            buckets[bound] += 1
+        return {
+            bound: buckets[bound]
+            for bound in [str(bound) for bound in HISTOGRAM_BOUNDS_MS] + ["inf"]
+            if buckets[bound]
+        }
@@ -0,0 +1,270 @@
+"""
+Description: This file measures how much of the 2FA code space an attacker
+covers per 30 second TOTP window, instead of estimating it from serial
+attempts like `brute_force_attack.py report`. For every limiter configuration
+it serves the authentication app in this process (one threaded server per
+simulated worker or host), drives /verify-2fa with as many concurrent
+keep-alive connections as asked for, and counts per window:
+- the distinct codes the server evaluated (allowed by the attempt limiter),
+- the attempts the limiter rejected (HTTP 429).
+From the codes evaluated per window it reports the probability that the
+attacker finds the code of a window, and of a day.
+
+It needs a local MongoDB stand-in (e.g. `docker-compose up mongo`), where it
+creates one benchmark user and removes it afterwards, and the packages of
+experiment/requirements.txt and app/authentication_app/requirements.txt.
+Run it from the project directory:
+    python3 ./experiment/resilience_benchmark.py \
+        --configs memory:0:1 memory:2:1 memory:2:5 mongo:2:1 --workers 1 4
+A configuration is `backend:interval:burst`, with interval 0 meaning no limit.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+import aiohttp
+import pyotp
+from pymongo import MongoClient
+from werkzeug.serving import make_server
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "..", "app", "authentication_app"
+    ),
+)
+
+from application.app import create_app  # noqa: E402
+from application.config import Config  # noqa: E402
+from application.services.authentication_service import (  # noqa: E402
+    AuthenticationService,
+)
+
+LIFECYCLE_TOTP = 30.0
+MAX_POSSIBLE_CODES = 1000000
+WINDOWS_PER_DAY = 24 * 60 * 60 / LIFECYCLE_TOTP
+USER_ID = 999999999
+EMAIL = "resilience-benchmark@example.com"
+
+
+class CountingAttemptLimiter:
+    """Counts the attempts the wrapped limiter allows and rejects."""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.allowed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        allowed = self.limiter.allow(key)
+        with self._lock:
+            if allowed:
+                self.allowed += 1
+            else:
+                self.rejected += 1
+        return allowed
+
+
+def parse_config(config):
+    backend, interval, burst = config.split(":")
+    return backend, float(interval), int(burst)
+
+
+def start_workers(mongo_uri, backend, interval, burst, workers):
+    """Serve one app per worker, each with its own in-process state."""
+
+    class BenchmarkConfig(Config):
+        MONGO_URI = mongo_uri
+        ATTEMPT_LIMITER = backend
+        ATTEMPT_LIMIT_INTERVAL = interval
+        ATTEMPT_LIMIT_BURST = burst
+        USED_CODE_STORE = "memory"
+
+    servers = []
+    limiters = []
+    for _ in range(workers):
+        app = create_app(BenchmarkConfig)
+        authentication_service = app.extensions["injector"].get(AuthenticationService)
+        limiter = CountingAttemptLimiter(authentication_service.attempt_limiter)
+        authentication_service.attempt_limiter = limiter
+        limiters.append(limiter)
+
+        server = make_server("127.0.0.1", 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers, limiters
+
+
+def create_user(db):
+    secret = pyotp.random_base32()
+    db.users.update_one(
+        {"user_id": USER_ID},
+        {
+            "$set": {
+                "user_id": USER_ID,
+                "email": EMAIL,
+                "password": "password",
+                "admin_rights": False,
+            }
+        },
+        upsert=True,
+    )
+    db.user_secrets.update_one(
+        {"user_id": USER_ID},
+        {
+            "$set": {
+                "user_id": USER_ID,
+                "email": EMAIL,
+                "authentication_token": secret,
+                "bearer_token": "",
+            }
+        },
+        upsert=True,
+    )
+
+
+def remove_user(db):
+    db.users.delete_one({"user_id": USER_ID})
+    db.user_secrets.delete_one({"user_id": USER_ID})
+    db.attempt_limits.delete_many({"_id": EMAIL})
+
+
+async def attack(base_urls, concurrency, duration):
+    """Try distinct codes for `duration` seconds, returning the statuses."""
+    statuses = {}
+    codes = itertools.count()
+    urls = itertools.cycle(base_urls)
+    end = time.perf_counter() + duration
+
+    async def client(session):
+        while time.perf_counter() < end:
+            code = f"{next(codes) % MAX_POSSIBLE_CODES:06d}"
+            payload = {"user_id": USER_ID, "email": EMAIL, "code": code}
+            try:
+                async with session.post(f"{next(urls)}/verify-2fa", json=payload) as r:
+                    await r.read()
+                    status = str(r.status)
+            except aiohttp.ClientError as e:
+                status = type(e).__name__
+            statuses[status] = statuses.get(status, 0) + 1
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+    return statuses
+
+
+def wait_for_next_window():
+    time.sleep(LIFECYCLE_TOTP - time.time() % LIFECYCLE_TOTP)
+
+
+def run_config(db, mongo_uri, config, workers, concurrency, duration, align):
+    backend, interval, burst = parse_config(config)
+    remove_user(db)
+    create_user(db)
+    servers, limiters = start_workers(mongo_uri, backend, interval, burst, workers)
+    base_urls = [f"http://127.0.0.1:{server.server_port}" for server in servers]
+
+    try:
+        # Warm up the connections, caches and indexes outside of the window.
+        asyncio.run(attack(base_urls, min(concurrency, 8), 0.5))
+        db.attempt_limits.delete_many({"_id": EMAIL})
+        for limiter in limiters:
+            limiter.allowed = limiter.rejected = 0
+        if align:
+            wait_for_next_window()
+
+        start = time.perf_counter()
+        statuses = asyncio.run(attack(base_urls, concurrency, duration))
+        elapsed = time.perf_counter() - start
+    finally:
+        for server in servers:
+            server.shutdown()
+
+    evaluated = sum(limiter.allowed for limiter in limiters)
+    rejected = sum(limiter.rejected for limiter in limiters)
+    # Codes evaluated in one TOTP window, extrapolated for shorter runs.
+    evaluated_per_window = min(
+        MAX_POSSIBLE_CODES, round(evaluated * LIFECYCLE_TOTP / elapsed)
+    )
+    window_probability = evaluated_per_window / MAX_POSSIBLE_CODES
+    return {
+        "config": config,
+        "workers": workers,
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "attempts": sum(statuses.values()),
+        "attempts_per_second": round(sum(statuses.values()) / elapsed, 1),
+        "statuses": statuses,
+        "codes_evaluated": evaluated,
+        "codes_rejected_by_limiter": rejected,
+        "codes_evaluated_per_window": evaluated_per_window,
+        "compromise_probability_per_window": window_probability,
+        "compromise_probability_per_day": 1
+        - (1 - window_probability) ** WINDOWS_PER_DAY,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Code space covered per TOTP window under attempt limiters."
+    )
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        default=["memory:0:1", "memory:2:1", "memory:2:5", "mongo:2:1"],
+        help="Limiter configurations as backend:interval:burst.",
+    )
+    parser.add_argument(
+        "--workers",
+        nargs="+",
+        type=int,
+        default=[1, 4],
+        help="Simulated worker processes or hosts serving the attack.",
+    )
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=LIFECYCLE_TOTP,
+        help="Seconds per configuration, extrapolated to a window if shorter.",
+    )
+    parser.add_argument(
+        "--no-align",
+        action="store_true",
+        help="Start without waiting for the next TOTP window.",
+    )
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/votes_db")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    inputargs = parser.parse_args()
+
+    client = MongoClient(inputargs.mongo_uri)
+    db = client.votes_db
+    results = []
+    try:
+        for config in inputargs.configs:
+            for workers in inputargs.workers:
+                result = run_config(
+                    db,
+                    inputargs.mongo_uri,
+                    config,
+                    workers,
+                    inputargs.concurrency,
+                    inputargs.duration,
+                    not inputargs.no_align,
+                )
+                results.append(result)
+                print(json.dumps(result))
+    finally:
+        remove_user(db)
+        client.close()
+
+    if inputargs.output:
+        with open(inputargs.output, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,166 @@
+"""
+Description: This file measures the cold start of both services, which every
+new worker, test run and CLI command pays. For every service it starts fresh
+interpreters and measures:
+- The import time of application.app, from `python -X importtime`, and the
+  packages that take the most time to import.
+- The time to the first request: importing the app and serving one request
+  through the test client, and the wall time of the whole process.
+
+Run it from the project directory:
+    python3 ./experiment/startup_benchmark.py [--runs 10] [--bootstrap first_request]
+With `--bootstrap first_request` the first request also creates the collections
+and indexes, which needs MongoDB at --mongo-uri.
+"""
+
+import argparse
+import collections
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+# A request of every service that is answered without reading the database.
+SERVICES = {
+    "voting_app": ("GET", "/election", None),
+    "authentication_app": ("POST", "/verify-2fa", {}),
+}
+
+# Runs in a fresh interpreter and prints its timings as JSON.
+FIRST_REQUEST_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from application.app import app
+imported = time.perf_counter()
+client = app.test_client()
+response = client.open(sys.argv[2], method=sys.argv[1], json=json.loads(sys.argv[3]))
+answered = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_seconds": imported - start,
+    "first_request_seconds": answered - imported,
+    "import_and_first_request_seconds": answered - start,
+}))
+"""
+
+
+def measure_import_time(directory, env):
+    """Return the cumulative import time of application.app and per package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import application.app"],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total = 0
+    packages = collections.Counter()
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us)
+        if name == "application.app":
+            total = int(cumulative_us)
+    return total / 1e6, packages
+
+
+def measure_first_request(directory, env, method, path, body):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST_SCRIPT, method, path, json.dumps(body)],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = json.loads(result.stdout.splitlines()[-1])
+    timings["process_seconds"] = time.perf_counter() - start
+    return timings
+
+
+def summarize(values):
+    return {
+        "min_ms": round(min(values) * 1000, 2),
+        "median_ms": round(statistics.median(values) * 1000, 2),
+        "max_ms": round(max(values) * 1000, 2),
+    }
+
+
+def benchmark_service(service, runs, env, top):
+    directory = os.path.join(APP_DIRECTORY, service)
+    method, path, body = SERVICES[service]
+
+    import_times = []
+    packages = collections.Counter()
+    first_requests = []
+    for _ in range(runs):
+        import_time, run_packages = measure_import_time(directory, env)
+        import_times.append(import_time)
+        packages.update(run_packages)
+        first_requests.append(measure_first_request(directory, env, method, path, body))
+
+    return {
+        "service": service,
+        "runs": runs,
+        "request": f"{method} {path}",
+        "status": first_requests[-1]["status"],
+        "importtime": summarize(import_times),
+        "slowest_imports_ms": {
+            name: round(self_us / runs / 1000, 2)
+            for name, self_us in packages.most_common(top)
+        },
+        **{
+            key: summarize([timings[key] for timings in first_requests])
+            for key in (
+                "import_seconds",
+                "first_request_seconds",
+                "import_and_first_request_seconds",
+                "process_seconds",
+            )
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import time and time to first request of both services."
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--services", nargs="+", choices=list(SERVICES), default=list(SERVICES)
+    )
+    parser.add_argument(
+        "--bootstrap",
+        choices=["off", "first_request"],
+        default="off",
+        help="DATABASE_BOOTSTRAP of the services.",
+    )
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/votes_db")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports shown.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    inputargs = parser.parse_args()
+
+    env = dict(
+        os.environ,
+        MONGO_URI=inputargs.mongo_uri,
+        DATABASE_BOOTSTRAP=inputargs.bootstrap,
+    )
+    results = []
+    for service in inputargs.services:
+        result = benchmark_service(service, inputargs.runs, env, inputargs.top)
+        results.append(result)
+        print(json.dumps(result, indent=2))
+
+    if inputargs.output:
+        with open(inputargs.output, "w") as file:
+            json.dump(results, file, indent=2)
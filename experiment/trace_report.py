@@ -0,0 +1,110 @@
+"""
+Description: This file summarizes the spans recorded by the tracing of the
+apps (TRACING_ENABLED=true), to find which hop dominates the latency of a
+voter's path during a load test. It reads the JSON lines files of both
+services and reports as JSON:
+- per span name, its count, p50/p95 duration and self time (the time not
+  spent in its child spans), with its share of the self time of all spans,
+- per service, its share of the self time,
+- how often every span name is the dominant hop (largest self time) of a trace.
+Run it from the project directory, e.g. after a load test:
+    python3 ./experiment/trace_report.py /tmp/authentication-app-traces.jsonl \
+        /tmp/voting-app-traces.jsonl [--top 20] [--output traces.json]
+"""
+
+import argparse
+import json
+from collections import Counter, defaultdict
+
+
+def read_spans(paths):
+    spans = []
+    for path in paths:
+        with open(path) as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    spans.append(json.loads(line))
+    return spans
+
+
+def self_times(spans):
+    """Return the self time, in milliseconds, of every span by span_id."""
+    children = defaultdict(float)
+    for span in spans:
+        if span["parent_span_id"]:
+            children[span["parent_span_id"]] += span["duration_ms"]
+    # Children running in another thread (e.g. the SMTP send of the email
+    # workers) can outlast their parent, so the self time is clipped at 0.
+    return {
+        span["span_id"]: max(0.0, span["duration_ms"] - children[span["span_id"]])
+        for span in spans
+    }
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return round(sorted_values[index], 3)
+
+
+def report(spans, top=20):
+    own = self_times(spans)
+    total_self = sum(own.values()) or 1.0
+
+    durations = defaultdict(list)
+    self_by_name = defaultdict(float)
+    self_by_service = defaultdict(float)
+    traces = defaultdict(list)
+    for span in spans:
+        name = f"{span['service']}: {span['name']}"
+        durations[name].append(span["duration_ms"])
+        self_by_name[name] += own[span["span_id"]]
+        self_by_service[span["service"]] += own[span["span_id"]]
+        traces[span["trace_id"]].append((own[span["span_id"]], name))
+
+    span_names = []
+    for name in sorted(self_by_name, key=self_by_name.get, reverse=True)[:top]:
+        values = sorted(durations[name])
+        span_names.append(
+            {
+                "name": name,
+                "count": len(values),
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "self_ms": round(self_by_name[name], 3),
+                "self_share": round(self_by_name[name] / total_self, 4),
+            }
+        )
+
+    dominant_hops = Counter(max(trace)[1] for trace in traces.values())
+    return {
+        "spans": len(spans),
+        "traces": len(traces),
+        "services": {
+            service: round(self_time / total_self, 4)
+            for service, self_time in sorted(
+                self_by_service.items(), key=lambda item: item[1], reverse=True
+            )
+        },
+        "span_names": span_names,
+        "dominant_hops": [
+            {"name": name, "traces": count, "share": round(count / len(traces), 4)}
+            for name, count in dominant_hops.most_common(top)
+        ],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Summarize the spans recorded by the tracing of the apps."
+    )
+    parser.add_argument("paths", nargs="+", help="JSON lines files of spans.")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    result = json.dumps(report(read_spans(args.paths), args.top), indent=2)
+    print(result)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(result + "\n")